@@ -12,13 +12,20 @@ from occupations import judge_casework, lawyer_casework, medical_casework, commu
     manufacture_drugs, banker_laundering, banker_add_clients, fire_casework, fire_duties, engineering_casework, \
     customs_blind_eyes
 from helper_functions import _get_element_text, _find_and_send_keys, _find_and_click, is_player_in_jail, \
-    blind_eye_queue_count, community_service_queue_count, dequeue_community_service
-from database_functions import init_local_db
+    _find_elements_quiet, blind_eye_queue_count, community_service_queue_count, dequeue_community_service
+from database_functions import init_local_db, _write_json_file, record_event
+from selector_registry import save_selector_stats
+from bank_ops import pending_transfer_count
+from outcome_classifier import classify
+import metrics_server
+import command_trace
+import browser_health
+import page_context
 from police import police_911, prepare_police_cases, train_forensics
-from timer_functions import get_all_active_game_timers
+from timer_functions import get_all_active_game_timers, get_jail_timer_snapshot
 from comms_journals import send_discord_notification, get_unread_message_count, read_and_send_new_messages, get_unread_journal_count, process_unread_journal_entries
-from misc_functions import study_degrees, do_events, check_weapon_shop, check_drug_store, jail_work, \
-    clean_money_on_hand_logic, gym_training, check_bionics_shop, police_training, combat_training, fire_training, \
+from misc_functions import study_degrees, do_events, sweep_city_shops, jail_work, \
+    clean_money_on_hand_logic, gym_training, police_training, combat_training, fire_training, \
     customs_training, take_promotion, consume_drugs
 
 # --- Initialize Local Cooldown Database ---
@@ -201,6 +208,48 @@ def get_enabled_configs(location):
     "do_consume_drugs_enabled": config.getboolean('Drugs', 'ConsumeCocaine', fallback=False) and location == home_city,
     }
 
+# Tasks whose pay only shows in the result banner, and the outcome table holding their payout phrases
+PAYOUT_TASKS = {
+    "Earn": "earn_payout",
+    "Launder": "launder_payout",
+    **{task: "casework_payout" for task in ("Judge Casework", "Lawyer Casework", "Medical Casework", "Police Casework",
+                                            "Fire Casework", "Bank Casework", "Engineering Casework")},
+}
+
+def _read_payout(task):
+    """Money paid out by the task that just ran, from the #success banner still on the page (0 if none)."""
+    banners = _find_elements_quiet(By.ID, "success")  # No wait: most runs leave no banner
+    text = banners[0].text.strip() if banners else ""
+    result = classify(PAYOUT_TASKS[task], text) if text else None
+    return (result.amount or 0) if result else 0
+
+def _run_task(task, func, *args, **kwargs):
+    """
+    Runs one main-loop task and appends its outcome, payout, duration and WebDriver round trips to the event
+    ledger. Exceptions are recorded and re-raised unchanged.
+    """
+    started = time.perf_counter()
+    trips_before = global_vars.WEBDRIVER_COMMAND_COUNT
+    outcome = "error"
+    error = None
+    amount = 0
+    try:
+        page_context.before_task(task)
+        with command_trace.flow(getattr(func, "__name__", task)):
+            result = func(*args, **kwargs)
+        outcome = "performed" if result else "no action"
+        if result and task in PAYOUT_TASKS:
+            amount = _read_payout(task)
+        return result
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        record_event(task, outcome, ok=(outcome == "performed"), amount=amount, duration_s=duration,
+                     round_trips=global_vars.WEBDRIVER_COMMAND_COUNT - trips_before)
+        metrics_server.observe_task(task, outcome, duration, error)
+
 def _determine_sleep_duration(action_performed_in_cycle, timers_data, enabled_configs, next_rank_pc):
     """
     Determines the optimal sleep duration based on enabled activities and cooldown timers.
@@ -227,10 +276,8 @@ def _determine_sleep_duration(action_performed_in_cycle, timers_data, enabled_co
     torch_recheck = get_timer('torch_recheck_time_remaining')
     yps = get_timer('yellow_pages_scan_time_remaining')
     fps = get_timer('funeral_parlour_scan_time_remaining')
-    weapon = get_timer('check_weapon_shop_time_remaining')
-    drug = get_timer('check_drug_store_time_remaining')
+    shops = get_timer('shop_sweep_time_remaining')
     gym = get_timer('gym_trains_time_remaining')
-    bionics = get_timer('check_bionics_store_time_remaining')
     post_911 = get_timer('post_911_time_remaining')
     trafficking = get_timer('trafficking_time_remaining')
     auto_promo = get_timer('promo_check_time_remaining')
@@ -307,14 +354,11 @@ def _determine_sleep_duration(action_performed_in_cycle, timers_data, enabled_co
         active.append(('Forensics', effective_forensics))
 
     # City actions
-    if cfg.getboolean('Weapon Shop', 'CheckWeaponShop', fallback=False) and any("Weapon Shop" in b for c, b in businesses.items() if c == location):
-        active.append(('Check Weapon Shop', weapon))
-    if cfg.getboolean('Drug Store', 'CheckDrugStore', fallback=False) and any("Drug Store" in b for c, b in businesses.items() if c == location):
-        active.append(('Check Drug Store', drug))
+    if (enabled_configs.get('do_weapon_shop_check_enabled') or enabled_configs.get('do_drug_store_enabled')
+            or enabled_configs.get('do_bionics_shop_check_enabled')):
+        active.append(('City Shop Sweep', shops))
     if cfg.getboolean('Misc', 'GymTrains', fallback=False) and any("Gym" in b for c, b in businesses.items() if c == location):
         active.append(('Gym Trains', gym))
-    if cfg.getboolean('Bionics Shop', 'CheckBionicsShop', fallback=False) and any("Bionics" in b for c, b in businesses.items() if c == location):
-        active.append(('Check Bionics Shop', bionics))
 
     print("--- Timers Under Consideration for Sleep Duration ---")
     for name, timer_val in active:
@@ -350,9 +394,23 @@ def _determine_sleep_duration(action_performed_in_cycle, timers_data, enabled_co
     print(f"Decision: {sleep_reason}")
     return sleep_duration
 
+def _determine_jail_sleep_duration(jail_timers):
+    """
+    Sleeps until the earliest of the jail Earn/Action deadlines or the next release re-check.
+    The release time isn't exposed as a timer, so release is re-checked at a bounded interval.
+    """
+    release_recheck = random.uniform(global_vars.JAIL_RECHECK_MIN_SECONDS, global_vars.JAIL_RECHECK_MAX_SECONDS)
+    deadlines = [t for t in (jail_timers or {}).values() if t is not None and t != float('inf')]
+    sleep_duration = min(deadlines + [release_recheck])
+    sleep_duration = max(2, sleep_duration)
+    print(f"Jail: next wake in {sleep_duration:.1f}s (earn {jail_timers.get('earn_time_remaining', float('inf')):.1f}s, "
+          f"action {jail_timers.get('action_time_remaining', float('inf')):.1f}s, release re-check {release_recheck:.1f}s).")
+    return sleep_duration
+
 # --- Start Discord Bridge ---
 start_discord_bridge()
 print("[Main] Discord bridge started.")
+metrics_server.start_metrics_server()
 
     # --- SCRIPT CHECK DETECTION & LOGOUT/LOGIN ---
 def perform_critical_checks(character_name):
@@ -360,6 +418,9 @@ def perform_critical_checks(character_name):
     Fast, non-blocking check for logout and script check pages.
     Uses instant checks with no WebDriverWait.
     """
+    # Critical checks sit between tasks, so let any queued Discord jobs use the browser first
+    global_vars.DRIVER_LOCK.yield_to_waiters()
+
     # Ensure critical probes & any quick nav happen under the Selenium lock
     with global_vars.DRIVER_LOCK:
         # Check for logout
@@ -416,14 +477,24 @@ def perform_critical_checks(character_name):
     return False  # No critical issues
 
 
+startup_checks_done = False
 while True:
     if perform_critical_checks("UNKNOWN"):
         continue
 
+    # Once logged in: startup memory sample and the optional headless/headful self-check
+    if not startup_checks_done:
+        with global_vars.DRIVER_LOCK:
+            browser_health.run_startup_checks()
+        startup_checks_done = True
+
     # Re-read settings.ini in case they've changed
     global_vars.config.read('settings.ini') # Re-read config in case it's changed
     current_time = datetime.datetime.now()
     action_performed_in_cycle = False
+    cycle_started = time.perf_counter()
+    cycle_commands_before = global_vars.WEBDRIVER_COMMAND_COUNT
+    page_context.begin_cycle()
 
     # --- Fetch all timers first ---
     all_timers = get_all_active_game_timers()
@@ -444,9 +515,11 @@ while True:
                     break
                 if perform_critical_checks(character_name):
                     continue
-                global_vars.jail_timers = get_all_active_game_timers()
-                jail_work()
-            time.sleep(2)  # sleep outside the lock
+                global_vars.jail_timers = get_jail_timer_snapshot()
+                if min(global_vars.jail_timers.values()) <= 0:
+                    jail_work()
+                    global_vars.jail_timers = get_jail_timer_snapshot()
+            time.sleep(_determine_jail_sleep_duration(global_vars.jail_timers))  # sleep outside the lock
 
         print("Player released from jail. Resuming normal script.")
         continue  # Skip the rest of the main loop for this cycle
@@ -497,10 +570,8 @@ while True:
     funeral_parlour_scan_time_remaining = all_timers.get('funeral_parlour_scan_time_remaining', float('inf'))
 
     # Misc city timers
-    check_weapon_shop_time_remaining = all_timers.get('check_weapon_shop_time_remaining', float('inf'))
-    check_drug_store_time_remaining = all_timers.get('check_drug_store_time_remaining', float('inf'))
+    shop_sweep_time_remaining = all_timers.get('shop_sweep_time_remaining', float('inf'))
     gym_trains_time_remaining = all_timers.get('gym_trains_time_remaining', float('inf'))
-    check_bionics_store_time_remaining = all_timers.get('check_bionics_store_time_remaining', float('inf'))
     promo_check_time_remaining = all_timers.get('promo_check_time_remaining', float('inf'))
     consume_drugs_time_remaining = all_timers.get('consume_drugs_time_remaining', float('inf'))
 
@@ -516,7 +587,7 @@ while True:
         # Auto Promo logic
         if enabled_configs['do_auto_promo_enabled'] and promo_check_time_remaining <= 0:
             print(f"Auto Promo timer ({promo_check_time_remaining:.2f}s) is ready. Attempting auto-promotion...")
-            if take_promotion():
+            if _run_task("Auto Promo", take_promotion):
                 action_performed_in_cycle = True
 
         if perform_critical_checks(character_name):
@@ -525,7 +596,7 @@ while True:
         # Diligent Worker Logic
         if enabled_configs['do_diligent_worker_enabled'] and skill_time_remaining <= 0:
             print(f"Skill timer ({skill_time_remaining:.2f}s) is ready. Attempting Diligent Worker.")
-            if diligent_worker(character_name, which_player=None):
+            if _run_task("Diligent Worker", diligent_worker, character_name, which_player=None):
                 action_performed_in_cycle = True
             else:
                 print("Dilligent Worker logic did not perform an action or failed. Setting fallback cooldown.")
@@ -533,7 +604,7 @@ while True:
         # Earn logic
         if enabled_configs['do_earns_enabled'] and earn_time_remaining <= 0:
             print(f"Earn timer ({earn_time_remaining:.2f}s) is ready. Attempting earn.")
-            if execute_earns_logic():
+            if _run_task("Earn", execute_earns_logic, initial_player_data):
                 action_performed_in_cycle = True
             else:
                 print("Earns logic did not perform an action or failed. Setting fallback cooldown.")
@@ -544,7 +615,7 @@ while True:
         # Yellow pages scan logic
         if yellow_pages_scan_time_remaining <= 0:
             print(f"Yellow Pages Scan timer ({yellow_pages_scan_time_remaining:.2f}s) is ready. Attempting scan.")
-            if execute_yellow_pages_scan():
+            if _run_task("Yellow Pages Scan", execute_yellow_pages_scan):
                 action_performed_in_cycle = True
             else:
                 print("Yellow Pages Scan logic did not perform an action or failed. No immediate cooldown from here.")
@@ -555,7 +626,7 @@ while True:
         # Funeral Parlour scan logic
         if funeral_parlour_scan_time_remaining <= 0:
             print(f"Funeral Parlour Scan timer ({funeral_parlour_scan_time_remaining:.2f}s) is ready. Attempting scan.")
-            if execute_funeral_parlour_scan():
+            if _run_task("Funeral Parlour Scan", execute_funeral_parlour_scan):
                 action_performed_in_cycle = True
             else:
                 print("Funeral Parlour Scan logic did not perform an action or failed. No immediate cooldown from here.")
@@ -567,7 +638,7 @@ while True:
         queued_cs = community_service_queue_count()
         if queued_cs > 0 and action_time_remaining <= 0:
             print(f"Mandatory Community Service queued ({queued_cs}). Attempting 1 now.")
-            if community_services(initial_player_data):
+            if _run_task("Community Service (queued)", community_services, initial_player_data):
                 if dequeue_community_service():
                     print(f"Completed 1 queued Community Service. Remaining: {community_service_queue_count()}")
                 action_performed_in_cycle = True
@@ -577,7 +648,7 @@ while True:
         # Community Service Logic
         if enabled_configs['do_community_services_enabled'] and action_time_remaining <= 0:
             print(f"Community Service timer ({action_time_remaining:.2f}s) is ready. Attempting CS.")
-            if community_services(initial_player_data):
+            if _run_task("Community Service", community_services, initial_player_data):
                 action_performed_in_cycle = True
             else:
                 print("Community Service logic did not perform an action or failed. Setting fallback cooldown.")
@@ -588,7 +659,7 @@ while True:
         # Firefighter duties Logic
         if enabled_configs['do_firefighter_duties_enabled'] and action_time_remaining <= 0:
             print(f"Firefighter duties timer ({action_time_remaining:.2f}s) is ready. Attempting to do duties   .")
-            if fire_duties():
+            if _run_task("Firefighter Duties", fire_duties):
                 action_performed_in_cycle = True
             else:
                 print("Firefighter duties logic did not perform an action or failed. Setting fallback cooldown.")
@@ -599,7 +670,7 @@ while True:
         # Study Degrees Logic
         if enabled_configs['do_university_degrees_enabled'] and location == home_city and action_time_remaining <= 0:
             print(f"Study Degree timer ({action_time_remaining:.2f}s) is ready. Attempting Study Degree.")
-            if study_degrees():
+            if _run_task("Study Degrees", study_degrees):
                 action_performed_in_cycle = True
             else:
                 print("Study Degree logic did not perform an action or failed. Setting fallback cooldown.")
@@ -624,7 +695,7 @@ while True:
 
             func = training_map.get(training_type)
             if func:
-                func()
+                _run_task(f"Training ({training_type})", func)
                 action_performed_in_cycle = True
             else:
                 print(f"WARNING: Unknown training type '{training_type}' specified in settings.ini.")
@@ -636,7 +707,7 @@ while True:
         if enabled_configs['do_manufacture_drugs_enabled'] and occupation == "Gangster":
             if action_time_remaining <= 0:
                 print(f"Manufacture Drugs timer ({action_time_remaining:.2f}s) is ready. Attempting manufacture.")
-                if manufacture_drugs(initial_player_data):
+                if _run_task("Manufacture Drugs", manufacture_drugs, initial_player_data):
                     action_performed_in_cycle = True
                 else:
                     print("Manufacture Drugs logic did not perform an action or failed. Setting fallback cooldown.")
@@ -682,7 +753,7 @@ while True:
 
             # Execute if any path above marked it ready
             if should_attempt_aggravated_crime:
-                if execute_aggravated_crime_logic(initial_player_data):
+                if _run_task("Aggravated Crime", execute_aggravated_crime_logic, initial_player_data):
                     action_performed_in_cycle = True
                 else:
                     print("Aggravated Crime logic did not perform an action or failed. No immediate cooldown from here.")
@@ -691,7 +762,7 @@ while True:
             continue
 
         # Deposit and withdraw excess money logic
-        if clean_money_on_hand_logic(initial_player_data):
+        if _run_task("Money On Hand", clean_money_on_hand_logic, initial_player_data):
             action_performed_in_cycle = True
         else:
             print("Checking clean money on hand - Amount is within limits.")
@@ -702,7 +773,7 @@ while True:
         # Do event logic
         if enabled_configs['do_event_enabled'] and event_time_remaining <= 0:
             print(f"Event timer ({event_time_remaining:.2f}s) is ready. Attempting the event.")
-            if do_events():
+            if _run_task("Event", do_events):
                 action_performed_in_cycle = True
             else:
                 print("Event logic did not perform an action or failed.")
@@ -710,34 +781,19 @@ while True:
         if perform_critical_checks(character_name):
             continue
 
-        # Do Weapon Shop Logic
-        if enabled_configs['do_weapon_shop_check_enabled'] and check_weapon_shop_time_remaining <= 0:
-            print(f"Weapon Shop timer ({check_weapon_shop_time_remaining:.2f}s) is ready. Attempting check now.")
-            if check_weapon_shop(initial_player_data):
+        # Do City Shop Sweep Logic (Weapon Shop, Drug Store, Bionics in one pass)
+        sweep_shops = [shop for shop, key in (("Weapon Shop", 'do_weapon_shop_check_enabled'),
+                                              ("Drug Store", 'do_drug_store_enabled'),
+                                              ("Bionics Shop", 'do_bionics_shop_check_enabled')) if enabled_configs[key]]
+        if sweep_shops and shop_sweep_time_remaining <= 0:
+            print(f"Shop sweep timer ({shop_sweep_time_remaining:.2f}s) is ready. Sweeping: {', '.join(sweep_shops)}.")
+            if _run_task("Shop Sweep", sweep_city_shops, sweep_shops, city=location):
                 action_performed_in_cycle = True
 
         # Do Consume Drugs Logic
         if enabled_configs.get('do_consume_drugs_enabled') and consume_drugs_time_remaining <= 0:
             print(f"Consume Drugs timer ({consume_drugs_time_remaining:.2f}s) is ready. Attempting consume/earn loop now.")
-            if consume_drugs():
-                action_performed_in_cycle = True
-
-        if perform_critical_checks(character_name):
-            continue
-
-        # Do Bionics Shop Logic
-        if enabled_configs['do_bionics_shop_check_enabled'] and check_bionics_store_time_remaining <= 0:
-            print(f"Bionics Shop timer ({check_bionics_store_time_remaining:.2f}s) is ready. Attempting check now.")
-            if check_bionics_shop(initial_player_data):
-                action_performed_in_cycle = True
-
-        if perform_critical_checks(character_name):
-            continue
-
-        # Do Drug Store Check Logic
-        if enabled_configs['do_drug_store_enabled'] and check_drug_store_time_remaining <= 0:
-            print(f"Drug Store timer ({check_drug_store_time_remaining:.2f}s) is ready. Attempting to check Drug Store.")
-            if check_drug_store(initial_player_data):
+            if _run_task("Consume Drugs", consume_drugs):
                 action_performed_in_cycle = True
 
         if perform_critical_checks(character_name):
@@ -746,7 +802,7 @@ while True:
         # Do Gym Train Logic
         if enabled_configs['do_gym_trains_enabled'] and gym_trains_time_remaining <= 0:
             print(f"Gym trains timer ({gym_trains_time_remaining:.2f}s) is ready. Attempting Gym trains.")
-            if gym_training():
+            if _run_task("Gym Trains", gym_training):
                 action_performed_in_cycle = True
 
         if perform_critical_checks(character_name):
@@ -755,7 +811,7 @@ while True:
         # Judge Casework Logic
         if enabled_configs['do_judge_cases_enabled'] and case_time_remaining <= 0:
             print(f"Judge Casework timer ({case_time_remaining:.2f}s) is ready. Attempting judge cases.")
-            if judge_casework(initial_player_data):
+            if _run_task("Judge Casework", judge_casework, initial_player_data):
                 action_performed_in_cycle = True
 
         if perform_critical_checks(character_name):
@@ -764,7 +820,7 @@ while True:
         # Do Lawyer case work logic
         if occupation == "Lawyer" and case_time_remaining <= 0:
             print(f"Lawyer Casework timer ({case_time_remaining:.2f}s) is ready. Attempting lawyer cases.")
-            if lawyer_casework():
+            if _run_task("Lawyer Casework", lawyer_casework):
                 action_performed_in_cycle = True
 
         if perform_critical_checks(character_name):
@@ -773,7 +829,7 @@ while True:
         # Medical Casework Logic
         if occupation in ("Nurse", "Doctor", "Surgeon", "Hospital Director") and case_time_remaining <= 0:
             print(f"Medical Casework timer ({case_time_remaining:.2f}s) is ready. Attempting medical cases.")
-            if medical_casework(initial_player_data):
+            if _run_task("Medical Casework", medical_casework, initial_player_data):
                 action_performed_in_cycle = True
 
         if perform_critical_checks(character_name):
@@ -782,7 +838,7 @@ while True:
         # Police Casework Logic
         if enabled_configs['do_police_cases_enabled'] and occupation in ["Police Officer"] and location == home_city and case_time_remaining <= 0:
             print(f"Police case timer ({case_time_remaining:.2f}s) is ready. Attempting to do Police Cases")
-            if prepare_police_cases(character_name):
+            if _run_task("Police Casework", prepare_police_cases, character_name):
                 action_performed_in_cycle = True
 
         if perform_critical_checks(character_name):
@@ -791,7 +847,7 @@ while True:
         # Post 911 Logic
         if enabled_configs['do_post_911_enabled'] and occupation in ["Police Officer"] and location == home_city and post_911_time_remaining <= 0:
             print(f"Post 911 timer ({post_911_time_remaining:.2f}s) is ready. Attempting to post 911")
-            if police_911():
+            if _run_task("Post 911", police_911):
                 action_performed_in_cycle = True
 
         if perform_critical_checks(character_name):
@@ -800,7 +856,7 @@ while True:
         # Firefighter Casework Logic
         if occupation in ("Volunteer Fire Fighter", "Fire Fighter", "Fire Chief") and case_time_remaining <= 0:
             print(f"Fire Fighter Casework timer ({case_time_remaining:.2f}s) is ready. Attempting Fire Fighter cases.")
-            if fire_casework(initial_player_data):
+            if _run_task("Fire Casework", fire_casework, initial_player_data):
                 action_performed_in_cycle = True
 
         if perform_critical_checks(character_name):
@@ -810,7 +866,7 @@ while True:
         if occupation in ("Bank Teller", "Loan Officer", "Bank Manager") and case_time_remaining <= 0:
             if location == home_city:
                 print(f"Bank Casework timer ({case_time_remaining:.2f}s) is ready. Attempting bank cases.")
-                if banker_laundering():
+                if _run_task("Bank Casework", banker_laundering):
                     action_performed_in_cycle = True
             else:
                 print(f"Skipping Bank Casework: Not in home city. Location: {location}, Home City: {home_city}.")
@@ -823,7 +879,7 @@ while True:
         if ('customs' in (occupation or '').lower()) and location == home_city and queue_count > 0:
             if trafficking_time_remaining <= 0:
                 print(f"Blind Eye queued ({queue_count}) and Trafficking timer ({trafficking_time_remaining:.2f}s) is ready. Attempting Blind Eye.")
-                if customs_blind_eyes():
+                if _run_task("Blind Eye", customs_blind_eyes):
                     action_performed_in_cycle = True
             else:
                 print(f"Blind Eye queued ({queue_count}), but Trafficking timer not ready ({trafficking_time_remaining:.2f}s).")
@@ -832,7 +888,7 @@ while True:
         if enabled_configs['do_bank_add_clients_enabled']:
             if bank_add_clients_time_remaining <= 0:
                 print(f"Add Clients timer ({bank_add_clients_time_remaining:.2f}s) is ready. Attempting to add new clients.")
-                if banker_add_clients(initial_player_data):
+                if _run_task("Bank Add Clients", banker_add_clients, initial_player_data):
                     action_performed_in_cycle = True
 
         if perform_critical_checks(character_name):
@@ -841,7 +897,7 @@ while True:
         # Engineering Casework Logic
         if occupation in ("Mechanic", "Technician", "Engineer", "Chief Engineer") and case_time_remaining <= 0:
             print(f"Engineering Casework timer ({case_time_remaining:.2f}s) is ready. Attempting engineering cases.")
-            if engineering_casework(initial_player_data):
+            if _run_task("Engineering Casework", engineering_casework, initial_player_data):
                 action_performed_in_cycle = True
 
         if perform_critical_checks(character_name):
@@ -851,7 +907,7 @@ while True:
         current_unread_messages = get_unread_message_count()
 
         if current_unread_messages > 0:
-            read_and_send_new_messages()
+            _run_task("Messages", read_and_send_new_messages)
             global_vars._last_unread_message_count = get_unread_message_count()
             action_performed_in_cycle = True
 
@@ -862,7 +918,7 @@ while True:
         current_unread_journals = get_unread_journal_count()
 
         if current_unread_journals > 0:
-            if process_unread_journal_entries(initial_player_data):
+            if _run_task("Journals", process_unread_journal_entries, initial_player_data):
                 action_performed_in_cycle = True
             global_vars._last_unread_journal_count = get_unread_journal_count()
 
@@ -879,7 +935,7 @@ while True:
                 global_vars._script_launder_cooldown_end_time = datetime.datetime.now() + datetime.timedelta(seconds=random.uniform(100, 200))
             elif launder_time_remaining <= 0:
                 print(f"Launder timer ({launder_time_remaining:.2f}s) is ready. Attempting launder.")
-                if laundering(initial_player_data):
+                if _run_task("Launder", laundering, initial_player_data):
                     action_performed_in_cycle = True
                 else:
                     print("Launder logic did not perform an action or failed. Setting fallback cooldown.")
@@ -890,7 +946,8 @@ while True:
     # --- Re-fetch all game timers just before determining sleep duration ---
     all_timers = get_all_active_game_timers()
 
-    # --- Return to the resting page if drifted ---
+    # --- Return to the resting page if drifted (the one return trip per cycle, right before sleeping) ---
+    page_context.end_cycle()
     resting_page_url = global_vars.config.get('Auth', 'RestingPage', fallback='').strip()
 
     if resting_page_url:
@@ -914,6 +971,18 @@ while True:
     # --- Determine the total sleep duration ---
     total_sleep_duration = _determine_sleep_duration(action_performed_in_cycle, {**all_timers, 'occupation': occupation, 'location': location, 'home_city': home_city}, enabled_configs, next_rank_pct)
 
+    lock_stats = global_vars.DRIVER_LOCK.stats_snapshot()
+    _write_json_file(global_vars.DRIVER_LOCK_STATS_FILE, lock_stats)
+    metrics_server.set_lock_stats(lock_stats)
+    metrics_server.set_queue_depths({"bank_transfers": pending_transfer_count(),
+                                     "blind_eye": blind_eye_queue_count(),
+                                     "community_service": community_service_queue_count()})
+    save_selector_stats()
+    command_trace.save_trace_summary()
+    browser_health.sample_steady_memory()
+    metrics_server.set_timers(all_timers)
+    metrics_server.observe_cycle(time.perf_counter() - cycle_started, global_vars.WEBDRIVER_COMMAND_COUNT - cycle_commands_before)
+
     print(f"Sleeping for {total_sleep_duration:.2f} seconds...")
     time.sleep(total_sleep_duration)
 
@@ -6,11 +6,15 @@ from selenium.common import NoSuchElementException, TimeoutException
 from selenium.webdriver.support import expected_conditions as ec
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.select import Select
-from database_functions import _read_json_file, get_player_cooldown, set_player_data, _set_last_timestamp, remove_player_cooldown
+from database_functions import record_event, _read_json_file, get_player_cooldown, set_player_data, _set_last_timestamp, bury_players, \
+    apply_yellow_pages_diff, get_cached_business_owner, cache_business_owners, invalidate_business_owner
 import global_vars
+import page_context
 from helper_functions import _navigate_to_page_via_menu, _find_and_click, _find_and_send_keys, _get_element_text, \
-    _find_element, community_service_queue_count, _get_element_text_quiet, enqueue_community_services
+    _find_element, community_service_queue_count, _get_element_text_quiet, enqueue_community_services, fill_form
 from misc_functions import transfer_money
+from bank_ops import queue_transfer, register_transfer_handler
+from outcome_classifier import classify
 from timer_functions import parse_game_datetime
 from comms_journals import send_discord_notification
 
@@ -30,8 +34,7 @@ def execute_funeral_parlour_scan():
     if closed_message_element:
         print("Funeral Parlour is currently closed for repairs. Resetting scan timer.")
         _set_last_timestamp(global_vars.FUNERAL_PARLOUR_LAST_SCAN_FILE, datetime.datetime.now())
-        global_vars.driver.get(initial_url)
-        time.sleep(global_vars.ACTION_PAUSE_SECONDS)
+        page_context.return_to(initial_url, "Funeral Parlour scan")
         return True
 
     if not _find_and_click(By.XPATH, "//a[normalize-space()='View Daily Obituaries']", pause=global_vars.ACTION_PAUSE_SECONDS * 2):
@@ -42,8 +45,7 @@ def execute_funeral_parlour_scan():
         # Treat as a successful scan—set normal cooldown via timestamp and exit.
         print("Obituary table not found; treating as successful scan and setting cooldown.")
         _set_last_timestamp(global_vars.FUNERAL_PARLOUR_LAST_SCAN_FILE, datetime.datetime.now())
-        global_vars.driver.get(initial_url)
-        time.sleep(global_vars.ACTION_PAUSE_SECONDS)
+        page_context.return_to(initial_url, "Funeral Parlour scan")
         return True
 
     rows = obituary_table.find_elements(By.TAG_NAME, "tr")[1:]
@@ -55,16 +57,17 @@ def execute_funeral_parlour_scan():
         except NoSuchElementException:
             continue
     if deceased_players:
-        for player_name in deceased_players:
-            remove_player_cooldown(player_name)
+        bury_players(deceased_players, "obituaries")
 
     _set_last_timestamp(global_vars.FUNERAL_PARLOUR_LAST_SCAN_FILE, datetime.datetime.now())
-    global_vars.driver.get(initial_url)
-    time.sleep(global_vars.ACTION_PAUSE_SECONDS)
+    page_context.return_to(initial_url, "Funeral Parlour scan")
     return True
 
 def execute_yellow_pages_scan():
-    """Performs the Yellow Pages scan operation and adds player data to the database."""
+    """
+    Performs the Yellow Pages scan and applies only the differences to the player database.
+    Listed players are stamped with the scan generation and last-seen time, and churn is reported per occupation.
+    """
     print("\n--- Starting Yellow Pages Scan ---")
     initial_url = global_vars.driver.current_url
 
@@ -85,8 +88,14 @@ def execute_yellow_pages_scan():
     results_table_xpath = "//*[@id='content']/center/div/div[2]/table"
 
     total_players_scanned = 0
+    listings = {}
+    scanned_occupations = []
+    public_owners = {}
+    businesses_by_owner_occupation = _public_businesses_by_owner_occupation()
 
     for occupation in occupations:
+        # Each occupation is a natural break point; the loop re-navigates to Yellow Pages if a queued job moved us
+        global_vars.DRIVER_LOCK.yield_to_waiters()
         print(f"Scanning occupation: {occupation}...")
         try:
             if "yellowpages.asp" not in global_vars.driver.current_url:
@@ -115,7 +124,10 @@ def execute_yellow_pages_scan():
                     try:
                         player_name = row.find_element(By.XPATH, ".//td[1]/a").text.strip()
                         player_city = row.find_element(By.XPATH, ".//td[4]").text.strip()
-                        set_player_data(player_name, home_city=player_city)
+                        listings[player_name] = (player_city, occupation)
+                        player_occupation = row.find_element(By.XPATH, ".//td[2]").text.strip().lower()
+                        for business in businesses_by_owner_occupation.get(player_occupation, []):
+                            public_owners.setdefault((player_city, business), player_name)
                         total_players_scanned += 1
                         players_found_in_occupation += 1
                     except NoSuchElementException:
@@ -123,11 +135,14 @@ def execute_yellow_pages_scan():
                         continue
                 print(f"Scanned {players_found_in_occupation} players in {occupation}.")
             else:
+                # Could be a slow load as much as an empty listing, so the occupation doesn't count as scanned
                 print(f"No results table found for occupation '{occupation}'.")
 
             global_vars.driver.back()
             time.sleep(global_vars.ACTION_PAUSE_SECONDS * 2)
             global_vars.wait.until(ec.presence_of_element_located((By.XPATH, search_input_xpath)))
+            if results_table:
+                scanned_occupations.append(occupation)
         except Exception as e:
             print(f"Error during scan for occupation '{occupation}': {e}. Attempting recovery.")
             if not _navigate_to_page_via_menu(
@@ -137,10 +152,18 @@ def execute_yellow_pages_scan():
                 print(f"CRITICAL FAILED: Failed to recover navigation for {occupation}. Stopping scan.")
                 return False
 
+    complete = len(scanned_occupations) == len(occupations)
+    if not complete:
+        print(f"WARNING: Only {len(scanned_occupations)}/{len(occupations)} occupations scanned. Departures will not be applied this run.")
+    generation, churn = apply_yellow_pages_diff(listings, scanned_occupations, complete)
+    cache_business_owners(public_owners)
+    for occupation, counts in churn.items():
+        if counts['new'] or counts['moved'] or counts['gone']:
+            print(f"YP churn {occupation}: {counts['listed']} listed, {counts['new']} new, {counts['moved']} moved city, {counts['gone']} gone.")
+
     _set_last_timestamp(global_vars.YELLOW_PAGES_LAST_SCAN_FILE, datetime.datetime.now())
-    print(f"Yellow Pages Scan Completed. Total players scanned: {total_players_scanned}.")
-    global_vars.driver.get(initial_url)
-    time.sleep(global_vars.ACTION_PAUSE_SECONDS)
+    print(f"Yellow Pages Scan Completed (generation {generation}). Total players scanned: {total_players_scanned}.")
+    page_context.return_to(initial_url, "Yellow Pages scan")
     return True
 
 def log_aggravated_event(crime_type, target, status, amount):
@@ -154,6 +177,11 @@ def log_aggravated_event(crime_type, target, status, amount):
     except Exception as e:
         print(f"Error writing to aggravated crimes log file: {e}")
 
+    # Ledger amounts are money gained (+) or spent (-). A torch's figure is the victim's damage, not income.
+    ok = status.startswith("Success") or status.startswith("Repaid Successfully")
+    ledger_amount = -amount if crime_type == "Repay" else (0 if crime_type == "Torch" else amount)
+    record_event(crime_type, status, ok=ok, target=target, amount=ledger_amount if ok else 0)
+
 def _open_aggravated_crime_page(crime_type):
     """
     Navigates to the specified aggravated crime page (Hack, Pickpocket, Armed Robbery, or Torch).
@@ -196,38 +224,28 @@ def _open_aggravated_crime_page(crime_type):
     print(f"Successfully opened {crime_type}.")
     return True
 
-def _repay_player(player_name, amount):
-    """Navigates to the bank transfer page and repays the specified amount to the player."""
-    print(f"Attempting to repay {player_name} with ${amount}.")
-    if not _navigate_to_page_via_menu(
-            "//span[@class='income']",
-            "//td[@class='toolitem']//a[normalize-space()='Bank']",
-            "Bank Page"):
-        log_aggravated_event("Repay", player_name, "Failed (Navigate Bank)", amount)
-        return False
+def _on_repay_attempted(job, ok):
+    """Logs a queued repayment once attempted; a failed one invalidates the cached business owner it was sent to."""
+    log_aggravated_event("Repay", job["recipient"], "Repaid Successfully" if ok else "Failed (Transfer)", job["amount"])
+    owner_key = job.get("business_owner")
+    if not ok and owner_key:
+        # Owner may have changed or died; force a fresh lookup next time
+        invalidate_business_owner(*owner_key)
 
-    if not _find_and_click(By.XPATH, "//a[normalize-space()='Transfers']"):
-        log_aggravated_event("Repay", player_name, "Failed (Navigate Transfers)", amount)
-        return False
 
-    if not _find_and_send_keys(By.XPATH, "//input[@name='transferamount']", str(amount)):
-        log_aggravated_event("Repay", player_name, "Failed (Enter Amount)", amount)
-        return False
-    if not _find_and_send_keys(By.XPATH, "//input[@name='transfername']", player_name):
-        log_aggravated_event("Repay", player_name, "Failed (Enter Recipient)", amount)
-        return False
+register_transfer_handler("repay", _on_repay_attempted)
 
-    if not _find_and_click(By.XPATH, "//input[@id='B1']", pause=global_vars.ACTION_PAUSE_SECONDS * 2):
-        log_aggravated_event("Repay", player_name, "Failed (Click Transfer)", amount)
-        return False
 
-    confirmation_message = _get_element_text(By.XPATH, "/html/body/div[4]/div[4]/div[1]")
-    if confirmation_message:
-        log_aggravated_event("Repay", player_name, "Repaid Successfully", amount)
-        return True
-    else:
-        log_aggravated_event("Repay", player_name, "Repaid Successfully (No Conf. Message)", amount)
-        return True
+def _repay_player(player_name, amount, business_owner=None):
+    """
+    Queues a repayment transfer to the player. It goes out with the next Bank visit (at the latest the
+    Money On Hand visit this cycle) and is logged once attempted. business_owner=(city, business) marks a
+    business repayment whose cached owner is invalidated if the transfer fails.
+    Returns True once queued; the outcome is only known after the Bank visit.
+    """
+    print(f"Queueing repayment of ${amount} to {player_name}.")
+    queue_transfer(amount, player_name, kind="repay", business_owner=list(business_owner) if business_owner else None)
+    return True
 
 def _get_suitable_crime_target(my_home_city, character_name, excluded_players, cooldown_key):
     """Retrieves a suitable player from the local database for a crime."""
@@ -241,6 +259,8 @@ def _get_suitable_crime_target(my_home_city, character_name, excluded_players, c
             continue
 
         player_data = data.get(player_id, {})
+        if player_data.get(global_vars.PLAYER_YP_DEPARTED_KEY):
+            continue
         target_home_city = player_data.get(global_vars.PLAYER_HOME_CITY_KEY)
 
         is_city_match = (cooldown_key == global_vars.MAJOR_CRIME_COOLDOWN_KEY and target_home_city == my_home_city) or \
@@ -284,9 +304,17 @@ def _get_suitable_pickpocket_target_online(character_name, excluded_players):
         return available_players[0]
     return None
 
-def _get_business_owner_via_business_page(business_name):
+def _public_businesses_by_owner_occupation():
+    """Reverse of PUBLIC_BUSINESS_OCCUPATION_MAP: owner occupation (lowercase) -> list of public businesses."""
+    reverse = {}
+    for business, occupation in global_vars.PUBLIC_BUSINESS_OCCUPATION_MAP.items():
+        reverse.setdefault(occupation.lower(), []).append(business)
+    return reverse
+
+def _get_business_owner_via_business_page(business_name, current_city=None):
     """
     Navigates directly to the Businesses page, finds the specified business, and extracts its owner.
+    The whole table is parsed in one script call and every owner is cached for current_city.
     Returns owner name or None if not found or "Administrator".
     """
     print(f"Searching for owner of '{business_name}' via Businesses page.")
@@ -302,24 +330,32 @@ def _get_business_owner_via_business_page(business_name):
         print("No businesses table found on Businesses page.")
         return None
 
-    rows = businesses_table.find_elements(By.TAG_NAME, "tr")
-    for row in rows[1:]:
-        try:
-            current_business_name_element = row.find_element(By.XPATH, ".//td[1]")
-            current_business_name = current_business_name_element.text.strip()
-            if current_business_name.lower() == business_name.lower():
-                owner_element = row.find_element(By.XPATH, ".//td[2]/b/a")
-                owner_name = owner_element.text.strip()
-                if owner_name.lower() == "administrator":
-                    print(f"Business '{business_name}' is owned by Administrator. No repayment needed.")
-                    return None
-                print(f"Found owner for '{business_name}': {owner_name}")
-                return owner_name
-        except NoSuchElementException:
-            continue
-        except Exception as e:
-            print(f"Error parsing business row: {e}")
-            continue
+    try:
+        table_rows = global_vars.driver.execute_script("""
+            var rows = arguments[0].getElementsByTagName('tr');
+            var out = [];
+            for (var i = 1; i < rows.length; i++) {
+                var cells = rows[i].getElementsByTagName('td');
+                if (cells.length < 2) continue;
+                var owner = cells[1].querySelector('b a');
+                out.push([(cells[0].innerText || '').trim(), owner ? (owner.innerText || '').trim() : '']);
+            }
+            return out;
+        """, businesses_table) or []
+    except Exception as e:
+        print(f"Error parsing businesses table: {e}")
+        return None
+
+    if current_city:
+        cache_business_owners({(current_city, name): owner for name, owner in table_rows if name and owner})
+
+    for current_business_name, owner_name in table_rows:
+        if current_business_name.lower() == business_name.lower() and owner_name:
+            if owner_name.lower() == "administrator":
+                print(f"Business '{business_name}' is owned by Administrator. No repayment needed.")
+                return None
+            print(f"Found owner for '{business_name}': {owner_name}")
+            return owner_name
 
     print(f"Owner for business '{business_name}' not found on Businesses page.")
     return None
@@ -338,10 +374,18 @@ def _get_business_owner_and_repay(business_name, amount_stolen, player_data):
         # Remove leading punctuation or space (e.g., 'Weapon Shop' from 'auckland weapon shop')
         business_name = re.sub(r"^[\s:,\.\-]+", "", business_name)
 
+    # Cached owner from an earlier Businesses page / Yellow Pages parse
+    cache_hit, owner_name = get_cached_business_owner(current_location, business_name)
+    if cache_hit:
+        print(f"Using cached owner for '{business_name}' in {current_location}: {owner_name or 'Administrator'}")
+        if not owner_name:
+            print(f"Business '{business_name}' is owned by Administrator. No repayment needed.")
+            return False
+
     # Check private businesses
-    if any(business_name.lower() in [b.lower() for b in city_businesses] for city_businesses in global_vars.private_businesses.values()):
+    elif any(business_name.lower() in [b.lower() for b in city_businesses] for city_businesses in global_vars.private_businesses.values()):
         print(f"Attempting to get owner for private business: {business_name}")
-        owner_name = _get_business_owner_via_business_page(business_name)
+        owner_name = _get_business_owner_via_business_page(business_name, current_location)
     else:
         # Check public business via Yellow Pages
         search_occupation = global_vars.PUBLIC_BUSINESS_OCCUPATION_MAP.get(business_name.lower())
@@ -352,13 +396,10 @@ def _get_business_owner_and_repay(business_name, amount_stolen, player_data):
             print(f"Business '{business_name}' not recognized for direct owner lookup or current location unknown. Skipping owner search.")
 
     if owner_name:
-        print(f"Owner found for '{business_name}': {owner_name}. Attempting repayment.")
-        if _repay_player(owner_name, amount_stolen):
-            print(f"Successfully repaid ${amount_stolen} to {owner_name} for '{business_name}'.")
-            return True
-        else:
-            print(f"FAILED to repay ${amount_stolen} to {owner_name} for '{business_name}'.")
-            return False
+        print(f"Owner found for '{business_name}': {owner_name}. Queueing repayment.")
+        _repay_player(owner_name, amount_stolen, business_owner=(current_location, business_name))
+        print(f"Repayment of ${amount_stolen} to {owner_name} for '{business_name}' queued.")
+        return True
     else:
         print(f"No owner found for '{business_name}' or repayment not applicable. Skipping repayment.")
         return False
@@ -645,42 +686,42 @@ def _perform_pickpocket_attempt(target_player_name, min_steal, max_steal):
         return 'general_error', target_player_name, None
 
     now = datetime.datetime.now()
+    result = classify("pickpocket", result_text)
 
-    if "try them again later" in result_text or "recently survived an aggravated crime" in result_text:
+    if result.outcome == "cooldown_target":
         set_player_data(target_player_name, global_vars.MINOR_CRIME_COOLDOWN_KEY, now + datetime.timedelta(minutes=3))
         return 'cooldown_target', target_player_name, None
 
-    if "must be online" in result_text:
+    if result.outcome == "not_online":
         print(f"Target '{target_player_name}' is not online. Skipping pickpocketing.")
         return 'not_online', target_player_name, None
 
-    if "The name you typed in doesn't exist!" in result_text:
+    if result.outcome == "non_existent_target":
         print(f"INFO: Target '{target_player_name}' does not exist.")
-        set_player_data(target_player_name, global_vars.MINOR_CRIME_COOLDOWN_KEY, now + datetime.timedelta(minutes=15))
+        bury_players([target_player_name], "crime result")
         return 'non_existent_target', target_player_name, None
 
-    if "The victim must be in the same city as you!" in result_text:
+    if result.outcome == "wrong_city":
         print(f"INFO: Target '{target_player_name}' is not in the same city.")
         set_player_data(target_player_name, global_vars.MINOR_CRIME_COOLDOWN_KEY, now + datetime.timedelta(minutes=30))
         return 'wrong_city', target_player_name, None
 
-    if f"You pickpocketed" in result_text and "for $" in result_text:
-        try:
-            stolen_name_match = result_text.split("You pickpocketed ")[1].split(" for $")[0].strip()
-            stolen_amount_str = result_text.split(" for $")[1].split("!")[0].strip()
-            stolen_actual_amount = int(''.join(filter(str.isdigit, stolen_amount_str)))
-
-            set_player_data(stolen_name_match, global_vars.MINOR_CRIME_COOLDOWN_KEY, now + datetime.timedelta(hours=1, minutes=10))
-            global_vars.pickpocketed_player_for_repay = stolen_name_match
-            global_vars.pickpocketed_amount_for_repay = stolen_actual_amount
-            global_vars.pickpocket_successful = True
-            log_aggravated_event(crime_type, stolen_name_match, "Success", stolen_actual_amount)
-            return 'success', stolen_name_match, stolen_actual_amount
-        except Exception:
-            log_aggravated_event(crime_type, target_player_name, "Script Error (Parse Success)", 0)
-            return 'general_error', target_player_name, None
-
-    if "and failed!" in result_text:
+    if result.outcome == "success" and result.name and result.amount is not None:
+        stolen_name_match = result.name
+        stolen_actual_amount = result.amount
+
+        set_player_data(stolen_name_match, global_vars.MINOR_CRIME_COOLDOWN_KEY, now + datetime.timedelta(hours=1, minutes=10))
+        global_vars.pickpocketed_player_for_repay = stolen_name_match
+        global_vars.pickpocketed_amount_for_repay = stolen_actual_amount
+        global_vars.pickpocket_successful = True
+        log_aggravated_event(crime_type, stolen_name_match, "Success", stolen_actual_amount)
+        return 'success', stolen_name_match, stolen_actual_amount
+
+    if result.outcome in ("success", "success_unparsed"):
+        log_aggravated_event(crime_type, target_player_name, "Script Error (Parse Success)", 0)
+        return 'general_error', target_player_name, None
+
+    if result.outcome == "failed_attempt":
         set_player_data(target_player_name, global_vars.MINOR_CRIME_COOLDOWN_KEY, now + datetime.timedelta(hours=1, minutes=10))
         log_aggravated_event(crime_type, target_player_name, "Failed", 0)
         return 'failed_attempt', target_player_name, None
@@ -701,31 +742,30 @@ def _perform_hack_attempt(target_player_name, min_steal, max_steal, retried_targ
     steal_amount = random.randint(min_steal, max_steal)
     crime_type = "Hack"
 
-    if not _find_and_send_keys(By.XPATH, "//input[@name='hack']", target_player_name):
-        return 'general_error', target_player_name, None
-    if not _find_and_send_keys(By.XPATH, "//input[@name='cap']", str(steal_amount)):
-        return 'general_error', target_player_name, None
-
-    if not _find_and_click(By.XPATH, "//input[@name='B1']", pause=global_vars.ACTION_PAUSE_SECONDS * 2):
+    ok, result_text = fill_form({(By.XPATH, "//input[@name='hack']"): target_player_name,
+                                 (By.XPATH, "//input[@name='cap']"): steal_amount},
+                                submit=(By.XPATH, "//input[@name='B1']"),
+                                outcome=(By.XPATH, "/html/body/div[4]/div[4]/div[1]"))
+    if not ok:
         return 'general_error', target_player_name, None
 
-    result_text = _get_element_text(By.XPATH, "/html/body/div[4]/div[4]/div[1]")
     if not result_text:
         log_aggravated_event(crime_type, target_player_name, "Script Error (No Result Msg)", 0)
         return 'general_error', target_player_name, None
 
     now = datetime.datetime.now()
+    result = classify("hack", result_text)
 
-    if "try them again later" in result_text or "recently survived an aggravated crime" in result_text:
+    if result.outcome == "cooldown_target":
         set_player_data(target_player_name, global_vars.MAJOR_CRIME_COOLDOWN_KEY, now + datetime.timedelta(minutes=3))
         return 'cooldown_target', target_player_name, None
 
-    if "The name you typed in doesn't exist!" in result_text:
+    if result.outcome == "non_existent_target":
         print(f"INFO: Target '{target_player_name}' does not exist.")
-        set_player_data(target_player_name, global_vars.MAJOR_CRIME_COOLDOWN_KEY, now + datetime.timedelta(minutes=30))
+        bury_players([target_player_name], "crime result")
         return 'non_existent_target', target_player_name, None
 
-    if "no money in their account" in result_text:
+    if result.outcome == "no_money":
         # Allow the transfer+retry only once per target (for this cycle)
         if target_player_name in retried_targets:
             print(
@@ -741,43 +781,40 @@ def _perform_hack_attempt(target_player_name, min_steal, max_steal, retried_targ
             if not _open_aggravated_crime_page("Hack"):
                 print("FAILED: Could not re-open Hack page after transfer. Aborting retry.")
                 return 'general_error', target_player_name, None
-            # Re-enter details in the same way you already do (kept identical to your current flow)
-            if not _find_and_send_keys(By.XPATH, "//input[@name='hack']", target_player_name):
-                return 'general_error', target_player_name, None
-            if not _find_and_send_keys(By.XPATH, "//input[@name='cap']", str(steal_amount)):
+            # Same form as the first attempt; read the new result and continue evaluation below
+            ok, result_text = fill_form({(By.XPATH, "//input[@name='hack']"): target_player_name,
+                                         (By.XPATH, "//input[@name='cap']"): steal_amount},
+                                        submit=(By.XPATH, "//input[@name='B1']"),
+                                        outcome=(By.XPATH, "/html/body/div[4]/div[4]/div[1]"))
+            if not ok:
                 return 'general_error', target_player_name, None
-            if not _find_and_click(By.XPATH, "//input[@name='B1']", pause=global_vars.ACTION_PAUSE_SECONDS * 2):
-                return 'general_error', target_player_name, None
-            # Read the new result and continue evaluation below
-            result_text = _get_element_text(By.XPATH, "/html/body/div[4]/div[4]/div[1]") or ""
+            result = classify("hack", result_text)
         else:
             print("Failed to transfer $1, skipping retry.")
             set_player_data(target_player_name, global_vars.MAJOR_CRIME_COOLDOWN_KEY, now + datetime.timedelta(hours=1))
             return 'no_money', target_player_name, None
 
-    if f"You managed to {crime_type.lower()}" in result_text and "bank account" in result_text and "You transferred $" in result_text:
-        try:
-            stolen_name_match = \
-                result_text.split(f"You managed to {crime_type.lower()} into ")[1].split("'s bank account")[0].strip()
-            stolen_amount_str = result_text.split("You transferred $")[1].split(" to a fake account")[0].strip()
-            stolen_actual_amount = int(''.join(filter(str.isdigit, stolen_amount_str)))
-
-            set_player_data(stolen_name_match, global_vars.MAJOR_CRIME_COOLDOWN_KEY, now + datetime.timedelta(hours=12))
-            global_vars.hacked_player_for_repay = stolen_name_match
-            global_vars.hacked_amount_for_repay = stolen_actual_amount
-            global_vars.hacked_successful = True
-            log_aggravated_event(crime_type, stolen_name_match, "Success", stolen_actual_amount)
-            return 'success', stolen_name_match, stolen_actual_amount
-        except Exception:
-            log_aggravated_event(crime_type, target_player_name, "Script Error (Parse Success)", 0)
-            return 'general_error', target_player_name, None
-
-    if "could not guess their password!" in result_text:
+    if result.outcome == "success" and result.name and result.amount is not None:
+        stolen_name_match = result.name
+        stolen_actual_amount = result.amount
+
+        set_player_data(stolen_name_match, global_vars.MAJOR_CRIME_COOLDOWN_KEY, now + datetime.timedelta(hours=12))
+        global_vars.hacked_player_for_repay = stolen_name_match
+        global_vars.hacked_amount_for_repay = stolen_actual_amount
+        global_vars.hacked_successful = True
+        log_aggravated_event(crime_type, stolen_name_match, "Success", stolen_actual_amount)
+        return 'success', stolen_name_match, stolen_actual_amount
+
+    if result.outcome in ("success", "success_unparsed"):
+        log_aggravated_event(crime_type, target_player_name, "Script Error (Parse Success)", 0)
+        return 'general_error', target_player_name, None
+
+    if result.outcome == "failed_password":
         set_player_data(target_player_name, global_vars.MAJOR_CRIME_COOLDOWN_KEY, now + datetime.timedelta(hours=12))
         log_aggravated_event(crime_type, target_player_name, "Failed", 0)
         return 'failed_password', target_player_name, None
 
-    if "behind a proxy server" in result_text:
+    if result.outcome == "failed_proxy":
         set_player_data(target_player_name, global_vars.MAJOR_CRIME_COOLDOWN_KEY, now + datetime.timedelta(hours=12))
         log_aggravated_event(crime_type, target_player_name, "Failed", 0)
         return 'failed_proxy', target_player_name, None
@@ -872,10 +909,10 @@ def _perform_armed_robbery_attempt(player_data, selected_business_name=None):
             print("Failed to parse knockout release time. Proceeding with default logic.")
 
     # --- Result cases ---
-    if "You managed to hold up the" in result_text:
+    result = classify("armed_robbery", result_text)
+    if result.outcome == "success":
         try:
-            business_match = re.search(r'hold up the (.+?)(?: and| -| nothing|!| for \$|$)', result_text)
-            stolen_business_name = business_match.group(1).strip() if business_match else selected_business_name or "Unknown Business"
+            stolen_business_name = result.business or selected_business_name or "Unknown Business"
             stolen_business_name = re.sub(r'[\`\n\r\t]', '', stolen_business_name).strip().lower()
 
             if " for $" in stolen_business_name:
@@ -887,8 +924,7 @@ def _perform_armed_robbery_attempt(player_data, selected_business_name=None):
                     stolen_business_name = known_business
                     break
 
-            amount_match = re.search(r'\$\d[\d,]*', result_text)
-            stolen_actual_amount = int(amount_match.group(0).replace('$', '').replace(',', '')) if amount_match else 0
+            stolen_actual_amount = result.amount or 0
 
             print(f"Successfully robbed {stolen_business_name}. Stolen: ${stolen_actual_amount}")
 
@@ -901,7 +937,7 @@ def _perform_armed_robbery_attempt(player_data, selected_business_name=None):
                 print(f"Repaying ${stolen_actual_amount} to {stolen_business_name}")
                 _get_business_owner_and_repay(stolen_business_name, stolen_actual_amount, player_data)
                 time.sleep(global_vars.ACTION_PAUSE_SECONDS * 2)
-                print("Repayment completed.")
+                print(f"Armed robbery repayment for {stolen_business_name} queued.")
             else:
                 print("No repayment needed (either 0 stolen or repay disabled).")
 
@@ -1001,26 +1037,23 @@ def _perform_torch_attempt(player_data):
         return True
 
     now = datetime.datetime.now()
+    result = classify("torch", result_text)
 
-    if "managed to set ablaze" in result_text:
+    if result.outcome in ("success", "success_unparsed"):
         try:
             print(f"Torch success result_text: {result_text}")
 
-            business_name_re_match = re.search(r'managed to set ablaze the (.+?)!', result_text)
             torched_business_name = selected_business_name
-            if business_name_re_match:
-                extracted_name = business_name_re_match.group(1).strip()
+            if result.business:
+                extracted_name = result.business
                 torched_business_name = f"{player_data.get('Location', '')} {extracted_name}".strip()
                 torched_business_name = torched_business_name.lower()
             else:
                 print(f"Could not parse torched business name from success message. Using selected_business_name: {selected_business_name}")
                 torched_business_name = selected_business_name
 
-            cost_match = re.search(r'\$(\d[\d,]*)(?:\s|\.|!)', result_text)
-            extracted_cost = 0
-            if cost_match:
-                extracted_cost = int(cost_match.group(1).replace(',', ''))
-            else:
+            extracted_cost = result.amount or 0
+            if result.amount is None:
                 print(f"Could not parse torched cost from success message. Defaulting to 0.")
 
             print(f"Successfully torched {torched_business_name} at a cost of ${extracted_cost}.")
@@ -1044,21 +1077,21 @@ def _perform_torch_attempt(player_data):
             global_vars.torch_successful = False
             return True # An attempt was made, but parsing failed
 
-    elif "recently survived" in result_text or "not yet repaired" in result_text:
+    elif result.outcome == "target_cooldown":
         print(f"Business '{selected_business_name}' recently torched or not repaired. This will trigger a short re-check cooldown.")
         log_aggravated_event("Torch", selected_business_name, "Target Cooldown (No Repair/Recent Torching)", 0)
         global_vars._script_torch_recheck_cooldown_end_time = datetime.datetime.now() + datetime.timedelta(minutes=random.uniform(1, 3))
         global_vars.torch_successful = False
         return True
 
-    elif "That business is your own business!" in result_text:
+    elif result.outcome == "own_business":
         print(f"Attempted to torch own business: {selected_business_name}. Setting long cooldown for this target.")
         log_aggravated_event("Torch", selected_business_name, "Own Business", 0)
         global_vars._script_torch_recheck_cooldown_end_time = datetime.datetime.now() + datetime.timedelta(days=1)
         global_vars.torch_successful = False
         return True
 
-    elif "failed" in result_text or "ran off" in result_text:
+    elif result.outcome == "failed":
         print(f"Torch attempt at {selected_business_name} failed.")
         log_aggravated_event("Torch", selected_business_name, "Failed", 0)
         global_vars.torch_successful = False
@@ -1093,42 +1126,42 @@ def _perform_mugging_attempt(target_player_name, min_steal, max_steal):
         return 'general_error', target_player_name, None
 
     now = datetime.datetime.now()
+    result = classify("mugging", result_text)
 
-    if "try them again later" in result_text or "recently survived an aggravated crime" in result_text:
+    if result.outcome == "cooldown_target":
         set_player_data(target_player_name, global_vars.MINOR_CRIME_COOLDOWN_KEY, now + datetime.timedelta(minutes=5))
         return 'cooldown_target', target_player_name, None
 
-    if "must be online" in result_text:
+    if result.outcome == "not_online":
         print(f"Target '{target_player_name}' is not online. Skipping pickpocketing.")
         return 'not_online', target_player_name, None
 
-    if "The name you typed in doesn't exist!" in result_text:
+    if result.outcome == "non_existent_target":
         print(f"INFO: Target '{target_player_name}' does not exist.")
-        set_player_data(target_player_name, global_vars.MINOR_CRIME_COOLDOWN_KEY, now + datetime.timedelta(minutes=15))
+        bury_players([target_player_name], "crime result")
         return 'non_existent_target', target_player_name, None
 
-    if "The victim must be in the same city as you!" in result_text:
+    if result.outcome == "wrong_city":
         print(f"INFO: Target '{target_player_name}' is not in the same city.")
         set_player_data(target_player_name, global_vars.MINOR_CRIME_COOLDOWN_KEY, now + datetime.timedelta(minutes=30))
         return 'wrong_city', target_player_name, None
 
-    if f"You mugged" in result_text and "for $" in result_text:
-        try:
-            stolen_name_match = result_text.split("You mugged ")[1].split(" for $")[0].strip()
-            stolen_amount_str = result_text.split(" for $")[1].split("!")[0].strip()
-            stolen_actual_amount = int(''.join(filter(str.isdigit, stolen_amount_str)))
-
-            set_player_data(stolen_name_match, global_vars.MINOR_CRIME_COOLDOWN_KEY, now + datetime.timedelta(hours=1, minutes=55))
-            global_vars.mugging_player_for_repay = stolen_name_match
-            global_vars.mugging_amount_for_repay = stolen_actual_amount
-            global_vars.mugging_successful = True
-            log_aggravated_event(crime_type, stolen_name_match, "Success", stolen_actual_amount)
-            return 'success', stolen_name_match, stolen_actual_amount
-        except Exception:
-            log_aggravated_event(crime_type, target_player_name, "Script Error (Parse Success)", 0)
-            return 'general_error', target_player_name, None
-
-    if "and failed!" in result_text:
+    if result.outcome == "success" and result.name and result.amount is not None:
+        stolen_name_match = result.name
+        stolen_actual_amount = result.amount
+
+        set_player_data(stolen_name_match, global_vars.MINOR_CRIME_COOLDOWN_KEY, now + datetime.timedelta(hours=1, minutes=55))
+        global_vars.mugging_player_for_repay = stolen_name_match
+        global_vars.mugging_amount_for_repay = stolen_actual_amount
+        global_vars.mugging_successful = True
+        log_aggravated_event(crime_type, stolen_name_match, "Success", stolen_actual_amount)
+        return 'success', stolen_name_match, stolen_actual_amount
+
+    if result.outcome in ("success", "success_unparsed"):
+        log_aggravated_event(crime_type, target_player_name, "Script Error (Parse Success)", 0)
+        return 'general_error', target_player_name, None
+
+    if result.outcome == "failed_attempt":
         set_player_data(target_player_name, global_vars.MINOR_CRIME_COOLDOWN_KEY, now + datetime.timedelta(hours=1, minutes=55))
         log_aggravated_event(crime_type, target_player_name, "Failed", 0)
         return 'failed_attempt', target_player_name, None
@@ -1159,15 +1192,19 @@ def _search_yellow_pages_for_occupation(occupation_search_term, current_city):
 
     if not _find_and_send_keys(By.XPATH, search_input_xpath, occupation_search_term):
         print(f"FAILED: Failed to enter occupation '{occupation_search_term}'.")
-        global_vars.driver.get(initial_url)
+        page_context.return_to(initial_url, "Yellow Pages owner search")
         return None
     if not _find_and_click(By.XPATH, search_button_xpath, pause=global_vars.ACTION_PAUSE_SECONDS * 2):
         print(f"FAILED: Failed to click search button for '{occupation_search_term}'.")
-        global_vars.driver.get(initial_url)
+        page_context.return_to(initial_url, "Yellow Pages owner search")
         return None
 
     results_table = _find_element(By.XPATH, results_table_xpath)
+    owner_found = None
     if results_table:
+        # Cache the owner for every city listed, not just the one we need right now
+        businesses = _public_businesses_by_owner_occupation().get(occupation_search_term.lower(), [])
+        public_owners = {}
         player_rows = results_table.find_elements(By.TAG_NAME, "tr")
         for row in player_rows:
             try:
@@ -1176,15 +1213,23 @@ def _search_yellow_pages_for_occupation(occupation_search_term, current_city):
                     player_occupation = row.find_element(By.XPATH, ".//td[2]").text.strip()
                     player_city = row.find_element(By.XPATH, ".//td[4]").text.strip()
 
-                    if player_occupation.lower() == occupation_search_term.lower() and player_city.lower() == current_city.lower():
-                        print(f"Found owner for '{occupation_search_term}' in '{current_city}': {player_name}")
-                        global_vars.driver.get(initial_url)
-                        return player_name
+                    if player_occupation.lower() == occupation_search_term.lower():
+                        # First listed owner per city wins, so the cached owner is the one returned below
+                        for business in businesses:
+                            public_owners.setdefault((player_city, business), player_name)
+                        if player_city.lower() == current_city.lower() and not owner_found:
+                            owner_found = player_name
             except NoSuchElementException:
                 continue
             except Exception as e:
                 print(f"Error parsing Yellow Pages row: {e}")
                 continue
+        cache_business_owners(public_owners)
+
+    if owner_found:
+        print(f"Found owner for '{occupation_search_term}' in '{current_city}': {owner_found}")
+        page_context.return_to(initial_url, "Yellow Pages owner search")
+        return owner_found
     print(f"No owner found for '{occupation_search_term}' in '{current_city}' via Yellow Pages.")
-    global_vars.driver.get(initial_url)
+    page_context.return_to(initial_url, "Yellow Pages owner search")
     return None
\ No newline at end of file
@@ -0,0 +1,226 @@
+import datetime
+import threading
+import time
+from selenium.webdriver.common.by import By
+import global_vars
+import page_context
+from database_functions import get_cash_needs, get_all_degrees_status, record_event, _read_json_file, _write_json_file
+from helper_functions import _navigate_to_page_via_menu, _find_and_click, _find_element, _get_current_url, fill_form
+from outcome_classifier import classify
+
+# Degrees cost a flat fee to start; everything else is learned from what tasks last needed (note_cash_need)
+DEGREE_FEE = 10000
+
+# Transfers that don't need to happen right now (e.g. agg-crime repayments). They ride along with the next
+# Bank visit, or go out in the per-cycle Money On Hand visit at the latest. The queue is kept in game_data so a
+# restart doesn't lose it; jobs only leave it once a transfer has actually been attempted.
+_queue_lock = threading.Lock()
+# kind -> handler(job, ok), called after a queued transfer of that kind was attempted. Handlers are
+# registered by the owning module at import so they also apply to jobs restored after a restart.
+_transfer_handlers = {}
+
+
+def register_transfer_handler(kind, handler):
+    """Registers handler(job, ok) for queued transfers of `kind` (see queue_transfer)."""
+    _transfer_handlers[kind] = handler
+
+
+def _load_queue():
+    queue = _read_json_file(global_vars.BANK_TRANSFER_QUEUE_FILE)
+    return queue if isinstance(queue, list) else []
+
+
+def queue_transfer(amount, recipient, kind=None, **details):
+    """
+    Defers a transfer to the next Bank visit. Extra `details` are stored with the job and passed to the
+    handler registered for `kind` once the transfer has been attempted.
+    """
+    job = {"amount": int(amount), "recipient": recipient, "kind": kind,
+           "queued_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f"), **details}
+    with _queue_lock:
+        queue = _load_queue()
+        queue.append(job)
+        _write_json_file(global_vars.BANK_TRANSFER_QUEUE_FILE, queue)
+    print(f"[Bank] Queued transfer of ${int(amount):,} to {recipient} ({len(queue)} pending).")
+
+
+def pending_transfer_count():
+    with _queue_lock:
+        return len(_load_queue())
+
+
+def _take_queue():
+    """Snapshot of the queued jobs; they stay persisted until _settle_queued removes them."""
+    with _queue_lock:
+        return _load_queue()
+
+
+def _settle_queued(attempted):
+    """Removes attempted jobs from the persisted queue (jobs queued meanwhile are kept)."""
+    if not attempted:
+        return
+    with _queue_lock:
+        queue = _load_queue()
+        for job in attempted:
+            if job in queue:
+                queue.remove(job)
+        _write_json_file(global_vars.BANK_TRANSFER_QUEUE_FILE, queue)
+
+
+def _need_enabled(reason, cfg):
+    """Whether the task behind a recorded cash need is still switched on."""
+    if reason == "Weapon Shop auto-buy":
+        return cfg.getboolean('Weapon Shop', 'CheckWeaponShop', fallback=False) and cfg.getboolean('Weapon Shop', 'AutoBuyWS', fallback=False)
+    if reason == "Drug Store auto-buy":
+        return cfg.getboolean('Drug Store', 'CheckDrugStore', fallback=False) and cfg.getboolean('Drug Store', 'AutoBuyDS', fallback=False)
+    if reason == "Bionics Shop auto-buy":
+        return cfg.getboolean('Bionics Shop', 'CheckBionicsShop', fallback=False) and cfg.getboolean('Bionics Shop', 'DoAutoBuyBios', fallback=False)
+    if reason == "Drug offer":
+        return cfg.getboolean('Drugs', 'BuyDrugs', fallback=False) and cfg.getboolean('Drugs', 'UseClean', fallback=True)
+    if reason == "Training":
+        return bool(cfg.get('Actions Settings', 'Training', fallback='').strip())
+    return False
+
+
+def project_cash_needs():
+    """
+    Clean cash the enabled tasks are expected to need soon, per reason: recent observed needs
+    (shop prices, course fees, drug offers) for tasks that are still enabled, plus the degree fee.
+    """
+    cfg = global_vars.config
+    cutoff = datetime.datetime.now() - datetime.timedelta(hours=global_vars.CASH_NEED_TTL_HOURS)
+    needs = {}
+    for reason, entry in get_cash_needs().items():
+        try:
+            seen_at = datetime.datetime.strptime(entry["at"], "%Y-%m-%d %H:%M:%S.%f")
+            amount = int(entry["amount"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if seen_at >= cutoff and _need_enabled(reason, cfg):
+            needs[reason] = amount
+
+    if cfg.getboolean('Actions Settings', 'StudyDegrees', fallback=False) and not get_all_degrees_status():
+        needs["Degree"] = DEGREE_FEE
+    return needs
+
+
+def _open_bank_tab(tab_name):
+    """Clicks a Bank tab (Withdrawal/Transfers), re-opening the Bank page first if the tab link isn't there."""
+    link = f"//a[normalize-space()='{tab_name}']"
+    if _find_element(By.XPATH, link, timeout=1, suppress_logging=True) is None:
+        if not _navigate_to_page_via_menu("//span[@class='income']", "//a[normalize-space()='Bank']", "Bank"):
+            print("FAILED: Could not open the Bank page.")
+            return False
+    if not _find_and_click(By.XPATH, link, pause=global_vars.ACTION_PAUSE_SECONDS):
+        print(f"FAILED: Could not open the Bank '{tab_name}' tab.")
+        return False
+    return True
+
+
+def _submit_withdrawal(amount):
+    if not _open_bank_tab("Withdrawal"):
+        return False
+    ok, _ = fill_form({(By.XPATH, "//input[@name='withdrawal']"): amount}, submit=(By.XPATH, "//input[@name='B1']"))
+    if not ok:
+        print("Failed to submit the withdrawal form.")
+        return False
+    print(f"Successfully withdrew ${amount:,}.")
+    return True
+
+
+def _submit_transfer(amount, recipient):
+    """Fills and submits one transfer. Returns (ok, message)."""
+    if not _open_bank_tab("Transfers"):
+        return False, "could not open Transfers"
+    ok, result_text = fill_form({(By.XPATH, "//input[@name='transferamount']"): amount,
+                                 (By.XPATH, "//input[@name='transfername']"): recipient},
+                                submit=(By.XPATH, "//input[@id='B1']"),
+                                outcome=(By.XPATH, "/html/body/div[4]/div[4]/div[1]"))
+    if not ok:
+        return False, "could not fill the transfer form"
+
+    result = classify("bank_transfer", result_text)
+    if result.outcome == "incorrect_name":
+        return False, "incorrect player name"
+    if result.outcome == "insufficient_funds":
+        return False, "insufficient funds"
+    if result.outcome == "success":
+        return True, "confirmed"
+    # Anything else (empty block, layout change, unknown error) only counts with the success banner
+    if _find_element(By.ID, "success", timeout=3, suppress_logging=True):
+        return True, "success banner"
+    return False, f"no confirmation ({(result_text or 'empty result')[:80]})"
+
+
+def bank_visit(withdraw=0, transfers=(), resume=True):
+    """
+    One trip through the Bank page: withdraws `withdraw` (if any), then sends each (amount, recipient)
+    in `transfers` followed by every queued transfer, and returns to the starting page once.
+    Returns (withdraw_ok, [(ok, message) per requested transfer]). withdraw_ok is True when nothing was asked.
+    Pass resume=False when the caller is done with the starting page, so the return trip can be skipped.
+    """
+    queued = _take_queue()
+    attempted = []
+
+    if not withdraw and not transfers and not queued:
+        return True, []
+
+    print(f"\n--- Bank visit: withdraw ${int(withdraw or 0):,}, {len(transfers)} transfer(s), {len(queued)} queued ---")
+    initial_url = _get_current_url()
+    started = time.perf_counter()
+    trips_before = global_vars.WEBDRIVER_COMMAND_COUNT
+    withdraw_ok = True
+    results = []
+    try:
+        if not _navigate_to_page_via_menu("//span[@class='income']", "//a[normalize-space()='Bank']", "Bank"):
+            print("Failed to navigate to the Bank page.")
+            withdraw_ok = not withdraw
+            results = [(False, "could not open Bank")] * len(transfers)
+            # Queued jobs weren't attempted; they stay queued for the next visit
+            return withdraw_ok, results
+
+        if withdraw:
+            withdraw_ok = _submit_withdrawal(int(withdraw))
+
+        for amount, recipient in transfers:
+            ok, message = _submit_transfer(amount, recipient)
+            print(f"{'SUCCESS' if ok else 'FAILED'}: Transfer ${amount:,} to {recipient} ({message}).")
+            results.append((ok, message))
+
+        for job in queued:
+            ok, message = _submit_transfer(job["amount"], job["recipient"])
+            print(f"{'SUCCESS' if ok else 'FAILED'}: Queued transfer ${job['amount']:,} to {job['recipient']} ({message}).")
+            attempted.append(job)
+            _finish_queued(job, ok)
+
+        return withdraw_ok, results
+
+    except Exception as e:
+        print(f"ERROR during Bank visit: {e}")
+        results += [(False, str(e))] * (len(transfers) - len(results))
+        return False, results
+
+    finally:
+        # Only attempted jobs leave the queue; the rest (navigation failure, error mid-visit) wait for the next visit
+        _settle_queued(attempted)
+        record_event("Bank Visit", "performed", ok=withdraw_ok and all(ok for ok, _ in results),
+                     duration_s=time.perf_counter() - started,
+                     round_trips=global_vars.WEBDRIVER_COMMAND_COUNT - trips_before)
+        try:
+            if not resume:
+                page_context.return_to(initial_url, "Bank visit")
+            elif initial_url:
+                global_vars.driver.get(initial_url)
+                time.sleep(global_vars.ACTION_PAUSE_SECONDS)
+        except Exception:
+            print("WARNING: Could not return to previous page after Bank visit.")
+
+
+def _finish_queued(job, ok):
+    handler = _transfer_handlers.get(job.get("kind"))
+    if handler is None:
+        return
+    try:
+        handler(job, ok)
+    except Exception as e:
+        print(f"WARNING: Transfer handler for {job['recipient']} failed: {e}")
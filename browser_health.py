@@ -0,0 +1,229 @@
+import datetime
+import os
+import time
+from selenium.webdriver.common.by import By
+import global_vars
+from database_functions import _read_json_file, _write_json_file
+from helper_functions import _navigate_to_page_via_menu, _find_and_click, _find_element
+from selector_registry import resolve
+
+try:
+    import psutil
+except ImportError:  # Optional: the /proc fallback below covers Linux servers
+    psutil = None
+
+# Flows the bot depends on, the menu path to reach each one and the elements it needs once there.
+# navigation: None (current page), a (main menu, sub menu) pair for _navigate_to_page_via_menu, or a
+# registered selector name to click. Required elements are registered selector names or (By, value) pairs.
+SELF_CHECKS = [
+    ("Header", None, None, ["comms_icon", "journals_icon", "city_menu", "income_menu", "game_clock"]),
+    ("Online list", None, None, [(By.XPATH, "/html/body/div[5]/div[3]/div[1]"),
+                                 (By.CSS_SELECTOR, "a[id^='profileLink:']")]),
+    ("Earns", lambda cfg: cfg.getboolean('Earns Settings', 'DoEarns', fallback=True),
+     ("//*[@id='nav_left']/p[5]/a[1]/span", "//*[@id='admintoolstable']/tbody/tr[1]/td/a"), ["earn_work_button"]),
+    ("Journals", None, "journals_icon", ["requests_offers_link"]),
+    ("Bank", None, ("//span[@class='income']", "//a[normalize-space()='Bank']"),
+     [(By.XPATH, "//a[normalize-space()='Withdrawal']"), (By.XPATH, "//a[normalize-space()='Transfers']")]),
+    ("Police 911", lambda cfg: cfg.getboolean('Police', 'Post911', fallback=False) or cfg.getboolean('Police', 'DoCases', fallback=False),
+     ("//a[normalize-space()='']//span[@class='police']", "//a[normalize-space()='Emergency call register']"),
+     [(By.XPATH, "//table[@id='casestable']")]),
+]
+
+_CHECK_TIMEOUT = 3
+_session_started = time.time()
+_last_sample_at = 0.0
+last_rss_mb = None  # Latest measurement, exported by metrics_server
+
+
+def _element_present(required):
+    if isinstance(required, str):
+        return resolve(required, timeout=_CHECK_TIMEOUT, suppress_logging=True) is not None
+    by_type, value = required
+    return _find_element(by_type, value, timeout=_CHECK_TIMEOUT, suppress_logging=True) is not None
+
+
+def _reach(name, navigation):
+    if navigation is None:
+        return True
+    if isinstance(navigation, str):
+        element = resolve(navigation, timeout=_CHECK_TIMEOUT, suppress_logging=True)
+        if element is None:
+            return False
+        element.click()
+        time.sleep(global_vars.ACTION_PAUSE_SECONDS)
+        return True
+    main_menu, sub_menu = navigation
+    return _navigate_to_page_via_menu(main_menu, sub_menu, f"{name} (self-check)")
+
+
+def self_check():
+    """
+    Walks every enabled flow's menu path and verifies its required elements are present, so a layout that
+    differs headless (window size, lazy-rendered menus) shows up at startup rather than mid-cycle.
+    Returns {flow: [missing element, ...]}; an empty list means the flow passed. Returns to the resting page.
+    """
+    cfg = global_vars.config
+    mode = "headless" if global_vars.HEADLESS else "headful"
+    print(f"\n--- Browser self-check ({mode}, window {global_vars.WINDOW_SIZE or 'default'}) ---")
+    results = {}
+    for name, enabled, navigation, required in SELF_CHECKS:
+        if enabled is not None and not enabled(cfg):
+            continue
+        try:
+            if not _reach(name, navigation):
+                results[name] = ["navigation"]
+            else:
+                results[name] = [str(r if isinstance(r, str) else r[1]) for r in required if not _element_present(r)]
+        except Exception as e:
+            results[name] = [f"error: {e}"]
+        missing = results[name]
+        print(f"{'PASS' if not missing else 'FAIL'}: {name}" + (f" (missing: {', '.join(missing)})" if missing else ""))
+
+    failed = [name for name, missing in results.items() if missing]
+    print(f"Self-check: {len(results) - len(failed)}/{len(results)} flows reachable." + (f" Failed: {', '.join(failed)}" if failed else ""))
+
+    resting_page_url = cfg.get('Auth', 'RestingPage', fallback='').strip()
+    try:
+        if resting_page_url:
+            global_vars.driver.get(resting_page_url)
+        else:
+            _find_and_click(By.XPATH, "//span[@class='city']")
+    except Exception as e:
+        print(f"WARNING: Could not return to the resting page after self-check: {e}")
+    return results
+
+
+def _browser_root_pid():
+    """PID of the Chrome process this bot launched (None when attached to an external Chrome)."""
+    if "attach_chrome" in global_vars.STARTUP_TIMINGS:
+        return None  # Chrome was started outside the bot; chromedriver isn't its parent
+    drv = global_vars.driver
+    pid = getattr(drv, "browser_pid", None)  # undetected_chromedriver
+    if pid:
+        return pid
+    process = getattr(getattr(drv, "service", None), "process", None)  # chromedriver, parent of Chrome
+    return getattr(process, "pid", None)
+
+
+def _proc_children():
+    """Linux: parent pid -> [child pids] from /proc."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces, so split after its closing parenthesis
+                ppid = int(f.read().rpartition(")")[2].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def _proc_rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def browser_rss_mb():
+    """
+    Resident memory (MB) of the browser process tree: the launched Chrome/chromedriver plus every renderer
+    and helper under it. Shared pages are counted per process, so this is an upper bound.
+    None when the tree isn't ours (DebuggerAddress attach) or can't be measured on this platform.
+    """
+    global last_rss_mb
+    root = _browser_root_pid()
+    if not root:
+        return None
+    try:
+        if psutil is not None:
+            proc = psutil.Process(root)
+            last_rss_mb = sum(p.memory_info().rss for p in [proc] + proc.children(recursive=True)) / (1024 * 1024)
+        elif os.path.isdir("/proc"):
+            children = _proc_children()
+            total_kb, pending = 0, [root]
+            while pending:
+                pid = pending.pop()
+                total_kb += _proc_rss_kb(pid)
+                pending.extend(children.get(pid, []))
+            last_rss_mb = total_kb / 1024
+        else:
+            return None
+    except Exception as e:
+        print(f"WARNING: Could not measure browser memory: {e}")
+        return None
+    return last_rss_mb
+
+
+def _record_memory(phase, rss_mb):
+    """Keeps the startup value and a running steady-state average per mode in game_data."""
+    data = _read_json_file(global_vars.BROWSER_MEMORY_FILE)
+    if not isinstance(data, dict):
+        data = {}
+    mode = "headless" if global_vars.HEADLESS else "headful"
+    entry = data.setdefault(mode, {})
+    if phase == "startup":
+        entry["startup_mb"] = round(rss_mb, 1)
+    else:
+        samples = entry.get("steady_samples", 0)
+        previous = entry.get("steady_mb", rss_mb)
+        entry["steady_mb"] = round((previous * samples + rss_mb) / (samples + 1), 1)
+        entry["steady_samples"] = samples + 1
+        entry["steady_peak_mb"] = round(max(entry.get("steady_peak_mb", 0), rss_mb), 1)
+    entry["window_size"] = list(global_vars.WINDOW_SIZE) if global_vars.WINDOW_SIZE else None
+    entry["updated_at"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+    _write_json_file(global_vars.BROWSER_MEMORY_FILE, data)
+    return data
+
+
+def memory_report():
+    """One line per mode with startup and steady-state memory, plus the headless saving once both are known."""
+    data = _read_json_file(global_vars.BROWSER_MEMORY_FILE)
+    if not isinstance(data, dict) or not data:
+        return "[Browser] No memory samples recorded yet."
+    lines = []
+    for mode in ("headless", "headful"):
+        entry = data.get(mode)
+        if entry:
+            lines.append(f"[Browser] {mode}: startup {entry.get('startup_mb', '?')} MB, steady "
+                         f"{entry.get('steady_mb', '?')} MB (peak {entry.get('steady_peak_mb', '?')} MB, "
+                         f"{entry.get('steady_samples', 0)} samples)")
+    headless, headful = data.get("headless", {}), data.get("headful", {})
+    for key, label in (("startup_mb", "startup"), ("steady_mb", "steady")):
+        if key in headless and key in headful and headful[key]:
+            saving = headful[key] - headless[key]
+            lines.append(f"[Browser] headless vs headful {label}: {saving:+.1f} MB saved ({saving / headful[key]:.0%})")
+    return "\n".join(lines)
+
+
+def run_startup_checks():
+    """Startup memory sample, then the self-check if [Browser] SelfCheck is on. Call once, after login."""
+    rss_mb = browser_rss_mb()
+    if rss_mb is not None:
+        _record_memory("startup", rss_mb)
+        print(memory_report())
+    if global_vars.config.getboolean('Browser', 'SelfCheck', fallback=False):
+        return self_check()
+    return None
+
+
+def sample_steady_memory():
+    """Adds a steady-state memory sample once the session has settled, at most every BROWSER_MEMORY_SAMPLE_MINUTES."""
+    global _last_sample_at
+    now = time.time()
+    if now - _session_started < global_vars.BROWSER_MEMORY_STEADY_AFTER_MINUTES * 60:
+        return None
+    if now - _last_sample_at < global_vars.BROWSER_MEMORY_SAMPLE_MINUTES * 60:
+        return None
+    _last_sample_at = now
+    rss_mb = browser_rss_mb()
+    if rss_mb is not None:
+        _record_memory("steady", rss_mb)
+    return rss_mb
@@ -0,0 +1,172 @@
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+import global_vars
+from database_functions import _write_json_file
+
+# Default per-invocation command budgets. Override or extend with [Trace] Budgets in settings.ini,
+# e.g. "execute_earns_logic:15, banker_laundering:40".
+DEFAULT_BUDGETS = {
+    "execute_earns_logic": 15,
+}
+
+_local = threading.local()
+_flows = {}
+_violations = []
+_installed = False
+_log_commands = False  # [Trace] LogCommands, re-read when an outermost flow starts rather than per command
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def budgets():
+    """Declared budgets merged with the settings.ini overrides."""
+    merged = dict(DEFAULT_BUDGETS)
+    raw = global_vars.config.get('Trace', 'Budgets', fallback='')
+    for part in raw.split(','):
+        name, _, limit = part.partition(':')
+        if name.strip() and limit.strip().isdigit():
+            merged[name.strip()] = int(limit.strip())
+    return merged
+
+
+def declare_budget(flow_name, max_commands):
+    """Declares (or replaces) a command budget for a flow, e.g. from a benchmark script."""
+    DEFAULT_BUDGETS[flow_name] = max_commands
+
+
+def _locator(params):
+    """Short description of the locator or script a command carried, if any."""
+    if not isinstance(params, dict):
+        return ""
+    if "using" in params:
+        return f"{params.get('using')}={params.get('value')}"
+    if "script" in params:
+        return (params.get("script") or "").strip().split("\n")[0][:80]
+    if "url" in params:
+        return params.get("url") or ""
+    return ""
+
+
+def _on_command(command, params, seconds):
+    """Driver hook: counts the command against every active flow on this thread and optionally logs it."""
+    stack = _stack()
+    for frame in stack:
+        frame["commands"] += 1
+        frame["by_command"][command] = frame["by_command"].get(command, 0) + 1
+
+    if _log_commands:
+        entry = {
+            "ts": round(time.time(), 3),
+            "flow": stack[-1]["flow"] if stack else None,
+            "command": command,
+            "locator": _locator(params),
+            "ms": round(seconds * 1000, 1),
+        }
+        try:
+            with open(global_vars.COMMAND_TRACE_FILE, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        except Exception as e:
+            print(f"Error writing to command trace: {e}")
+
+
+def install():
+    """Registers the recorder on the driver's command hooks (idempotent)."""
+    global _installed
+    if not _installed:
+        _refresh_settings()
+        global_vars.WEBDRIVER_COMMAND_HOOKS.append(_on_command)
+        _installed = True
+
+
+def _refresh_settings():
+    global _log_commands
+    _log_commands = global_vars.config.getboolean('Trace', 'LogCommands', fallback=False)
+
+
+@contextmanager
+def flow(name):
+    """Tags every WebDriver command issued inside the block with `name`. Flows can nest; counts are inclusive."""
+    install()
+    frame = {"flow": name, "commands": 0, "by_command": {}, "started": time.perf_counter()}
+    stack = _stack()
+    if not stack:
+        _refresh_settings()
+    stack.append(frame)
+    try:
+        yield frame
+    finally:
+        stack.pop()
+        _finish(frame)
+
+
+def traced_flow(func):
+    """Decorator form of flow(), tagged with the function's name."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with flow(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def _finish(frame):
+    name = frame["flow"]
+    elapsed = time.perf_counter() - frame["started"]
+    entry = _flows.setdefault(name, {"invocations": 0, "commands": 0, "max_commands": 0, "seconds": 0.0,
+                                     "over_budget": 0, "by_command": {}})
+    entry["invocations"] += 1
+    entry["commands"] += frame["commands"]
+    entry["max_commands"] = max(entry["max_commands"], frame["commands"])
+    entry["seconds"] += elapsed
+    for command, count in frame["by_command"].items():
+        entry["by_command"][command] = entry["by_command"].get(command, 0) + count
+
+    limit = budgets().get(name)
+    if limit is not None and frame["commands"] > limit:
+        entry["over_budget"] += 1
+        _violations.append({"flow": name, "commands": frame["commands"], "budget": limit,
+                            "by_command": dict(frame["by_command"])})
+        del _violations[:-200]
+        print(f"[Trace] {name} used {frame['commands']} WebDriver commands (budget {limit}): {frame['by_command']}")
+
+
+def flow_summary():
+    """Per flow: invocations, average/max commands, average seconds, budget and how often it was exceeded."""
+    limits = budgets()
+    out = {}
+    for name, entry in _flows.items():
+        runs = entry["invocations"] or 1
+        out[name] = {
+            "invocations": entry["invocations"],
+            "avg_commands": round(entry["commands"] / runs, 1),
+            "max_commands": entry["max_commands"],
+            "avg_seconds": round(entry["seconds"] / runs, 2),
+            "budget": limits.get(name),
+            "over_budget": entry["over_budget"],
+            "by_command": dict(entry["by_command"]),
+        }
+    return out
+
+
+def budget_violations():
+    """Every flow invocation that exceeded its budget this session."""
+    return list(_violations)
+
+
+def assert_budgets():
+    """For benchmark runs: raises AssertionError listing every flow invocation that went over budget."""
+    if _violations:
+        lines = [f"{v['flow']}: {v['commands']} commands > budget {v['budget']}" for v in _violations]
+        raise AssertionError("WebDriver command budget exceeded:\n" + "\n".join(lines))
+
+
+def save_trace_summary():
+    """Writes the per-flow summary to game_data."""
+    if _flows:
+        _write_json_file(global_vars.COMMAND_TRACE_SUMMARY_FILE, flow_summary())
@@ -2,10 +2,11 @@ import json
 import requests
 from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
 from helper_functions import _navigate_to_page_via_menu, _select_dropdown_option, enqueue_blind_eyes
+from database_functions import comms_ledger_key, is_comms_item_seen, mark_comms_item_seen, note_cash_need
+from metrics_server import observe_notification
+from outcome_classifier import matches_any
 import math
 
-_PROCESSED_RO_KEYS = set()
-
 def send_discord_notification(message):
     """Sends a message to the configured Discord webhook, reading URL from settings.ini."""
 
@@ -38,11 +39,13 @@ def send_discord_notification(message):
         response = requests.post(webhook_url, data=json.dumps(data), headers=headers)
         response.raise_for_status()
         print(f"Discord notification sent successfully: '{full_message}'")
+        observe_notification(True)
 
     except KeyError as ke:
         print(f"Error: Missing section or key in settings.ini for Discord webhooks: {ke}. Skipping notification.")
     except requests.exceptions.RequestException as e:
         print(f"Failed to send Discord notification: {e}")
+        observe_notification(False)
     except Exception as e:
         print(f"An unexpected error occurred while sending Discord notification: {e}")
 
@@ -50,11 +53,10 @@ def get_unread_message_count():
     """
     Checks the number of unread messages based on the class of the communications icon.
     """
-    comms_span_xpath = "/html/body/div[4]/div[3]/div[1]/a[1]/span"
     comms_span_element = None  # Initialize to None to prevent UnboundLocalError
 
     try:
-        comms_span_element = _find_element(By.XPATH, comms_span_xpath, timeout=2)
+        comms_span_element = _find_registered("unread_comms_count", timeout=2)
 
         if comms_span_element:
             class_attribute = comms_span_element.get_attribute('class')
@@ -85,7 +87,7 @@ def read_and_send_new_messages():
 
     print("Navigating to Communications page via span click...")
     try:
-        _find_and_click(By.XPATH, "//span[@id='comms_span_id']", pause=global_vars.ACTION_PAUSE_SECONDS * 2)
+        _click_registered("comms_icon", pause=global_vars.ACTION_PAUSE_SECONDS * 2)
     except Exception as e:
         print(f"ERROR: Failed to click communications span: {e}")
         return False
@@ -106,6 +108,15 @@ def read_and_send_new_messages():
                 print(f"No more message threads found at index {message_thread_count}. Exiting message loop.")
                 break
 
+            # Skip threads whose summary row (sender, preview, time) we've already forwarded
+            row_summary_element = _find_element(By.XPATH, f"/html/body/div[4]/div[4]/div[3]/form/div[{message_thread_count}]", timeout=1, suppress_logging=True)
+            row_summary_text = (row_summary_element.get_attribute("innerText") or "") if row_summary_element else ""
+            row_key = comms_ledger_key("message_row", row_summary_text) if row_summary_text.strip() else None
+            if row_key and is_comms_item_seen(row_key):
+                print(f"Message thread {message_thread_count} already forwarded (ledger hit). Skipping.")
+                message_thread_count += 1
+                continue
+
             # Click to open the message thread (conversation)
             if _find_and_click(By.XPATH, message_thread_link_xpath, pause=global_vars.ACTION_PAUSE_SECONDS * 2):
                 message_thread_processed = True
@@ -120,7 +131,7 @@ def read_and_send_new_messages():
                     print("Message is from Administrator. Marking all messages as read.")
                     try:
                         # Go back to main Communications page
-                        _find_and_click(By.XPATH, "//span[@id='comms_span_id']", pause=global_vars.ACTION_PAUSE_SECONDS)
+                        _click_registered("comms_icon", pause=global_vars.ACTION_PAUSE_SECONDS)
                         # Click MARK ALL READ
                         _find_and_click(By.XPATH, "//b[normalize-space()='MARK ALL READ']",
                                         pause=global_vars.ACTION_PAUSE_SECONDS)
@@ -155,8 +166,13 @@ def read_and_send_new_messages():
                                     f"Warning: Could not get timestamp for top message from {sender_name_list}: {ts_e}")
 
                         print(f"Read message from {sender_name_list} at {timestamp_text}: '{actual_message}'")
-                        send_discord_notification(
-                            f"In-Game Message from {sender_name_list} at {timestamp_text}: **{actual_message}**")
+                        message_key = comms_ledger_key("message", sender_name_list, timestamp_text, actual_message)
+                        if is_comms_item_seen(message_key):
+                            print(f"Message from {sender_name_list} at {timestamp_text} already forwarded (ledger hit). Not resending.")
+                        else:
+                            send_discord_notification(
+                                f"In-Game Message from {sender_name_list} at {timestamp_text}: **{actual_message}**")
+                        mark_comms_item_seen(message_key, row_key)
                     except Exception as e:
                         print(f"Error reading top message from {sender_name_list}: {e}")
                         send_discord_notification(
@@ -174,17 +190,16 @@ def read_and_send_new_messages():
             # If an error occurs, try to go back to the message list page to avoid getting stuck
             try:
                 print("Attempting to return to Communications via span click after error...")
-                _find_and_click(By.XPATH, "//span[@id='comms_span_id']", pause=global_vars.ACTION_PAUSE_SECONDS * 2)
+                _click_registered("comms_icon", pause=global_vars.ACTION_PAUSE_SECONDS * 2)
             except Exception as back_e:
                 print(f"CRITICAL ERROR: Failed to return to Communications via span click: {back_e}")
                 break  # Break out of the loop if we can't get back to a safe state
 
         message_thread_count += 1 # Move to the next message thread in the list
 
-    # Return to the initial URL after processing all messages
+    # Return to the initial URL after processing all messages (skipped if the next task navigates anyway)
     try:
-        global_vars.driver.get(initial_url)
-        time.sleep(global_vars.ACTION_PAUSE_SECONDS)
+        page_context.return_to(initial_url, "Messages")
     except Exception as e:
         print(f"Error returning to initial URL after message processing: {e}")
 
@@ -194,9 +209,8 @@ def get_unread_journal_count():
     """
     Checks the number of unread journal entries based on the class of the journal icon.
     """
-    journal_span_xpath = "/html/body/div[4]/div[3]/div[2]/a[1]/span"
     try:
-        journal_span_element = _find_element(By.XPATH, journal_span_xpath, timeout=2)
+        journal_span_element = _find_registered("unread_journal_count", timeout=2)
 
         if journal_span_element:
             class_attribute = journal_span_element.get_attribute('class')
@@ -209,7 +223,7 @@ def get_unread_journal_count():
                     return count
             return 0
 
-        print(f"Could not find journal span element (XPath: {journal_span_xpath}).")
+        print("Could not find journal span element.")
         return 0
 
     except Exception as e:
@@ -221,9 +235,7 @@ def _process_requests_offers_entries():
     Processes entries on the Requests/Offers page and sends them to Discord.
     """
     print("\n--- Processing Requests/Offers Entries ---")
-    requests_offers_table_xpath = "/html/body/div[4]/div[4]/div[1]/div[2]/form[2]/table"
-    requests_offers_table_element = _find_element(By.XPATH, requests_offers_table_xpath)
-    processed_keys = set()
+    requests_offers_table_element = _find_registered("journal_table")
 
     if not requests_offers_table_element:
         print("No Requests/Offers table found.")
@@ -234,7 +246,7 @@ def _process_requests_offers_entries():
     i = 0
     while True:
         # Re-locate table and rows on every pass (prevents stales)
-        table = _find_element(By.XPATH, requests_offers_table_xpath, timeout=2)
+        table = _find_registered("journal_table", timeout=2)
         if not table:
             break
         rows = table.find_elements(By.TAG_NAME, "tr")
@@ -293,23 +305,23 @@ def _process_requests_offers_entries():
                 return contentText.trim().replace(/\s\s+/g,' ');
             """, label_el).strip()
 
+            # Skip anything already handled (this run or a previous one) before touching ACCEPT buttons
+            key = comms_ledger_key("request_offer", entry_title, entry_time, entry_content)
+            if is_comms_item_seen(key):
+                print(f"Request/Offer '{entry_title}' at {entry_time} already handled (ledger hit). Skipping.")
+                i += 2
+                continue
+
             # Handle offers (these will refresh the DOM)
             accept_lawyer_rep(entry_content)
             accept_blind_eye_offer(entry_content)
             accept_drug_smuggle(entry_content)
 
-            # Only send once per *function call*
-            key = f"{entry_time}|{entry_title}|{entry_content}".strip()
-            if key in processed_keys:
-                # Already sent within this call — skip the two rows (marker + content)
-                i += 2
-                continue
-
             print(f"Processing NEW Request/Offer - Title: '{entry_title}', Time: '{entry_time}'")
             send_discord_notification(f"New Request/Offer - Title: {entry_title}, Time: {entry_time}, Content: {entry_content}")
             print(f"Sent request/offer to Discord: '{entry_title}'.")
 
-            processed_keys.add(key)
+            mark_comms_item_seen(key)
 
             # IMPORTANT: do NOT restart the scan; just advance past this item
             i += 2
@@ -339,7 +351,7 @@ def process_unread_journal_entries(player_data):
     initial_url = global_vars.driver.current_url
 
     print("Navigating to Journal page...")
-    _find_and_click(By.XPATH, "//span[@id='journals_span_id']", pause=global_vars.ACTION_PAUSE_SECONDS * 2)
+    _click_registered("journals_icon", pause=global_vars.ACTION_PAUSE_SECONDS * 2)
 
     journal_send_content_raw = ''
     try:
@@ -347,10 +359,9 @@ def process_unread_journal_entries(player_data):
     except KeyError:
         print("WARNING: Missing [Journal Settings] section in settings.ini. No journal filters will be used.")
 
-    send_list = {item.strip() for item in journal_send_content_raw.split(',') if item.strip()}
+    send_list = frozenset(item.strip() for item in journal_send_content_raw.split(',') if item.strip())
 
-    journal_table_xpath = "/html/body/div[4]/div[4]/div[1]/div[2]/form[2]/table"
-    journal_table_element = _find_element(By.XPATH, journal_table_xpath)
+    journal_table_element = _find_registered("journal_table")
 
     processed_any_new = False
 
@@ -359,7 +370,7 @@ def process_unread_journal_entries(player_data):
         while True:
             try:
                 # Re-locate table and rows each iteration to avoid stale references
-                journal_table_element = _find_element(By.XPATH, journal_table_xpath, timeout=2)
+                journal_table_element = _find_registered("journal_table", timeout=2)
                 all_rows = journal_table_element.find_elements(By.TAG_NAME, "tr") if journal_table_element else []
                 if i >= len(all_rows):
                     break
@@ -416,11 +427,18 @@ def process_unread_journal_entries(player_data):
                             print(f"JS extraction failed, using fallback for journal content: {js_e}")
                             entry_content = label_element.text.strip()
 
+                        journal_key = comms_ledger_key("journal", entry_title, entry_time, entry_content)
+                        if is_comms_item_seen(journal_key):
+                            print(f"Journal entry '{entry_title}' at {entry_time} already handled (ledger hit). Skipping.")
+                            i += 2
+                            continue
+
                         print(f"Processing NEW Journal Entry - Title: '{entry_title}', Time: '{entry_time}'")
 
                         # Flu check (unchanged)
                         if "you have a slightly nauseous feeling in your" in entry_content.lower():
                             if check_into_hospital_for_surgery():
+                                mark_comms_item_seen(journal_key)
                                 print("Checked into hospital, stopping journal processing.")
                                 return True
 
@@ -430,6 +448,7 @@ def process_unread_journal_entries(player_data):
                             handled = drug_offers(player_data)
                             if handled:
                                 processed_any_new = True
+                                mark_comms_item_seen(journal_key)
                                 # After handling, DOM likely rebuilt → restart from top with fresh refs
                                 i = 0
                                 time.sleep(0.2)
@@ -437,7 +456,7 @@ def process_unread_journal_entries(player_data):
 
                         combined_entry_info = f"{entry_title.lower()} {entry_content.lower()}"
 
-                        should_send_to_discord = any(send_phrase in combined_entry_info for send_phrase in send_list)
+                        should_send_to_discord = matches_any(combined_entry_info, send_list)
 
                         if should_send_to_discord:
                             full_discord_message = f"New Journal Entry - Title: {entry_title}, Time: {entry_time}, Content: {entry_content}"
@@ -447,6 +466,7 @@ def process_unread_journal_entries(player_data):
                             print(
                                 f"Skipping journal entry: '{entry_title}' as it does not match any specified send filters.")
 
+                        mark_comms_item_seen(journal_key)
                         processed_any_new = True
                         i += 2  # skip marker + content rows
                         continue
@@ -466,8 +486,7 @@ def process_unread_journal_entries(player_data):
         print("No journal entries table found.")
 
     # --- Check and process Requests/Offers ---
-    requests_offers_link_xpath = "/html/body/div[4]/div[4]/div[1]/div[2]/ul/li[2]/a"
-    requests_offers_link_element = _find_element(By.XPATH, requests_offers_link_xpath, timeout=2)
+    requests_offers_link_element = _find_registered("requests_offers_link", timeout=2)
 
     if requests_offers_link_element:
         link_text = requests_offers_link_element.text.strip()
@@ -476,12 +495,12 @@ def process_unread_journal_entries(player_data):
             requests_count = int(match.group(1))
             if requests_count > 0:
                 print(f"Detected {requests_count} Requests/Offers. Navigating to page.")
-                if _find_and_click(By.XPATH, requests_offers_link_xpath, pause=global_vars.ACTION_PAUSE_SECONDS * 2):
+                if _click_registered("requests_offers_link", pause=global_vars.ACTION_PAUSE_SECONDS * 2):
                     if _process_requests_offers_entries():
                         processed_any_new = True
                     try:
                         print("Returning to Journal page via span click after Requests/Offers.")
-                        _find_and_click(By.XPATH, "//span[@id='journals_span_id']",pause=global_vars.ACTION_PAUSE_SECONDS * 2)
+                        _click_registered("journals_icon", pause=global_vars.ACTION_PAUSE_SECONDS * 2)
                     except Exception as e:
                         print(f"ERROR: Failed to return to Journal via span after Requests/Offers: {e}")
                 else:
@@ -499,7 +518,7 @@ def process_unread_journal_entries(player_data):
 def _back_to_journal():
     """Returns back to the jounral page, so the logic can continue to read other journals."""
     try:
-        _find_and_click(By.XPATH, "//span[@id='journals_span_id']", pause=global_vars.ACTION_PAUSE_SECONDS)
+        _click_registered("journals_icon", pause=global_vars.ACTION_PAUSE_SECONDS)
     except Exception:
         pass
 
@@ -716,6 +735,9 @@ def drug_offers(initial_player_data: dict):
         _back_to_journal()
         return True
 
+    # Within cap: remember the offer size so the bank planner keeps enough clean cash for the next one
+    note_cash_need("Drug offer", total_price)
+
     # Check money on hand: Clean + Dirty must cover the total price; if not and UseClean=True, withdraw shortfall into clean
     clean = int(initial_player_data.get("Clean Money", 0) or 0)
     dirty = int(initial_player_data.get("Dirty Money", 0) or 0)
@@ -793,8 +815,10 @@ def drug_offers(initial_player_data: dict):
 import re
 import time
 from selenium.webdriver.common.by import By
-from helper_functions import _find_element, _find_elements, _find_and_click, _get_element_text
+from helper_functions import _find_element, _find_elements, _find_and_click, _get_element_text, _find_registered, _click_registered, \
+    _set_field_value
 import global_vars
+import page_context
 
 # --- XPaths you already use / confirmed ---
 # Comms button to open the list page
@@ -895,8 +919,9 @@ def send_in_game_reply(body: str) -> bool:
             print("[send_in_game_reply] Reply textarea not found.")
             return False
 
-        reply_box.clear()
-        reply_box.send_keys(body)
+        if len(body) < global_vars.BULK_TEXT_MIN_CHARS or not _set_field_value(reply_box, body):
+            reply_box.clear()
+            reply_box.send_keys(body)
 
         if not _find_and_click(By.XPATH, SEND_BTN_XPATH, pause=global_vars.ACTION_PAUSE_SECONDS):
             print("[send_in_game_reply] Send button click failed.")
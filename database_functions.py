@@ -1,11 +1,19 @@
 import os
 import json
+import hashlib
 import datetime
 from global_vars import COOLDOWN_DATA_DIR, COOLDOWN_FILE, AGGRAVATED_CRIMES_LOG_FILE, FUNERAL_PARLOUR_LAST_SCAN_FILE, \
-    YELLOW_PAGES_LAST_SCAN_FILE, PLAYER_HOME_CITY_KEY, ALL_DEGREES_FILE, WEAPON_SHOP_NEXT_CHECK_FILE, \
-    POLICE_911_NEXT_POST_FILE, POLICE_911_CACHE_FILE, PENDING_FORENSICS_FILE, FORENSICS_TRAINING_DONE_FILE, \
+    YELLOW_PAGES_LAST_SCAN_FILE, PLAYER_HOME_CITY_KEY, ALL_DEGREES_FILE, \
+    POLICE_911_NEXT_POST_FILE, POLICE_911_CACHE_FILE, CASE_STATE_FILE, FORENSICS_TRAINING_DONE_FILE, \
     POLICE_TRAINING_DONE_FILE, COMBAT_TRAINING_DONE, CUSTOMS_TRAINING_DONE_FILE, FIRE_TRAINING_DONE_FILE, \
-    BLIND_EYE_QUEUE_FILE, COMMUNITY_SERVICE_QUEUE_FILE, DRUGS_LAST_CONSUMED_FILE
+    BLIND_EYE_QUEUE_FILE, COMMUNITY_SERVICE_QUEUE_FILE, DRUGS_LAST_CONSUMED_FILE, COMMS_DEDUPE_LEDGER_FILE, \
+    COMMS_LEDGER_TTL_HOURS, COMMS_LEDGER_MAX_ENTRIES, YELLOW_PAGES_SCAN_STATE_FILE, PLAYER_YP_GENERATION_KEY, \
+    PLAYER_YP_LAST_SEEN_KEY, PLAYER_YP_OCCUPATION_KEY, PLAYER_YP_DEPARTED_KEY, YELLOW_PAGES_DEFAULT_INTERVAL_HOURS, \
+    YELLOW_PAGES_MIN_INTERVAL_HOURS, YELLOW_PAGES_MAX_INTERVAL_HOURS, BUSINESS_OWNER_CACHE_FILE, \
+    BUSINESS_OWNER_CACHE_TTL_HOURS, SELECTOR_STATS_FILE, SHOP_SWEEP_NEXT_CHECK_FILE, SHOP_SWEEP_SCHEDULE_FILE, \
+    SHOP_STOCK_SNAPSHOT_FILE, SHOP_RESTOCK_HISTORY_FILE, SHOP_RESTOCK_HISTORY_MAX, EVENT_LEDGER_FILE, EARN_STATE_FILE, \
+    CASE_STATE_MAX_AGE_DAYS, CASH_NEEDS_FILE, BROWSER_MEMORY_FILE, BANKER_CLIENTS_FILE, BANKER_REJECTION_HOURS, \
+    DECEASED_PLAYERS_FILE, DECEASED_PLAYER_TTL_DAYS, BANK_TRANSFER_QUEUE_FILE
 
 
 def init_local_db():
@@ -19,10 +27,14 @@ def init_local_db():
             FUNERAL_PARLOUR_LAST_SCAN_FILE: lambda f: f.write(""),
             YELLOW_PAGES_LAST_SCAN_FILE: lambda f: f.write(""),
             ALL_DEGREES_FILE: lambda f: json.dump(False, f),
-            WEAPON_SHOP_NEXT_CHECK_FILE: lambda f: f.write(""),
             POLICE_911_NEXT_POST_FILE: lambda f: f.write(""),
             POLICE_911_CACHE_FILE: lambda f: json.dump([], f),
-            PENDING_FORENSICS_FILE: lambda f: json.dump([], f),
+            CASE_STATE_FILE: lambda f: json.dump({}, f),
+            CASH_NEEDS_FILE: lambda f: json.dump({}, f),
+            BANK_TRANSFER_QUEUE_FILE: lambda f: json.dump([], f),
+            BROWSER_MEMORY_FILE: lambda f: json.dump({}, f),
+            BANKER_CLIENTS_FILE: lambda f: json.dump({}, f),
+            DECEASED_PLAYERS_FILE: lambda f: json.dump({}, f),
             FORENSICS_TRAINING_DONE_FILE: lambda f: json.dump(False, f),
             POLICE_TRAINING_DONE_FILE: lambda f: json.dump(False, f),
             COMBAT_TRAINING_DONE: lambda f: json.dump(False, f),
@@ -31,6 +43,16 @@ def init_local_db():
             BLIND_EYE_QUEUE_FILE: lambda f: json.dump([], f),
             COMMUNITY_SERVICE_QUEUE_FILE: lambda f: json.dump([], f),
             DRUGS_LAST_CONSUMED_FILE: lambda f: f.write(""),
+            COMMS_DEDUPE_LEDGER_FILE: lambda f: json.dump({}, f),
+            YELLOW_PAGES_SCAN_STATE_FILE: lambda f: json.dump({}, f),
+            BUSINESS_OWNER_CACHE_FILE: lambda f: json.dump({}, f),
+            SELECTOR_STATS_FILE: lambda f: json.dump({}, f),
+            SHOP_SWEEP_NEXT_CHECK_FILE: lambda f: f.write(""),
+            SHOP_SWEEP_SCHEDULE_FILE: lambda f: json.dump({}, f),
+            SHOP_STOCK_SNAPSHOT_FILE: lambda f: json.dump({}, f),
+            SHOP_RESTOCK_HISTORY_FILE: lambda f: json.dump({}, f),
+            EVENT_LEDGER_FILE: lambda f: f.write(""),
+            EARN_STATE_FILE: lambda f: json.dump({}, f),
         }
 
         for file_path, init_func in files_to_initialize.items():
@@ -96,7 +118,9 @@ def get_player_cooldown(player_id, cooldown_type):
     return None
 
 def set_player_data(player_id, cooldown_type=None, cooldown_end_time=None, home_city=None):
-    """Sets or updates a player's specific cooldown end time and/or home city."""
+    """Sets or updates a player's specific cooldown end time and/or home city. Deceased players are ignored."""
+    if is_deceased(player_id):
+        return False
     data = _read_json_file(COOLDOWN_FILE)
     if player_id not in data:
         data[player_id] = {}
@@ -126,6 +150,104 @@ def remove_player_cooldown(player_id, cooldown_type=None):
         return True
     return False
 
+_tombstones = None  # In-memory copy of DECEASED_PLAYERS_FILE, loaded on first use
+
+
+def get_tombstones():
+    """Deceased players: {name_lower: {"name", "at", "source"}}. Entries older than DECEASED_PLAYER_TTL_DAYS expire."""
+    global _tombstones
+    if _tombstones is None:
+        data = _read_json_file(DECEASED_PLAYERS_FILE)
+        cutoff = datetime.datetime.now() - datetime.timedelta(days=DECEASED_PLAYER_TTL_DAYS)
+        _tombstones = {}
+        for key, entry in (data if isinstance(data, dict) else {}).items():
+            try:
+                if datetime.datetime.strptime(entry["at"], "%Y-%m-%d %H:%M:%S.%f") >= cutoff:
+                    _tombstones[key] = entry
+            except (KeyError, TypeError, ValueError):
+                continue
+    return _tombstones
+
+def is_deceased(name):
+    return bool(name) and name.strip().lower() in get_tombstones()
+
+def filter_deceased(names):
+    """Drops tombstoned names, keeping order."""
+    tombstones = get_tombstones()
+    return [n for n in names if n and n.strip().lower() not in tombstones]
+
+def bury_players(names, source):
+    """
+    Tombstones deceased players and purges them from every store in one pass: the player DB, the 911 cache's
+    online snapshots, the banker client state and the business owner cache (each file is written at most once).
+    The tombstone set is written first, so ingestion stops re-adding them even if a purge step fails.
+    Returns the number of newly tombstoned players.
+    """
+    tombstones = get_tombstones()
+    now_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+    dead = {}
+    for name in names or []:
+        name = (name or "").strip()
+        if name:
+            dead[name.lower()] = name
+    if not dead:
+        return 0
+    new = [key for key in dead if key not in tombstones]
+    for key in new:
+        tombstones[key] = {"name": dead[key], "at": now_str, "source": source}
+    if new:
+        _write_json_file(DECEASED_PLAYERS_FILE, tombstones)
+
+    removed = {}
+
+    players = _read_json_file(COOLDOWN_FILE)
+    if isinstance(players, dict):
+        doomed = [player_id for player_id in players if player_id.lower() in dead]
+        for player_id in doomed:
+            del players[player_id]
+        if doomed:
+            _write_json_file(COOLDOWN_FILE, players)
+            removed["player DB"] = len(doomed)
+
+    cache = _read_json_file(POLICE_911_CACHE_FILE)
+    if isinstance(cache, list):
+        changed = 0
+        for row in cache:
+            users = [u.strip() for u in (row.get("online_users") or "").split(",") if u.strip()]
+            alive = [u for u in users if u.lower() not in dead]
+            if len(alive) != len(users):
+                row["online_users"] = ", ".join(alive)
+                changed += 1
+        if changed:
+            _write_json_file(POLICE_911_CACHE_FILE, cache)
+            removed["911 rows"] = changed
+
+    clients = _read_json_file(BANKER_CLIENTS_FILE)
+    if isinstance(clients, dict):
+        doomed = [key for key in list(clients.get("clients") or {}) + list(clients.get("rejected") or {}) if key in dead]
+        for key in doomed:
+            clients.get("clients", {}).pop(key, None)
+            clients.get("rejected", {}).pop(key, None)
+        if doomed:
+            _write_json_file(BANKER_CLIENTS_FILE, clients)
+            removed["banker clients"] = len(doomed)
+
+    # A dead owner's businesses change hands, so their cached ownership is stale
+    owners = _read_json_file(BUSINESS_OWNER_CACHE_FILE)
+    if isinstance(owners, dict):
+        doomed = [key for key, entry in owners.items() if (entry.get("owner") or "").lower() in dead]
+        for key in doomed:
+            del owners[key]
+        if doomed:
+            _write_json_file(BUSINESS_OWNER_CACHE_FILE, owners)
+            removed["business owners"] = len(doomed)
+
+    if not new and not removed:
+        return 0
+    summary = ", ".join(f"{count} {store}" for store, count in removed.items()) or "nothing stored"
+    print(f"[Tombstones] {len(new)} new deceased player(s) from {source} ({len(dead)} reported); purged {summary}.")
+    return len(new)
+
 def _get_last_timestamp(file_path):
     """Reads a timestamp from a given file."""
     try:
@@ -150,6 +272,436 @@ def _set_last_timestamp(file_path, timestamp):
     except Exception as e:
         print(f"Error writing text data to {file_path}: {e}")
 
+def record_event(task, outcome, ok=None, target=None, amount=0, duration_s=None, round_trips=None):
+    """
+    Appends one compact JSON line to the event ledger (game_data/event_ledger.jsonl).
+    amount is money gained (+) or spent (-); duration_s and round_trips are the cost of the attempt when known.
+    Query it with ledger_stats.
+    """
+    event = {"ts": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "task": task, "outcome": outcome}
+    if ok is not None:
+        event["ok"] = bool(ok)
+    if target:
+        event["target"] = target
+    if amount:
+        event["amount"] = amount
+    if duration_s is not None:
+        event["duration_s"] = round(duration_s, 2)
+    if round_trips is not None:
+        event["round_trips"] = round_trips
+    try:
+        with open(EVENT_LEDGER_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event, separators=(",", ":")) + "\n")
+    except Exception as e:
+        print(f"Error writing to event ledger: {e}")
+
+def comms_ledger_key(*parts):
+    """Builds a content hash for a message/journal entry from its sender or title, timestamp and body."""
+    raw = "|".join((str(p) if p is not None else "").strip() for p in parts)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def _load_comms_ledger():
+    """Reads the dedupe ledger and drops entries older than the TTL."""
+    data = _read_json_file(COMMS_DEDUPE_LEDGER_FILE)
+    if not isinstance(data, dict):
+        data = {}
+    cutoff = datetime.datetime.now() - datetime.timedelta(hours=COMMS_LEDGER_TTL_HOURS)
+    fresh = {}
+    for key, seen_str in data.items():
+        try:
+            if datetime.datetime.strptime(seen_str, "%Y-%m-%d %H:%M:%S.%f") >= cutoff:
+                fresh[key] = seen_str
+        except (TypeError, ValueError):
+            continue
+    return fresh
+
+def is_comms_item_seen(key):
+    """Returns True if this message/journal/request hash was already handled within the TTL."""
+    return bool(key) and key in _load_comms_ledger()
+
+def mark_comms_item_seen(*keys):
+    """Records one or more hashes as handled, evicting expired entries and the oldest beyond the size bound."""
+    ledger = _load_comms_ledger()
+    now_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+    for key in keys:
+        if key:
+            ledger[key] = now_str
+    if len(ledger) > COMMS_LEDGER_MAX_ENTRIES:
+        newest = sorted(ledger.items(), key=lambda kv: kv[1], reverse=True)[:COMMS_LEDGER_MAX_ENTRIES]
+        ledger = dict(newest)
+    _write_json_file(COMMS_DEDUPE_LEDGER_FILE, ledger)
+    return True
+
+def get_yellow_pages_scan_state():
+    """Reads the Yellow Pages scan state (generation, adaptive interval and last churn report)."""
+    state = _read_json_file(YELLOW_PAGES_SCAN_STATE_FILE)
+    if not isinstance(state, dict):
+        state = {}
+    state.setdefault("generation", 0)
+    state.setdefault("interval_hours", YELLOW_PAGES_DEFAULT_INTERVAL_HOURS)
+    return state
+
+def get_yellow_pages_scan_interval_hours():
+    """Returns the current adaptive Yellow Pages scan interval, clamped to the configured bounds."""
+    try:
+        hours = float(get_yellow_pages_scan_state().get("interval_hours", YELLOW_PAGES_DEFAULT_INTERVAL_HOURS))
+    except (TypeError, ValueError):
+        hours = YELLOW_PAGES_DEFAULT_INTERVAL_HOURS
+    return min(max(hours, YELLOW_PAGES_MIN_INTERVAL_HOURS), YELLOW_PAGES_MAX_INTERVAL_HOURS)
+
+def apply_yellow_pages_diff(listings, scanned_occupations, complete):
+    """
+    Applies one Yellow Pages scan to the player database with a single read and write.
+    listings maps player name -> (home city, occupation searched).
+    Every listed player is stamped with the new generation and last-seen time; only new players and
+    changed cities count as churn. Players from earlier generations missing from a complete scan are marked
+    as departed (their YP stamps cleared); the rest of their record (cooldowns, home city) is kept.
+    Returns (generation, churn) where churn maps occupation -> {listed, new, moved, gone}.
+    """
+    data = _read_json_file(COOLDOWN_FILE)
+    if not isinstance(data, dict):
+        data = {}
+    state = get_yellow_pages_scan_state()
+    generation = int(state.get("generation", 0)) + 1
+    now = datetime.datetime.now()
+    now_str = now.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+    churn = {occupation: {"listed": 0, "new": 0, "moved": 0, "gone": 0} for occupation in scanned_occupations}
+
+    for player_name, (city, occupation) in listings.items():
+        if is_deceased(player_name):
+            continue
+        counts = churn.setdefault(occupation, {"listed": 0, "new": 0, "moved": 0, "gone": 0})
+        counts["listed"] += 1
+        entry = data.setdefault(player_name, {})
+        known_city = entry.get(PLAYER_HOME_CITY_KEY)
+        if known_city is None:
+            counts["new"] += 1
+        elif known_city != city:
+            counts["moved"] += 1
+        entry[PLAYER_HOME_CITY_KEY] = city
+        entry[PLAYER_YP_GENERATION_KEY] = generation
+        entry[PLAYER_YP_LAST_SEEN_KEY] = now_str
+        entry[PLAYER_YP_OCCUPATION_KEY] = occupation
+        entry.pop(PLAYER_YP_DEPARTED_KEY, None)
+
+    # Only a complete scan can tell us someone has left the listings
+    if complete:
+        for player_name in list(data.keys()):
+            entry = data[player_name]
+            if player_name in listings or PLAYER_YP_GENERATION_KEY not in entry:
+                continue
+            occupation = entry.get(PLAYER_YP_OCCUPATION_KEY) or "UNKNOWN"
+            churn.setdefault(occupation, {"listed": 0, "new": 0, "moved": 0, "gone": 0})["gone"] += 1
+            for key in (PLAYER_YP_GENERATION_KEY, PLAYER_YP_LAST_SEEN_KEY, PLAYER_YP_OCCUPATION_KEY):
+                entry.pop(key, None)
+            entry[PLAYER_YP_DEPARTED_KEY] = now_str
+
+    _write_json_file(COOLDOWN_FILE, data)
+
+    # Adapt the scan interval to the churn rate (only trust complete scans)
+    interval = get_yellow_pages_scan_interval_hours()
+    total_listed = sum(c["listed"] for c in churn.values())
+    total_changes = sum(c["new"] + c["moved"] + c["gone"] for c in churn.values())
+    churn_rate = total_changes / total_listed if total_listed else 0.0
+    if complete and total_listed:
+        if churn_rate <= 0.02:
+            interval *= 1.5
+        elif churn_rate >= 0.10:
+            interval *= 0.5
+        interval = min(max(interval, YELLOW_PAGES_MIN_INTERVAL_HOURS), YELLOW_PAGES_MAX_INTERVAL_HOURS)
+
+    state.update({
+        "generation": generation,
+        "interval_hours": round(interval, 2),
+        "last_scan": now_str,
+        "last_complete": bool(complete),
+        "last_churn_rate": round(churn_rate, 4),
+        "last_churn": churn,
+    })
+    _write_json_file(YELLOW_PAGES_SCAN_STATE_FILE, state)
+    return generation, churn
+
+def _business_owner_key(city, business_name):
+    """Cache key for a (city, business) pair."""
+    return f"{(city or '').strip().lower()}|{(business_name or '').strip().lower()}"
+
+def get_cached_business_owner(city, business_name):
+    """
+    Returns (hit, owner) for a (city, business) pair from the ownership cache.
+    owner is None on a hit when the business is owned by Administrator (nobody to repay).
+    """
+    cache = _read_json_file(BUSINESS_OWNER_CACHE_FILE)
+    entry = cache.get(_business_owner_key(city, business_name)) if isinstance(cache, dict) else None
+    if not entry:
+        return False, None
+    try:
+        cached_at = datetime.datetime.strptime(entry.get("cached_at", ""), "%Y-%m-%d %H:%M:%S.%f")
+    except (TypeError, ValueError):
+        return False, None
+    if datetime.datetime.now() - cached_at > datetime.timedelta(hours=BUSINESS_OWNER_CACHE_TTL_HOURS):
+        return False, None
+    return True, (entry.get("owner") or None)
+
+def cache_business_owners(city_owners):
+    """
+    Bulk-stores owners in one write. city_owners maps (city, business_name) -> owner name.
+    An owner of None or "Administrator" is stored as "no repayment needed".
+    """
+    if not city_owners:
+        return
+    cache = _read_json_file(BUSINESS_OWNER_CACHE_FILE)
+    if not isinstance(cache, dict):
+        cache = {}
+    now_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+    for (city, business_name), owner in city_owners.items():
+        if owner and owner.strip().lower() == "administrator":
+            owner = ""
+        cache[_business_owner_key(city, business_name)] = {"owner": owner or "", "cached_at": now_str}
+    _write_json_file(BUSINESS_OWNER_CACHE_FILE, cache)
+
+def invalidate_business_owner(city, business_name):
+    """Drops a cached owner, e.g. after a repayment transfer to them failed."""
+    cache = _read_json_file(BUSINESS_OWNER_CACHE_FILE)
+    key = _business_owner_key(city, business_name)
+    if isinstance(cache, dict) and key in cache:
+        del cache[key]
+        _write_json_file(BUSINESS_OWNER_CACHE_FILE, cache)
+        return True
+    return False
+
+def _shop_key(city, shop):
+    """Shops are per city, so shop records are keyed by both."""
+    return f"{city or '?'}|{shop}"
+
+def _city_shop_records(data, city):
+    """{shop: record} for the shops of `city` out of a file keyed by _shop_key."""
+    prefix = _shop_key(city, "")
+    return {key[len(prefix):]: value for key, value in (data if isinstance(data, dict) else {}).items() if key.startswith(prefix)}
+
+def update_shop_stock_snapshot(city, shop_stock):
+    """
+    Stores the latest stock per shop of `city` in one write. shop_stock maps shop -> {item: stock}.
+    Returns {shop: {item: stock}} for items that came into stock or rose since that city's last snapshot.
+    """
+    snapshot = _read_json_file(SHOP_STOCK_SNAPSHOT_FILE)
+    if not isinstance(snapshot, dict):
+        snapshot = {}
+
+    changes = {}
+    now_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+    for shop, items in shop_stock.items():
+        key = _shop_key(city, shop)
+        previous = (snapshot.get(key) or {}).get("items") or {}
+        restocked = {name: stock for name, stock in items.items() if stock > 0 and stock > int(previous.get(name, 0) or 0)}
+        if restocked:
+            changes[shop] = restocked
+        snapshot[key] = {**(snapshot.get(key) or {}), "items": items, "checked_at": now_str}
+
+    _write_json_file(SHOP_STOCK_SNAPSHOT_FILE, snapshot)
+    return changes
+
+def get_shop_pending_buys(city):
+    """Returns {shop: [item, ...]} in `city` for watched items whose auto-buy failed and should be retried while in stock."""
+    snapshot = _read_json_file(SHOP_STOCK_SNAPSHOT_FILE)
+    if not isinstance(snapshot, dict):
+        return {}
+    return {shop: list(entry.get("pending_buys") or []) for shop, entry in _city_shop_records(snapshot, city).items()
+            if isinstance(entry, dict)}
+
+def set_shop_pending_buys(city, pending):
+    """Stores the retry list per shop of `city` next to its stock snapshot ({shop: [item, ...]}; an empty list clears it)."""
+    snapshot = _read_json_file(SHOP_STOCK_SNAPSHOT_FILE)
+    if not isinstance(snapshot, dict):
+        snapshot = {}
+    for shop, items in pending.items():
+        entry = snapshot.setdefault(_shop_key(city, shop), {})
+        if items:
+            entry["pending_buys"] = list(items)
+        else:
+            entry.pop("pending_buys", None)
+    _write_json_file(SHOP_STOCK_SNAPSHOT_FILE, snapshot)
+
+def get_shop_sweep_schedule(city):
+    """Returns {shop: next check datetime} for every shop of `city` the sweep has scheduled."""
+    schedule = {}
+    for shop, value in _city_shop_records(_read_json_file(SHOP_SWEEP_SCHEDULE_FILE), city).items():
+        try:
+            schedule[shop] = datetime.datetime.strptime(value, "%Y-%m-%d %H:%M:%S.%f")
+        except (TypeError, ValueError):
+            continue
+    return schedule
+
+def set_shop_sweep_schedule(city, schedule):
+    """Persists {shop: next check datetime} for the shops of `city`."""
+    data = _read_json_file(SHOP_SWEEP_SCHEDULE_FILE)
+    if not isinstance(data, dict):
+        data = {}
+    for shop, when in schedule.items():
+        data[_shop_key(city, shop)] = when.strftime("%Y-%m-%d %H:%M:%S.%f")
+    _write_json_file(SHOP_SWEEP_SCHEDULE_FILE, data)
+
+def get_shop_restock_history(city):
+    """Returns {shop: {"last_check": str, "restocks": [{"at": str, "latency_s": float}, ...]}} for the shops of `city`."""
+    return _city_shop_records(_read_json_file(SHOP_RESTOCK_HISTORY_FILE), city)
+
+def record_shop_observations(city, checked_shops, changes):
+    """
+    Logs one sweep of `city`. For each shop that restocked since its previous check, the restock time is
+    estimated as the midpoint between the two checks; the catch latency is the time from that estimate until now.
+    Returns {shop: latency_seconds} for the restocks recorded this sweep.
+    """
+    history = _read_json_file(SHOP_RESTOCK_HISTORY_FILE)
+    if not isinstance(history, dict):
+        history = {}
+    now = datetime.datetime.now()
+    now_str = now.strftime("%Y-%m-%d %H:%M:%S.%f")
+    latencies = {}
+
+    for shop in checked_shops:
+        entry = history.setdefault(_shop_key(city, shop), {"last_check": None, "restocks": []})
+        last_check = None
+        if entry.get("last_check"):
+            try:
+                last_check = datetime.datetime.strptime(entry["last_check"], "%Y-%m-%d %H:%M:%S.%f")
+            except ValueError:
+                last_check = None
+
+        # The first ever check can't date a restock; it only establishes a baseline
+        if shop in changes and last_check:
+            restocked_at = last_check + (now - last_check) / 2
+            latency = (now - restocked_at).total_seconds()
+            entry["restocks"].append({"at": restocked_at.strftime("%Y-%m-%d %H:%M:%S.%f"), "latency_s": round(latency, 1)})
+            entry["restocks"] = entry["restocks"][-SHOP_RESTOCK_HISTORY_MAX:]
+            latencies[shop] = latency
+
+        entry["last_check"] = now_str
+
+    _write_json_file(SHOP_RESTOCK_HISTORY_FILE, history)
+    return latencies
+
+def _earn_state_key(occupation, rank, which_earn):
+    return f"{occupation or '?'}|{rank or '?'}|{which_earn or '?'}"
+
+def get_earn_state(occupation, rank, which_earn):
+    """Cached earn resolution for this occupation/rank/WhichEarn: {"earn": name, "quick": "direct"|"dropdown"|"none"}."""
+    states = _read_json_file(EARN_STATE_FILE)
+    entry = states.get(_earn_state_key(occupation, rank, which_earn)) if isinstance(states, dict) else None
+    return entry if isinstance(entry, dict) else {}
+
+def set_earn_state(occupation, rank, which_earn, **fields):
+    """Updates the cached earn resolution; a field set to None is removed."""
+    states = _read_json_file(EARN_STATE_FILE)
+    if not isinstance(states, dict):
+        states = {}
+    key = _earn_state_key(occupation, rank, which_earn)
+    entry = states.get(key) if isinstance(states.get(key), dict) else {}
+    for name, value in fields.items():
+        if value is None:
+            entry.pop(name, None)
+        else:
+            entry[name] = value
+    entry["updated_at"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+    states[key] = entry
+    _write_json_file(EARN_STATE_FILE, states)
+
+def get_case_states():
+    """
+    Per-case police state keyed by case id (as a string):
+    {"evidence": [...], "pending": {lab: requested_at}, "revisit_after": ts, "updated_at": ts}.
+    Records not updated for CASE_STATE_MAX_AGE_DAYS are dropped.
+    """
+    states = _read_json_file(CASE_STATE_FILE)
+    if not isinstance(states, dict):
+        return {}
+    cutoff = datetime.datetime.now() - datetime.timedelta(days=CASE_STATE_MAX_AGE_DAYS)
+    fresh = {}
+    for case_id, state in states.items():
+        try:
+            updated = datetime.datetime.strptime(state.get("updated_at", ""), "%Y-%m-%d %H:%M:%S.%f")
+        except (AttributeError, ValueError):
+            continue
+        if updated >= cutoff:
+            fresh[case_id] = state
+    return fresh
+
+def set_case_state(case_id, state):
+    """Stores the state record for a case; None removes it (closed/buried)."""
+    states = get_case_states()
+    key = str(case_id)
+    if state is None:
+        if key not in states:
+            return
+        states.pop(key)
+    else:
+        state["updated_at"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+        states[key] = state
+    _write_json_file(CASE_STATE_FILE, states)
+
+def get_cash_needs():
+    """Last observed cash need per reason: {reason: {"amount": int, "at": ts}}."""
+    needs = _read_json_file(CASH_NEEDS_FILE)
+    return needs if isinstance(needs, dict) else {}
+
+def note_cash_need(reason, amount):
+    """Remembers what a task last needed in clean cash so the bank planner can fund it ahead of time."""
+    try:
+        amount = int(amount)
+    except (TypeError, ValueError):
+        return
+    if amount <= 0:
+        return
+    needs = get_cash_needs()
+    needs[reason] = {"amount": amount, "at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")}
+    _write_json_file(CASH_NEEDS_FILE, needs)
+
+def get_banker_clients():
+    """
+    Persisted banker client state:
+    {"clients": {name_lower: name}, "scraped_at": ts,
+     "rejected": {name_lower: {"name", "reason", "until", "attempts"}}}.
+    Rejections past their expiry are dropped.
+    """
+    data = _read_json_file(BANKER_CLIENTS_FILE)
+    if not isinstance(data, dict):
+        data = {}
+    data.setdefault("clients", {})
+    now = datetime.datetime.now()
+    rejected = {}
+    for key, entry in (data.get("rejected") or {}).items():
+        try:
+            until = datetime.datetime.strptime(entry["until"], "%Y-%m-%d %H:%M:%S.%f")
+        except (KeyError, TypeError, ValueError):
+            continue
+        if until > now:
+            rejected[key] = entry
+    data["rejected"] = rejected
+    return data
+
+def set_banker_clients(names, scraped=False):
+    """Adds established clients (scraped=True replaces the set with a fresh Deals table scrape)."""
+    data = get_banker_clients()
+    if scraped:
+        data["clients"] = {}
+        data["scraped_at"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+    for name in names:
+        data["clients"][name.lower()] = name
+        data["rejected"].pop(name.lower(), None)
+    _write_json_file(BANKER_CLIENTS_FILE, data)
+
+def note_banker_rejection(name, reason):
+    """Keeps a player out of the banker candidate list for BANKER_REJECTION_HOURS[reason]."""
+    data = get_banker_clients()
+    hours = BANKER_REJECTION_HOURS.get(reason, BANKER_REJECTION_HOURS["unknown"])
+    previous = data["rejected"].get(name.lower(), {})
+    data["rejected"][name.lower()] = {
+        "name": name,
+        "reason": reason,
+        "until": (datetime.datetime.now() + datetime.timedelta(hours=hours)).strftime("%Y-%m-%d %H:%M:%S.%f"),
+        "attempts": int(previous.get("attempts", 0)) + 1,
+    }
+    _write_json_file(BANKER_CLIENTS_FILE, data)
+
 def get_all_degrees_status():
     """Reads the status of all degrees from all_degrees.json in game_data"""
     try:
@@ -174,13 +726,3 @@ def set_all_degrees_status(status):
             json.dump(status, f, indent=4)
     except Exception as e:
         print(f"Error writing all degrees status to {ALL_DEGREES_FILE}: {e}")
-
-def _get_last_weapon_shop_check_timestamp():
-    """Reads the last weapon shop check timestamp from a file. CAN I REMOVE THIS"""
-    try:
-        timestamp_str = _read_text_file(WEAPON_SHOP_NEXT_CHECK_FILE)
-        if timestamp_str:
-            return datetime.datetime.fromisoformat(timestamp_str)
-    except FileNotFoundError:
-        pass
-    return None
\ No newline at end of file
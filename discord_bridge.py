@@ -6,6 +6,8 @@ import configparser
 import discord
 import time, random
 import global_vars
+from driver_lock import PRIORITY_BRIDGE
+import command_trace
 from comms_journals import reply_to_sender
 from misc_functions import execute_sendmoney_to_player
 from occupations import execute_smuggle_for_player
@@ -45,7 +47,7 @@ def worker():
             action = job.get("action")
 
             # --- EXCLUSIVE BROWSER SECTION ---
-            with global_vars.DRIVER_LOCK:  # NEW
+            with global_vars.DRIVER_LOCK.holding(f"discord:{action}", PRIORITY_BRIDGE), command_trace.flow(f"discord:{action}"):
                 if action == "reply_to_sender":
                     ok = reply_to_sender(job["to"], job["text"])
                     print(f"[DiscordBridge] reply_to_sender -> {job['to']} | {'OK' if ok else 'FAILED'}")
@@ -0,0 +1,140 @@
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+# Lower number is served first. Bridge jobs are short and user-facing, so they jump ahead of the main loop.
+PRIORITY_BRIDGE = 0
+PRIORITY_MAIN = 1
+
+# Histogram bucket upper bounds (seconds) for lock wait and hold times
+HISTOGRAM_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, float('inf'))
+
+
+class FairDriverLock:
+    """
+    Re-entrant browser lock with a fair handoff.
+    Waiters are served by priority, then first-come-first-served. The holder can call yield_to_waiters()
+    at a task boundary to hand the browser over to anyone queued and then re-queue behind them.
+    Wait and hold times are recorded per holder name.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._queue = []
+        self._seq = itertools.count()
+        self._owner = None
+        self._owner_holder = None
+        self._owner_priority = PRIORITY_MAIN
+        self._depth = 0
+        self._acquired_at = 0.0
+        self._stats = {}
+
+    def acquire(self, holder=None, priority=PRIORITY_MAIN):
+        """Blocks until this thread owns the lock. Nested acquires by the owner just increase the depth."""
+        me = threading.get_ident()
+        with self._cond:
+            if self._owner == me:
+                self._depth += 1
+                return True
+
+            holder = holder or threading.current_thread().name
+            ticket = (priority, next(self._seq), me)
+            heapq.heappush(self._queue, ticket)
+            started = time.monotonic()
+            while self._owner is not None or self._queue[0] != ticket:
+                self._cond.wait()
+            heapq.heappop(self._queue)
+
+            self._owner = me
+            self._owner_holder = holder
+            self._owner_priority = priority
+            self._depth = 1
+            self._acquired_at = time.monotonic()
+            self._record(holder, "wait", self._acquired_at - started)
+            # The next waiter in line may need to re-check the head of the queue
+            self._cond.notify_all()
+            return True
+
+    def release(self):
+        """Releases one level; the lock is handed to the next waiter when the depth reaches zero."""
+        with self._cond:
+            if self._owner != threading.get_ident():
+                raise RuntimeError("Cannot release a driver lock that this thread does not hold.")
+            self._depth -= 1
+            if self._depth > 0:
+                return
+            self._record(self._owner_holder, "hold", time.monotonic() - self._acquired_at)
+            self._owner = None
+            self._owner_holder = None
+            self._cond.notify_all()
+
+    def yield_to_waiters(self):
+        """
+        Call at a task boundary. If this thread holds the lock and anyone is queued, fully release it,
+        let the queued jobs run, then reacquire at the same depth. Returns True if the lock was handed over.
+        """
+        me = threading.get_ident()
+        with self._cond:
+            if self._owner != me or not self._queue:
+                return False
+            depth = self._depth
+            holder = self._owner_holder
+            priority = self._owner_priority
+            self._depth = 1
+
+        print(f"[DriverLock] {holder} yielding the browser to {len(self._queue)} queued job(s).")
+        self.release()
+        self.acquire(holder, priority)
+        with self._cond:
+            self._depth = depth
+        return True
+
+    @contextmanager
+    def holding(self, holder, priority=PRIORITY_MAIN):
+        """Context manager form of acquire/release with an explicit holder name and priority."""
+        self.acquire(holder, priority)
+        try:
+            yield self
+        finally:
+            self.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+        return False
+
+    def _record(self, holder, kind, seconds):
+        """Adds one wait or hold sample to the holder's histogram. Caller must hold self._cond."""
+        holder_stats = self._stats.setdefault(holder, {
+            "wait": {"count": 0, "sum": 0.0, "max": 0.0, "buckets": [0] * len(HISTOGRAM_BUCKETS)},
+            "hold": {"count": 0, "sum": 0.0, "max": 0.0, "buckets": [0] * len(HISTOGRAM_BUCKETS)},
+        })
+        hist = holder_stats[kind]
+        hist["count"] += 1
+        hist["sum"] += seconds
+        hist["max"] = max(hist["max"], seconds)
+        for i, upper in enumerate(HISTOGRAM_BUCKETS):
+            if seconds <= upper:
+                hist["buckets"][i] += 1
+                break
+
+    def stats_snapshot(self):
+        """Returns per-holder wait/hold histograms as plain dicts (bucket labels are upper bounds in seconds)."""
+        labels = ["+Inf" if b == float('inf') else str(b) for b in HISTOGRAM_BUCKETS]
+        with self._cond:
+            out = {}
+            for holder, kinds in self._stats.items():
+                out[holder] = {}
+                for kind, hist in kinds.items():
+                    out[holder][kind] = {
+                        "count": hist["count"],
+                        "sum": round(hist["sum"], 3),
+                        "max": round(hist["max"], 3),
+                        "buckets": dict(zip(labels, hist["buckets"])),
+                    }
+            return out
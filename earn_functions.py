@@ -5,7 +5,10 @@ from selenium.webdriver.common.by import By
 
 import global_vars
 from global_vars import ACTION_PAUSE_SECONDS, config
-from helper_functions import _find_and_click, _find_element, _navigate_to_page_via_menu, _find_and_send_keys
+from helper_functions import _find_and_click, _find_element, _navigate_to_page_via_menu, \
+    _find_registered, _click_registered, fill_form, _find_elements_quiet
+from database_functions import get_earn_state, set_earn_state
+from timer_functions import GAME_TIMER_XPATHS, get_game_timer_remaining
 
 
 def _perform_earn_action(earn_name):
@@ -14,46 +17,140 @@ def _perform_earn_action(earn_name):
         print(f"FAILED: Could not click earn option '{earn_name}'.")
         return False
 
-    work_button_xpaths = [
-        "//*[@id='holder_content']/form/p/input",
-        "//*[@id='holder_content']/form/p/button"
-    ]
-
-    for xpath in work_button_xpaths:
-        if _find_and_click(By.XPATH, xpath):
-            print(f"Earn '{earn_name}' completed successfully.")
-            return True
+    # Input/button variants live in the selector registry's 'earn_work_button' chain
+    if _click_registered("earn_work_button"):
+        print(f"Earn '{earn_name}' completed successfully.")
+        return True
 
     print(f"FAILED: Could not click 'Work' button for '{earn_name}'.")
     return False
 
-def execute_earns_logic():
-    """Manages the earn operation, trying quick earn first (via dropdown), then regular menu earn."""
-    global _script_earn_cooldown_end_time
+# Earn options by WhichEarn category, best first
+EARN_PRIORITY = {
+    "Law": ['Parole sitting', 'Judge', 'Lawyer', 'Legal Secretary'],
+    "Secrets": ['Whore', 'Joyride', 'Streetfight', 'Pimp', 'Newspaper Editor'],
+    "Fire": ['Fire Chief', 'Fire Fighter', 'Volunteer Firefighter'],
+    "Gangster": ['Scamming', 'Hack bank account', 'Compete at illegal drags', 'Steal cheques', 'Shoplift'],
+    "Engineering": ['Chief Engineer at local Construction Company', 'Engineer at local Construction Site', 'Technician at local vehicle yard', 'Mechanic at local vehicle yard'],
+    "Medical": ['Hospital Director', 'Surgeon at local hospital', 'Doctor at local hospital', 'Nurse at local hospital'],
+    "Bank": ['Bank Manager', 'Review loan requests', 'Work at local bank'],
+    "Funeral": ['Funeral Director', 'Undertaker', 'Mortician', 'Mortician Assistant'],
+    "Police": ['Assign Duties', 'Arrest Criminals', 'Do paper work', 'Patrol'],
+    "Mayor": ['Mayoral Duties'],
+    "Customs": ['Airport security', 'Paperwork', 'Search luggage', 'Stamp passports'],
+}
+
+# Clicks the 'last earn' control straight from the DOM (no dropdown), if the page already shows it
+_QUICK_EARN_DIRECT_JS = """
+const btn = document.getElementsByName('lastearn')[0];
+if (!btn || btn.offsetParent === null) { return false; }
+btn.click();
+return true;
+"""
+
+def _quick_earn_landed():
+    """
+    True if the quick earn click actually ran an earn: a #success banner, or (without a banner) the
+    earn timer is running again. A #fail banner or a still-ready earn timer means it didn't.
+    """
+    # Zero-wait lookups: the click already paused for the page, and a missing banner is the common case
+    if _find_elements_quiet(By.ID, "fail"):
+        return False
+    if _find_elements_quiet(By.ID, "success"):
+        return True
+    remaining = get_game_timer_remaining(GAME_TIMER_XPATHS['earn_time_remaining'])
+    # get_game_timer_remaining pads a ready timer with up to 5s, so anything above that is a fresh earn timer
+    return remaining != float('inf') and remaining > 5
+
+def _quick_earn(mode):
+    """
+    Runs quick earn in the cached mode. 'direct' is a single script click on lastearn; 'dropdown' opens the
+    arrow first. Probes never wait: a missing arrow is reported immediately. A mode only counts once the
+    result is confirmed on the page. Returns the mode that worked or None.
+    """
+    if mode in (None, "direct"):
+        try:
+            if global_vars.driver.execute_script(_QUICK_EARN_DIRECT_JS):
+                time.sleep(ACTION_PAUSE_SECONDS)
+                if _quick_earn_landed():
+                    return "direct"
+                print("Direct quick earn clicked but no earn was confirmed.")
+        except Exception as e:
+            print(f"Direct quick earn failed: {e}")
+
+    if mode in (None, "direct", "dropdown"):
+        if _find_registered("quick_earn_arrow", timeout=0, suppress_logging=True) and _click_registered("quick_earn_arrow", timeout=0):
+            if _click_registered("quick_earn_last", timeout=1):
+                time.sleep(ACTION_PAUSE_SECONDS)
+                if _quick_earn_landed():
+                    return "dropdown"
+                print("Quick earn dropdown clicked but no earn was confirmed.")
+            else:
+                print("Quick earn dropdown clicked but 'lastearn' still not found.")
+    return None
+
+def _quick_earn_recheck_due(state):
+    """Quick earn marked unavailable is probed again after QUICK_EARN_RECHECK_HOURS, in case it was a one-off miss."""
+    try:
+        checked = datetime.datetime.strptime(state.get("quick_checked_at", ""), "%Y-%m-%d %H:%M:%S.%f")
+    except (TypeError, ValueError):
+        return True
+    return datetime.datetime.now() - checked > datetime.timedelta(hours=global_vars.QUICK_EARN_RECHECK_HOURS)
+
+def _resolve_earn_from_page(which_earn):
+    """Picks the best available earn for WhichEarn from the open Earns page."""
+    earns_holder_element = _find_element(By.XPATH, "//*[@id='content']/div[@id='earns_holder']/div[@id='holder_content']")
+    earns_table_outer_html = earns_holder_element.get_attribute('outerHTML') if earns_holder_element else ""
+    for option in EARN_PRIORITY.get(which_earn, []):
+        if option in earns_table_outer_html:
+            return option
+    return which_earn
+
+def execute_earns_logic(player_data=None):
+    """
+    Manages the earn operation. The resolved earn and whether quick earn works are cached per
+    occupation/rank/WhichEarn, so the usual path is a single quick-earn click. The cache is re-resolved
+    after a promotion (force_reselect_earn) or when a cached path fails.
+    """
     print("\n--- Beginning Earn Operation ---")
 
+    which_earn = config['Earns Settings'].get('WhichEarn')
+    if not which_earn:
+        print("ERROR: 'WhichEarn' setting not found in settings.ini under [Earns Settings].")
+        global_vars._script_earn_cooldown_end_time = datetime.datetime.now() + datetime.timedelta(seconds=random.uniform(30, 90))
+        return False
+
+    occupation = (player_data or {}).get("Occupation")
+    rank = (player_data or {}).get("Rank")
+    state = get_earn_state(occupation, rank, which_earn)
+
     # Check if we must reselect an earn after promotion
     force_reselect = getattr(global_vars, "force_reselect_earn", False)
     if force_reselect:
-        print("Post-promotion: skipping quick-earn dropdown; reselecting via Earns page.")
+        print("Post-promotion: skipping quick earn; reselecting via Earns page.")
+        state = {}
 
-    try:
-        if not force_reselect:
-            quick_earn_arrow_xpath = ".//*[@id='nav_left']/p[5]/a[2]/img"
-            if _find_element(By.XPATH, quick_earn_arrow_xpath, timeout=1):
-                if _find_and_click(By.XPATH, quick_earn_arrow_xpath):
-                    time.sleep(ACTION_PAUSE_SECONDS)
-                    if _find_and_click(By.NAME, "lastearn"):
-                        print("Quick earn successful via dropdown.")
-                        return True
-                    else:
-                        print("Quick earn dropdown clicked but 'lastearn' still not found. Proceeding to regular menu.")
-                else:
-                    print("Failed to click quick earn arrow. Proceeding to regular menu.")
-            else:
-                print("Quick earn arrow element not found. Proceeding to regular menu.")
-    except Exception as e:
-        print(f"Error during quick earn attempt: {e}. Proceeding to regular menu.")
+    quick_mode = state.get("quick")
+    if quick_mode == "none" and _quick_earn_recheck_due(state):
+        quick_mode = None
+    if not force_reselect and quick_mode != "none":
+        try:
+            used = _quick_earn(quick_mode)
+        except Exception as e:
+            print(f"Error during quick earn attempt: {e}.")
+            used = None
+        if used:
+            print(f"Quick earn successful ({used}).")
+            if used != quick_mode:
+                set_earn_state(occupation, rank, which_earn, quick=used)
+            return True
+        print("Quick earn unavailable. Proceeding to regular menu.")
+        if quick_mode:
+            # A cached path failed: forget it and probe every mode next time
+            set_earn_state(occupation, rank, which_earn, quick=None)
+        else:
+            set_earn_state(occupation, rank, which_earn, quick="none",
+                           quick_checked_at=datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f"))
 
     if not _navigate_to_page_via_menu(
             "//*[@id='nav_left']/p[5]/a[1]/span",
@@ -63,43 +160,20 @@ def execute_earns_logic():
         global_vars._script_earn_cooldown_end_time = datetime.datetime.now() + datetime.timedelta(seconds=random.uniform(30, 90))
         return False
 
-    which_earn = config['Earns Settings'].get('WhichEarn')
-    if not which_earn:
-        print("ERROR: 'WhichEarn' setting not found in settings.ini under [Earns Settings].")
-        global_vars._script_earn_cooldown_end_time = datetime.datetime.now() + datetime.timedelta(seconds=random.uniform(30, 90))
-        return False
-
-    earns_holder_element = _find_element(By.XPATH, "//*[@id='content']/div[@id='earns_holder']/div[@id='holder_content']")
-    earns_table_outer_html = earns_holder_element.get_attribute('outerHTML') if earns_holder_element else ""
+    # Use the cached earn if we have one; re-resolve from the page only when it's missing or fails
+    final_earn_to_click = state.get("earn")
+    performed = bool(final_earn_to_click) and _perform_earn_action(final_earn_to_click)
+    if not performed:
+        final_earn_to_click = _resolve_earn_from_page(which_earn)
+        performed = _perform_earn_action(final_earn_to_click)
 
-    # Dictionary of earns by category
-    earn_priority = {
-        "Law": ['Parole sitting', 'Judge', 'Lawyer', 'Legal Secretary'],
-        "Secrets": ['Whore', 'Joyride', 'Streetfight', 'Pimp', 'Newspaper Editor'],
-        "Fire": ['Fire Chief', 'Fire Fighter', 'Volunteer Firefighter'],
-        "Gangster": ['Scamming', 'Hack bank account', 'Compete at illegal drags', 'Steal cheques', 'Shoplift'],
-        "Engineering": ['Chief Engineer at local Construction Company', 'Engineer at local Construction Site', 'Technician at local vehicle yard', 'Mechanic at local vehicle yard'],
-        "Medical": ['Hospital Director', 'Surgeon at local hospital', 'Doctor at local hospital', 'Nurse at local hospital'],
-        "Bank": ['Bank Manager', 'Review loan requests', 'Work at local bank'],
-        "Funeral": ['Funeral Director', 'Undertaker', 'Mortician', 'Mortician Assistant'],
-        "Police": ['Assign Duties', 'Arrest Criminals', 'Do paper work', 'Patrol'],
-        "Mayor": ['Mayoral Duties'],
-        "Customs": ['Airport security', 'Paperwork', 'Search luggage', 'Stamp passports'],
-    }
-
-    final_earn_to_click = which_earn
-    if which_earn in earn_priority:
-        for option in earn_priority[which_earn]:
-            if option in earns_table_outer_html:
-                final_earn_to_click = option
-                break
-
-    # Perform the selected earn
-    if not _perform_earn_action(final_earn_to_click):
+    if not performed:
         print(f"FAILED: Could not perform earn '{final_earn_to_click}'.")
+        set_earn_state(occupation, rank, which_earn, earn=None)
         global_vars._script_earn_cooldown_end_time = datetime.datetime.now() + datetime.timedelta(seconds=random.uniform(30, 90))
         return False
 
+    set_earn_state(occupation, rank, which_earn, earn=final_earn_to_click)
     print(f"Earn action '{final_earn_to_click}' completed.")
     if force_reselect:
         setattr(global_vars, "force_reselect_earn", False)
@@ -136,17 +210,12 @@ def diligent_worker(character_name, which_player=None):
         if not which_player and not cfg_val:
             print(f"UseDillyOn is blank. Falling back to own character name: {target}")
 
-        # Enter the player name into the textbox (helper will clear and send keys)
+        # Enter the player name and click Motivate! in one call
         textbox_xpath = "//*[@id='content']/form[1]/table/tfoot/tr[2]/td[1]/input"
-        if not _find_and_send_keys(By.XPATH, textbox_xpath, target):
-            print("FAILED: Diligent Worker textbox not found or not writable.")
-            global_vars._script_skill_cooldown_end_time = datetime.datetime.now() + datetime.timedelta(seconds=random.uniform(30, 90))
-            return False
-
-        # Click the Motivate! button
         button_xpath = "//*[@id='content']/form[1]/table/tfoot/tr[2]/td[2]/input"
-        if not _find_and_click(By.XPATH, button_xpath):
-            print(f"FAILED: Could not click 'Motivate!' for '{target}'.")
+        ok, _ = fill_form({(By.XPATH, textbox_xpath): target}, submit=(By.XPATH, button_xpath))
+        if not ok:
+            print(f"FAILED: Could not fill and submit the Diligent Worker form for '{target}'.")
             global_vars._script_skill_cooldown_end_time = datetime.datetime.now() + datetime.timedelta(seconds=random.uniform(30, 90))
             return False
 
@@ -3,12 +3,10 @@ import random
 import os
 import configparser
 import subprocess
+import threading
 import time
 import socket
-import undetected_chromedriver as uc
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
+from driver_lock import FairDriverLock
 
 # --- Load Settings ---
 print("Loading settings from settings.ini...")
@@ -20,52 +18,232 @@ except Exception as e:
     print(f"Error loading settings.ini: {e}")
     exit()
 
-# --- Prepare Chrome Profile Directory ---
-user_data_dir = r"C:\tmp\chrome-profile"
-try:
-    os.makedirs(user_data_dir, exist_ok=True)
-    print(f"Chrome user profile directory ready: {user_data_dir}")
-except Exception as e:
-    print(f"Failed to prepare Chrome user profile directory: {e}")
-    exit()
+# Chrome is started lazily by get_driver(); importing this module no longer launches a browser.
+# [Browser] Headless runs Chrome without a window (Linux servers). Layout-dependent XPaths need a stable
+# viewport, so a fixed WindowSize is always applied in headless mode (and in headful mode if set).
+HEADLESS = config.getboolean('Browser', 'Headless', fallback=False)
+DEFAULT_HEADLESS_WINDOW_SIZE = (1366, 900)
 
-# --- Setup Chrome Options ---
-print("Configuring undetected Chrome options...")
-options = uc.ChromeOptions()
-options.add_argument(f"--user-data-dir={user_data_dir}")
-options.add_argument("--no-sandbox")
-options.add_argument("--disable-blink-features=AutomationControlled")
-options.add_argument("--disable-popup-blocking")
-print("Chrome options configured")
 
-# --- Launch Chrome ---
-try:
-    driver = uc.Chrome(options=options, headless=False)
-    print("Successfully launched undetected Chrome")
-except Exception as e:
-    print(f"Failed to launch undetected Chrome: {e}")
-    exit()
+def _parse_window_size(raw):
+    """'1366,900' or '1366x900' -> (1366, 900); None if blank or malformed."""
+    parts = raw.lower().replace("x", ",").split(",")
+    if len(parts) != 2 or not all(p.strip().isdigit() for p in parts):
+        return None
+    return int(parts[0]), int(parts[1])
 
-# --- Navigate to MafiaMatrix if not already there ---
-try:
-    current_url = driver.current_url.lower()
-    if "mafiamatrix" not in current_url:
-        print("Navigating to https://mafiamatrix.com/default.asp...")
-        driver.get("https://mafiamatrix.com/default.asp")
-        print("Successfully navigated to MafiaMatrix")
-    else:
-        print(f"Already on MafiaMatrix: {current_url}")
-except Exception as e:
-    print(f"Failed to navigate to MafiaMatrix: {e}")
-    exit()
+
+WINDOW_SIZE = _parse_window_size(config.get('Browser', 'WindowSize', fallback=''))
+if HEADLESS and WINDOW_SIZE is None:
+    WINDOW_SIZE = DEFAULT_HEADLESS_WINDOW_SIZE
+
+user_data_dir = config.get('Browser', 'ProfileDir', fallback='').strip() or (
+    r"C:\tmp\chrome-profile" if os.name == "nt" else os.path.join(os.path.expanduser("~"), ".mmbot", "chrome-profile"))
+_driver_init_lock = threading.Lock()
+STARTUP_TIMINGS = {}  # phase name -> seconds, filled in by get_driver()
+
+
+def _time_phase(phase, started):
+    """Records and prints how long a startup phase took."""
+    elapsed = time.perf_counter() - started
+    STARTUP_TIMINGS[phase] = round(elapsed, 3)
+    print(f"[Startup] {phase}: {elapsed:.2f}s")
+
+
+def _debugger_port_open(address):
+    """True if something is listening on the DevTools debugger address (host:port)."""
+    host, _, port = address.rpartition(":")
+    try:
+        with socket.create_connection((host or "127.0.0.1", int(port)), timeout=1):
+            return True
+    except (OSError, ValueError):
+        return False
+
+
+def _attach_to_running_chrome(address):
+    """
+    Attaches to a Chrome started with --remote-debugging-port. If nothing is listening yet,
+    starts a detached Chrome on that port (ChromePath in [Auth]) so the session survives bot restarts.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    if not _debugger_port_open(address):
+        chrome_path = config.get('Auth', 'ChromePath', fallback='').strip()
+        if not chrome_path:
+            print(f"No Chrome listening on {address} and no ChromePath set in settings.ini.")
+            return None
+        port = address.rpartition(":")[2]
+        print(f"No Chrome listening on {address}. Starting a detached Chrome with remote debugging...")
+        subprocess.Popen([chrome_path, f"--remote-debugging-port={port}", f"--user-data-dir={user_data_dir}",
+                          "--disable-blink-features=AutomationControlled", "--disable-popup-blocking",
+                          *_headless_arguments()])
+        for _ in range(30):
+            if _debugger_port_open(address):
+                break
+            time.sleep(0.5)
+        else:
+            print(f"Chrome did not open {address} in time.")
+            return None
+
+    options = Options()
+    options.add_experimental_option("debuggerAddress", address)
+    return webdriver.Chrome(options=options)
+
+
+def _headless_arguments():
+    """Extra Chrome switches for headless mode and the fixed window size."""
+    args = []
+    if HEADLESS:
+        # No GPU or large /dev/shm on a typical Linux server
+        args += ["--headless=new", "--disable-gpu", "--disable-dev-shm-usage"]
+    if WINDOW_SIZE:
+        args.append(f"--window-size={WINDOW_SIZE[0]},{WINDOW_SIZE[1]}")
+    return args
+
+
+def _launch_undetected_chrome():
+    """Cold-starts undetected Chrome with the bot's profile directory."""
+    import undetected_chromedriver as uc
+
+    print(f"Configuring undetected Chrome options ({'headless' if HEADLESS else 'headful'})...")
+    options = uc.ChromeOptions()
+    options.add_argument(f"--user-data-dir={user_data_dir}")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument("--disable-popup-blocking")
+    for arg in _headless_arguments():
+        if not arg.startswith("--headless"):  # uc adds its own headless switch
+            options.add_argument(arg)
+    print("Chrome options configured")
+    return uc.Chrome(options=options, headless=HEADLESS)
+
+
+def _apply_window_size(drv):
+    """Pins the viewport so absolute XPaths see the same layout headless and headful."""
+    if not WINDOW_SIZE:
+        return
+    try:
+        drv.set_window_size(*WINDOW_SIZE)
+        print(f"Window size set to {WINDOW_SIZE[0]}x{WINDOW_SIZE[1]}")
+    except Exception as e:
+        print(f"WARNING: Could not set window size {WINDOW_SIZE}: {e}")
+
+
+def _count_webdriver_commands(drv):
+    """
+    Wraps the driver's command dispatcher so every WebDriver round trip bumps WEBDRIVER_COMMAND_COUNT.
+    Callables in WEBDRIVER_COMMAND_HOOKS get (command, params, seconds) after each command.
+    """
+    dispatch = drv.execute
+
+    def execute(driver_command, params=None):
+        global WEBDRIVER_COMMAND_COUNT
+        WEBDRIVER_COMMAND_COUNT += 1
+        if not WEBDRIVER_COMMAND_HOOKS:
+            return dispatch(driver_command, params)
+        started = time.perf_counter()
+        try:
+            return dispatch(driver_command, params)
+        finally:
+            elapsed = time.perf_counter() - started
+            for hook in WEBDRIVER_COMMAND_HOOKS:
+                hook(driver_command, params, elapsed)
+
+    drv.execute = execute
+    return drv
+
+
+def get_driver():
+    """
+    Returns the shared WebDriver, creating it on first use.
+    If [Auth] DebuggerAddress is set (e.g. 127.0.0.1:9222) the bot attaches to that Chrome instead of
+    cold-starting a new one. Each startup phase is timed into STARTUP_TIMINGS.
+    """
+    global driver, wait
+    if "driver" in globals():
+        return driver
+
+    with _driver_init_lock:
+        if "driver" in globals():
+            return driver
+
+        from selenium.webdriver.support.ui import WebDriverWait
+        total_started = time.perf_counter()
+
+        # --- Prepare Chrome Profile Directory ---
+        started = time.perf_counter()
+        try:
+            os.makedirs(user_data_dir, exist_ok=True)
+            print(f"Chrome user profile directory ready: {user_data_dir}")
+        except Exception as e:
+            print(f"Failed to prepare Chrome user profile directory: {e}")
+            exit()
+        _time_phase("profile_dir", started)
+
+        # --- Attach or Launch Chrome ---
+        started = time.perf_counter()
+        debugger_address = config.get('Auth', 'DebuggerAddress', fallback='').strip()
+        new_driver = None
+        if debugger_address:
+            try:
+                new_driver = _attach_to_running_chrome(debugger_address)
+                if new_driver:
+                    print(f"Attached to running Chrome at {debugger_address}")
+            except Exception as e:
+                print(f"Failed to attach to Chrome at {debugger_address}: {e}. Falling back to a fresh launch.")
+        if new_driver:
+            _time_phase("attach_chrome", started)
+        else:
+            try:
+                new_driver = _launch_undetected_chrome()
+                print("Successfully launched undetected Chrome")
+            except Exception as e:
+                print(f"Failed to launch undetected Chrome: {e}")
+                exit()
+            _time_phase("launch_chrome", started)
+
+        _apply_window_size(new_driver)
+
+        # --- Navigate to MafiaMatrix if not already there ---
+        started = time.perf_counter()
+        try:
+            current_url = new_driver.current_url.lower()
+            if "mafiamatrix" not in current_url:
+                print("Navigating to https://mafiamatrix.com/default.asp...")
+                new_driver.get("https://mafiamatrix.com/default.asp")
+                print("Successfully navigated to MafiaMatrix")
+            else:
+                print(f"Already on MafiaMatrix: {current_url}")
+        except Exception as e:
+            print(f"Failed to navigate to MafiaMatrix: {e}")
+            exit()
+        _time_phase("navigate", started)
+
+        wait = WebDriverWait(new_driver, EXPLICIT_WAIT_SECONDS)
+        driver = _count_webdriver_commands(new_driver)
+        _time_phase("total", total_started)
+        return driver
+
+
+def __getattr__(name):
+    """Lazily creates the driver the first time global_vars.driver or global_vars.wait is used."""
+    if name in ("driver", "wait"):
+        get_driver()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # --- Global Configurations ---
 EXPLICIT_WAIT_SECONDS = random.uniform(4, 5) # This is a wait for specific elements to appear, preventing TimeoutException when elements load dynamically.
 ACTION_PAUSE_SECONDS = random.uniform(0.5, 1.5) # This is an unconditional sleep between actions, primarily for pacing and simulating human interaction.
-wait = WebDriverWait(driver, EXPLICIT_WAIT_SECONDS)
+BULK_TEXT_MIN_CHARS = 80 # Text at least this long is set in one script call instead of typed key by key (names/amounts stay typed).
 MIN_POLLING_INTERVAL_LOWER = 40
 MIN_POLLING_INTERVAL_UPPER = 80
+JAIL_RECHECK_MIN_SECONDS = 45 # While jailed, re-check for release at least this often (no release timer is exposed)
+JAIL_RECHECK_MAX_SECONDS = 90
 startup_login_ping_sent = False # One time Discord ping on startup (guard)
+WEBDRIVER_COMMAND_COUNT = 0 # Total WebDriver round trips this session (used for per-task cost in the event ledger)
+WEBDRIVER_COMMAND_HOOKS = [] # Observers of every WebDriver command (see command_trace)
 
 # Directory for game data and logs
 COOLDOWN_DATA_DIR = 'game_data'
@@ -75,12 +253,10 @@ FUNERAL_PARLOUR_LAST_SCAN_FILE = os.path.join(COOLDOWN_DATA_DIR, 'funeral_parlou
 YELLOW_PAGES_LAST_SCAN_FILE = os.path.join(COOLDOWN_DATA_DIR, 'yellow_pages_last_scan.txt')
 AGGRAVATED_CRIME_LAST_ACTION_FILE = os.path.join(COOLDOWN_DATA_DIR, 'aggravated_crimes_last_action.txt')
 ALL_DEGREES_FILE = os.path.join(COOLDOWN_DATA_DIR, 'all_degrees.json')
-WEAPON_SHOP_NEXT_CHECK_FILE = os.path.join(COOLDOWN_DATA_DIR, "weapon_shop_next_check.txt")
 GYM_TRAINING_FILE = os.path.join("game_data", "gym_timer.txt")
-BIONICS_SHOP_NEXT_CHECK_FILE = os.path.join(COOLDOWN_DATA_DIR, "bionics_shop_next_check.txt")
 POLICE_911_NEXT_POST_FILE = os.path.join(COOLDOWN_DATA_DIR, "police_911_next_post.txt")
 POLICE_911_CACHE_FILE = os.path.join(COOLDOWN_DATA_DIR, "police_911_cache.json")
-PENDING_FORENSICS_FILE = os.path.join(COOLDOWN_DATA_DIR, "pending_forensics.json")
+CASE_STATE_FILE = os.path.join(COOLDOWN_DATA_DIR, "case_state.json")
 FORENSICS_TRAINING_DONE_FILE = os.path.join(COOLDOWN_DATA_DIR, "forensics_training_done.json")
 POLICE_TRAINING_DONE_FILE = os.path.join(COOLDOWN_DATA_DIR, "police_training_done.json")
 COMBAT_TRAINING_DONE = os.path.join(COOLDOWN_DATA_DIR, "combat_training_completed.json")
@@ -89,11 +265,77 @@ FIRE_TRAINING_DONE_FILE = os.path.join(COOLDOWN_DATA_DIR, "fire_training_done.js
 BLIND_EYE_QUEUE_FILE = os.path.join(COOLDOWN_DATA_DIR, "blind_eye_queue.json")
 COMMUNITY_SERVICE_QUEUE_FILE = os.path.join(COOLDOWN_DATA_DIR, "community_service_queue.json")
 DRUGS_LAST_CONSUMED_FILE =  os.path.join(COOLDOWN_DATA_DIR, "drugs_last_consumed.txt")
+SELECTOR_STATS_FILE = os.path.join(COOLDOWN_DATA_DIR, "selector_stats.json")
+DRIVER_LOCK_STATS_FILE = os.path.join(COOLDOWN_DATA_DIR, "driver_lock_stats.json")
+COMMS_DEDUPE_LEDGER_FILE = os.path.join(COOLDOWN_DATA_DIR, "comms_dedupe_ledger.json")
+YELLOW_PAGES_SCAN_STATE_FILE = os.path.join(COOLDOWN_DATA_DIR, "yellow_pages_scan_state.json")
+BUSINESS_OWNER_CACHE_FILE = os.path.join(COOLDOWN_DATA_DIR, "business_owner_cache.json")
+SHOP_SWEEP_NEXT_CHECK_FILE = os.path.join(COOLDOWN_DATA_DIR, "shop_sweep_next_check.txt")
+SHOP_SWEEP_SCHEDULE_FILE = os.path.join(COOLDOWN_DATA_DIR, "shop_sweep_schedule.json")
+SHOP_STOCK_SNAPSHOT_FILE = os.path.join(COOLDOWN_DATA_DIR, "shop_stock_snapshot.json")
+SHOP_RESTOCK_HISTORY_FILE = os.path.join(COOLDOWN_DATA_DIR, "shop_restock_history.json")
+EVENT_LEDGER_FILE = os.path.join(COOLDOWN_DATA_DIR, "event_ledger.jsonl")
+COMMAND_TRACE_FILE = os.path.join(COOLDOWN_DATA_DIR, "command_trace.jsonl")
+EARN_STATE_FILE = os.path.join(COOLDOWN_DATA_DIR, "earn_state.json")
+COMMAND_TRACE_SUMMARY_FILE = os.path.join(COOLDOWN_DATA_DIR, "command_trace_summary.json")
+CASH_NEEDS_FILE = os.path.join(COOLDOWN_DATA_DIR, "cash_needs.json")
+BANK_TRANSFER_QUEUE_FILE = os.path.join(COOLDOWN_DATA_DIR, "bank_transfer_queue.json")
+BROWSER_MEMORY_FILE = os.path.join(COOLDOWN_DATA_DIR, "browser_memory.json")
+BANKER_CLIENTS_FILE = os.path.join(COOLDOWN_DATA_DIR, "banker_clients.json")
+DECEASED_PLAYERS_FILE = os.path.join(COOLDOWN_DATA_DIR, "deceased_players.json")
+
+# Dedupe ledger bounds for forwarded messages, journals and requests/offers
+COMMS_LEDGER_TTL_HOURS = 72
+COMMS_LEDGER_MAX_ENTRIES = 2000
 
 # Define keys for database (aggravated_crime_cooldowns.json) entries
 MINOR_CRIME_COOLDOWN_KEY = 'minor_crime_cooldown'
 MAJOR_CRIME_COOLDOWN_KEY = 'major_crime_cooldown'
 PLAYER_HOME_CITY_KEY = 'home_city'
+PLAYER_YP_GENERATION_KEY = 'yp_generation'
+PLAYER_YP_LAST_SEEN_KEY = 'yp_last_seen'
+PLAYER_YP_OCCUPATION_KEY = 'yp_occupation'
+PLAYER_YP_DEPARTED_KEY = 'yp_departed'  # Set when a complete scan no longer lists the player
+
+# Yellow Pages scan interval bounds (hours). The interval adapts to observed churn between these.
+YELLOW_PAGES_DEFAULT_INTERVAL_HOURS = 7
+YELLOW_PAGES_MIN_INTERVAL_HOURS = 3
+YELLOW_PAGES_MAX_INTERVAL_HOURS = 24
+
+# Restock learning: how many observed restocks to keep per shop, and how many before predictions are trusted
+SHOP_RESTOCK_HISTORY_MAX = 50
+SHOP_RESTOCK_MIN_SAMPLES = 3
+
+# How often to re-probe quick earn after it was found unavailable for an occupation/rank
+QUICK_EARN_RECHECK_HOURS = 6
+
+# Police case state: typical lab turnaround (minutes) before a returned case is worth re-opening,
+# and how long a case record is kept once it stops being updated (solved by someone else, expired)
+CASE_DNA_RESULT_MINUTES = 15
+CASE_FIRE_RESULT_MINUTES = 15
+CASE_STATE_MAX_AGE_DAYS = 7
+
+# Cash planner: how long an observed cash need (shop price, course fee, drug offer) is projected forward
+CASH_NEED_TTL_HOURS = 48
+
+# Browser memory report: steady-state samples start once the session has been up this long, and are
+# taken at most this often
+BROWSER_MEMORY_STEADY_AFTER_MINUTES = 10
+BROWSER_MEMORY_SAMPLE_MINUTES = 5
+
+# Banker clients: how often the Deals table is re-scraped to resync the client set, and how long a failed
+# "Establish Deal" keeps a player out of the candidate list, per failure reason
+BANKER_CLIENTS_RESCRAPE_HOURS = 24
+BANKER_REJECTION_HOURS = {
+    "home_city": 24 * 14,
+    "unknown": 12,
+}
+
+# Deceased players are tombstoned so no scan or task re-adds them; names can be re-registered eventually
+DECEASED_PLAYER_TTL_DAYS = 60
+
+# How long a cached (city, business) owner is trusted for repayments before re-checking
+BUSINESS_OWNER_CACHE_TTL_HOURS = 12
 
 # Global variables for script's internal cooldowns
 # Game timers
@@ -107,16 +349,13 @@ _script_skill_cooldown_end_time = datetime.datetime.now()
 # Career-specific timers
 _script_bank_add_clients_cooldown_end_time = datetime.datetime.now()
 _script_post_911_cooldown_end_time = datetime.datetime.min
-_cases_pending_forensics = set()
 # Aggravated crime timers
 _script_armed_robbery_recheck_cooldown_end_time = datetime.datetime.now()
 _script_torch_recheck_cooldown_end_time = datetime.datetime.now()
 _script_aggravated_crime_recheck_cooldown_end_time = None
 # Misc timers
 _script_gym_train_cooldown_end_time = datetime.datetime.now()
-_script_bionics_shop_cooldown_end_time = datetime.datetime.now()
-_script_weapon_shop_cooldown_end_time = datetime.datetime.now()
-_script_drug_store_cooldown_end_time = datetime.datetime.now()
+_script_shop_sweep_cooldown_end_time = datetime.datetime.now()
 _script_promo_check_cooldown_end_time = datetime.datetime.now()
 _script_consume_drugs_cooldown_end_time = datetime.datetime.now()
 jail_timers = {}
@@ -131,8 +370,9 @@ initial_game_url = None
 # Global Variable to store if the script needs to reselect an earn after taking a promotion.
 force_reselect_earn = False
 
-# Global Variable that tells Main.py to pause while Discord uses Selenium
-DRIVER_LOCK = threading.RLock()
+# Global Variable that tells Main.py to pause while Discord uses Selenium.
+# Main.py yields it at task boundaries so queued Discord jobs don't wait for a whole cycle.
+DRIVER_LOCK = FairDriverLock()
 
 # Global variables to store hacked player and amount for repayment
 hacked_player_for_repay = None
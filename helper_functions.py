@@ -4,15 +4,17 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as ec
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.support.select import Select
+from selenium.webdriver.support.ui import WebDriverWait
 import global_vars
 from database_functions import _write_json_file, _read_json_file
-from global_vars import driver, wait, EXPLICIT_WAIT_SECONDS, ACTION_PAUSE_SECONDS, driver
+from global_vars import EXPLICIT_WAIT_SECONDS, ACTION_PAUSE_SECONDS
+from selector_registry import resolve as _resolve_selector
 
 # --- Helper Functions for WebDriver Interactions ---
 def _find_element(by_type, value, timeout=EXPLICIT_WAIT_SECONDS, suppress_logging=False):
     """Finds an element using WebDriverWait."""
     try:
-        element = wait.until(ec.presence_of_element_located((by_type, value)))
+        element = global_vars.wait.until(ec.presence_of_element_located((by_type, value)))
         if element.is_displayed():
             return element
         return None
@@ -30,7 +32,7 @@ def _find_element(by_type, value, timeout=EXPLICIT_WAIT_SECONDS, suppress_loggin
 def _get_current_url():
     """Gets the current URL using WebDriver."""
     try:
-        return driver.current_url
+        return global_vars.driver.current_url
     except Exception as e:
         print(f"Error: could not get current URL - {e}")
         return None # Does None work here?
@@ -38,7 +40,7 @@ def _get_current_url():
 def _find_elements(by_type, value, timeout=EXPLICIT_WAIT_SECONDS):
     """Finds multiple elements using WebDriverWait."""
     try:
-        elements = wait.until(ec.presence_of_all_elements_located((by_type, value)))
+        elements = global_vars.wait.until(ec.presence_of_all_elements_located((by_type, value)))
         # Filter for visible elements
         visible_elements = [elem for elem in elements if elem.is_displayed()]
         return visible_elements
@@ -52,7 +54,7 @@ def _find_elements(by_type, value, timeout=EXPLICIT_WAIT_SECONDS):
 def _find_elements_quiet(by_type, value):
     """Finds multiple elements quickly, without waiting or logging."""
     try:
-        elements = driver.find_elements(by_type, value)
+        elements = global_vars.driver.find_elements(by_type, value)
         return [elem for elem in elements if elem.is_displayed()]
     except Exception:
         return []
@@ -63,7 +65,7 @@ def _find_and_click(by_type, value, timeout=EXPLICIT_WAIT_SECONDS, pause=ACTION_
     element = _find_element(by_type, value, timeout)
     if element:
         try:
-            wait.until(ec.element_to_be_clickable((by_type, value))).click()
+            global_vars.wait.until(ec.element_to_be_clickable((by_type, value))).click()
             time.sleep(pause)
             return True
         except TimeoutException:
@@ -74,11 +76,44 @@ def _find_and_click(by_type, value, timeout=EXPLICIT_WAIT_SECONDS, pause=ACTION_
             return False
     return False
 
-def _find_and_send_keys(by_type, value, keys, timeout=EXPLICIT_WAIT_SECONDS, pause=ACTION_PAUSE_SECONDS):
-    """Finds a text box, clears it, and sends new keys."""
+# Sets a text field's value through the native setter (so framework listeners see it) and fires the
+# input/change events a typed entry would. Returns the resulting value length.
+_SET_FIELD_VALUE_JS = """
+const el = arguments[0], text = arguments[1];
+const proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+const setter = Object.getOwnPropertyDescriptor(proto, 'value').set;
+el.focus();
+setter.call(el, text);
+el.dispatchEvent(new Event('input', {bubbles: true}));
+el.dispatchEvent(new Event('change', {bubbles: true}));
+return el.value.length;
+"""
+
+def _set_field_value(element, text):
+    """
+    Puts `text` into an input/textarea in one script call instead of one keystroke per character.
+    Returns True if the field now holds the full text, False otherwise (caller can fall back to send_keys).
+    """
+    try:
+        length = global_vars.driver.execute_script(_SET_FIELD_VALUE_JS, element, text)
+        return length == len(text.replace("\r\n", "\n"))
+    except Exception as e:
+        print(f"Could not set field value by script: {e}")
+        return False
+
+def _find_and_send_keys(by_type, value, keys, timeout=EXPLICIT_WAIT_SECONDS, pause=ACTION_PAUSE_SECONDS, bulk=None):
+    """
+    Finds a text box, clears it, and sends new keys.
+    Plain text of BULK_TEXT_MIN_CHARS or more is set in one script call (bulk=None); bulk=False always types.
+    """
     element = _find_element(by_type, value, timeout)
     if element:
         try:
+            if bulk is None:
+                bulk = isinstance(keys, str) and len(keys) >= global_vars.BULK_TEXT_MIN_CHARS
+            if bulk and _set_field_value(element, keys):
+                time.sleep(pause)
+                return True
             element.clear()
             element.send_keys(keys)
             time.sleep(pause)
@@ -88,6 +123,133 @@ def _find_and_send_keys(by_type, value, keys, timeout=EXPLICIT_WAIT_SECONDS, pau
             return False
     return False
 
+# Fills every field of a form in one call. Each field is [locator kind, locator value, text]; kinds are the
+# selenium By strings. Selects match an option by visible text or value, checkboxes/radios take "true"/"false".
+# The submit button is clicked after the script returns so the returned element reference stays usable.
+_FILL_FORM_JS = """
+const fields = arguments[0], submit = arguments[1];
+function find(kind, value) {
+  if (kind === 'xpath') return document.evaluate(value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+  if (kind === 'css selector') return document.querySelector(value);
+  if (kind === 'id') return document.getElementById(value);
+  if (kind === 'name') return document.getElementsByName(value)[0] || null;
+  return null;
+}
+for (const [kind, value, text] of fields) {
+  const el = find(kind, value);
+  if (!el) return {missing: value};
+  if (el.tagName === 'SELECT') {
+    const option = Array.from(el.options).find(o => o.text.trim() === text || o.value === text);
+    if (!option) return {missing: value + ' (option ' + text + ')'};
+    el.value = option.value;
+  } else if (el.type === 'checkbox' || el.type === 'radio') {
+    el.checked = text === 'true';
+  } else {
+    const proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, text);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+  }
+  el.dispatchEvent(new Event('change', {bubbles: true}));
+}
+if (!submit) return {missing: null, button: null};
+const button = find(submit[0], submit[1]);
+if (!button) return {missing: submit[1]};
+setTimeout(() => button.click(), 0);
+return {missing: null, button: button};
+"""
+
+# Text of the outcome block (the given locator, else the #fail / #success banner); ready once it has text
+# or the page shows a result banner
+_OUTCOME_BLOCK_JS = """
+const kind = arguments[0], value = arguments[1];
+const banner = document.getElementById('fail') || document.getElementById('success');
+let el = banner;
+if (kind === 'xpath') el = document.evaluate(value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+else if (kind === 'css selector') el = document.querySelector(value);
+else if (kind === 'id') el = document.getElementById(value);
+const text = el ? el.innerText.trim() : '';
+return {ready: !!(text || banner), text: text};
+"""
+
+def _read_outcome_block(kind, value, timeout):
+    """Waits up to `timeout` for the outcome block (or a result banner) and returns its text ('' if none showed)."""
+    def ready(driver):
+        block = driver.execute_script(_OUTCOME_BLOCK_JS, kind, value) or {}
+        return block if block.get("ready") else False
+    try:
+        return WebDriverWait(global_vars.driver, timeout).until(ready).get("text") or ""
+    except TimeoutException:
+        return (global_vars.driver.execute_script(_OUTCOME_BLOCK_JS, kind, value) or {}).get("text") or ""
+
+def _form_text(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+def fill_form(fields, submit=None, outcome=None, typed=(), timeout=EXPLICIT_WAIT_SECONDS, pause=ACTION_PAUSE_SECONDS):
+    """
+    Fills a form in one script call and optionally submits it: fields maps (By, value) locators to the text,
+    option (visible text or value) or checkbox state to set. `typed` lists locators from `fields` that must
+    still be typed key by key (e.g. inputs with key handlers).
+    After submitting, waits for the page to change, then for the outcome block (`outcome` locator, else the
+    #fail/#success banner) to show up, and reads it.
+    Returns (ok, outcome_text). ok is False if a field, option or the submit button couldn't be found.
+    """
+    if not fields and not submit:
+        return True, ""
+    first = next(iter(fields), None) or submit
+    if not _find_element(first[0], first[1], timeout):
+        print(f"FAILED: Form field not found for {first[0]}: {first[1]}")
+        return False, ""
+
+    try:
+        scripted = [[by_type, value, _form_text(text)] for (by_type, value), text in fields.items() if (by_type, value) not in typed]
+        result = global_vars.driver.execute_script(_FILL_FORM_JS, scripted, None if typed else (list(submit) if submit else None))
+        if result.get("missing"):
+            print(f"FAILED: Form element not found: {result['missing']}")
+            return False, ""
+
+        for locator in typed:
+            if not _find_and_send_keys(locator[0], locator[1], _form_text(fields[locator]), timeout=timeout, pause=0):
+                return False, ""
+        if typed and submit:
+            result = global_vars.driver.execute_script(_FILL_FORM_JS, [], list(submit))
+            if result.get("missing"):
+                print(f"FAILED: Form submit button not found: {result['missing']}")
+                return False, ""
+
+        if not submit:
+            time.sleep(pause)
+            return True, ""
+
+        # Submitting replaces the page; wait for the old button to go stale (in-page forms just time out)
+        try:
+            WebDriverWait(global_vars.driver, timeout).until(ec.staleness_of(result["button"]))
+        except TimeoutException:
+            pass
+        kind, value = outcome if outcome else (None, None)
+        return True, _read_outcome_block(kind, value, timeout)
+    except Exception as e:
+        print(f"An error occurred while filling form {list(fields)}: {e}")
+        return False, ""
+
+def _find_registered(name, timeout=EXPLICIT_WAIT_SECONDS, suppress_logging=False):
+    """Finds an element by its logical name in the selector registry (ordered fallback chain)."""
+    return _resolve_selector(name, timeout=timeout, suppress_logging=suppress_logging)
+
+def _click_registered(name, timeout=EXPLICIT_WAIT_SECONDS, pause=ACTION_PAUSE_SECONDS):
+    """Finds and clicks an element by its logical name in the selector registry."""
+    element = _resolve_selector(name, timeout=timeout)
+    if element:
+        try:
+            element.click()
+            time.sleep(pause)
+            return True
+        except Exception as e:
+            print(f"An error occurred while clicking '{name}': {e}")
+            return False
+    return False
+
 def _get_element_text(by_type, value, timeout=EXPLICIT_WAIT_SECONDS):
     """Gets text from an element.
     This adds the explicit wait which is useful when an element needs to load"""
@@ -153,14 +315,14 @@ def _get_dropdown_options(by_type, value, timeout=EXPLICIT_WAIT_SECONDS):
     Returns a list of option texts or an empty list if the element is not found or has no options.
     """
     try:
-        dropdown_element = wait.until(ec.presence_of_element_located((by_type, value)))
+        dropdown_element = global_vars.wait.until(ec.presence_of_element_located((by_type, value)))
         if not dropdown_element.is_displayed():
             print(f"Dropdown element not visible for {by_type}: {value}")
             return []
 
-        select = Select(dropdown_element)
-        options = [option.text for option in select.options if option.text.strip()] # Get text of all options, filter out empty strings
-        return options
+        # All option texts in one script call rather than one .text round trip per option
+        texts = global_vars.driver.execute_script("return Array.from(arguments[0].options, o => o.text);", dropdown_element)
+        return [text for text in (texts or []) if text.strip()] # Filter out empty strings
     except TimeoutException:
         print(f"Timeout: Dropdown element not found after {timeout:.2f} seconds for {by_type}: {value}")
         return []
@@ -177,7 +339,7 @@ def _select_dropdown_option(by_type, value, option_text, timeout=EXPLICIT_WAIT_S
     Returns True on success, False otherwise.
     """
     try:
-        dropdown_element = wait.until(ec.presence_of_element_located((by_type, value)))
+        dropdown_element = global_vars.wait.until(ec.presence_of_element_located((by_type, value)))
         if not dropdown_element.is_displayed():
             print(f"Dropdown element not visible for {by_type}: {value}")
             return False
@@ -0,0 +1,102 @@
+import datetime
+import json
+import global_vars
+
+
+def load_events(since_hours=None, path=None):
+    """Reads the event ledger, optionally keeping only events from the last `since_hours` hours."""
+    path = path or global_vars.EVENT_LEDGER_FILE
+    cutoff = datetime.datetime.now() - datetime.timedelta(hours=since_hours) if since_hours else None
+    events = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    event = json.loads(line)
+                    event["_ts"] = datetime.datetime.strptime(event["ts"], "%Y-%m-%d %H:%M:%S")
+                except (ValueError, KeyError):
+                    continue
+                if cutoff and event["_ts"] < cutoff:
+                    continue
+                events.append(event)
+    except FileNotFoundError:
+        pass
+    return events
+
+
+def summarize(by="task", since_hours=None, events=None):
+    """
+    Groups events by "task", "target" or ("task", "target") and returns per group:
+    actions, successes, success_rate, total_amount, yield_per_hour, amount_per_action,
+    avg_duration_s and avg_round_trips (the last two only count events that recorded them).
+    Yield per hour is spread over the whole window covered by the loaded events.
+    """
+    events = load_events(since_hours) if events is None else events
+    if not events:
+        return {}
+
+    first = min(e["_ts"] for e in events)
+    last = max(e["_ts"] for e in events)
+    window_hours = max((last - first).total_seconds() / 3600, 1 / 60)
+
+    keys = (by,) if isinstance(by, str) else tuple(by)
+    groups = {}
+    for e in events:
+        key = tuple(e.get(k) or "-" for k in keys)
+        key = key[0] if len(key) == 1 else key
+        g = groups.setdefault(key, {"actions": 0, "successes": 0, "judged": 0, "total_amount": 0,
+                                    "duration_sum": 0.0, "duration_n": 0, "trips_sum": 0, "trips_n": 0})
+        g["actions"] += 1
+        if "ok" in e:
+            g["judged"] += 1
+            g["successes"] += 1 if e["ok"] else 0
+        g["total_amount"] += e.get("amount", 0) or 0
+        if e.get("duration_s") is not None:
+            g["duration_sum"] += e["duration_s"]
+            g["duration_n"] += 1
+        if e.get("round_trips") is not None:
+            g["trips_sum"] += e["round_trips"]
+            g["trips_n"] += 1
+
+    out = {}
+    for key, g in groups.items():
+        out[key] = {
+            "actions": g["actions"],
+            "successes": g["successes"],
+            "success_rate": round(g["successes"] / g["judged"], 3) if g["judged"] else None,
+            "total_amount": g["total_amount"],
+            "yield_per_hour": round(g["total_amount"] / window_hours, 2),
+            "amount_per_action": round(g["total_amount"] / g["actions"], 2),
+            "avg_duration_s": round(g["duration_sum"] / g["duration_n"], 2) if g["duration_n"] else None,
+            "avg_round_trips": round(g["trips_sum"] / g["trips_n"], 1) if g["trips_n"] else None,
+        }
+    return out
+
+
+def yield_per_hour(by="task", since_hours=None):
+    return {k: v["yield_per_hour"] for k, v in summarize(by, since_hours).items()}
+
+
+def success_rate(by="task", since_hours=None):
+    return {k: v["success_rate"] for k, v in summarize(by, since_hours).items()}
+
+
+def cost_per_action(by="task", since_hours=None):
+    """Average seconds and WebDriver round trips per action."""
+    return {k: {"avg_duration_s": v["avg_duration_s"], "avg_round_trips": v["avg_round_trips"]}
+            for k, v in summarize(by, since_hours).items()}
+
+
+if __name__ == "__main__":
+    import sys
+    hours = float(sys.argv[1]) if len(sys.argv) > 1 else None
+    report = summarize("task", hours)
+    print(f"{'Task':<28}{'Actions':>8}{'Success':>9}{'$/hour':>12}{'Avg s':>8}{'Trips':>8}")
+    for task, row in sorted(report.items(), key=lambda kv: -kv[1]["yield_per_hour"]):
+        rate = f"{row['success_rate'] * 100:.0f}%" if row["success_rate"] is not None else "-"
+        print(f"{str(task):<28}{row['actions']:>8}{rate:>9}{row['yield_per_hour']:>12,.0f}"
+              f"{row['avg_duration_s'] if row['avg_duration_s'] is not None else '-':>8}"
+              f"{row['avg_round_trips'] if row['avg_round_trips'] is not None else '-':>8}")
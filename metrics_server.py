@@ -0,0 +1,203 @@
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import global_vars
+
+# Counters are only ever written by the bot's own threads with plain assignments and read by the HTTP thread,
+# so recording a sample never blocks on the metrics server.
+_cycle = {"count": 0, "last_seconds": 0.0, "sum_seconds": 0.0, "last_webdriver_commands": 0}
+_tasks = {}
+_timers = {}
+_lock_stats = {}
+_queue_depths_published = {}
+_notifications = {"sent": 0, "failed": 0}
+_started_at = time.time()
+_server = None
+
+
+def observe_cycle(duration_s, webdriver_commands):
+    """Records one main-loop cycle: wall time and WebDriver commands issued during it."""
+    _cycle["count"] += 1
+    _cycle["last_seconds"] = duration_s
+    _cycle["sum_seconds"] += duration_s
+    _cycle["last_webdriver_commands"] = webdriver_commands
+
+
+def observe_task(task, outcome, duration_s, error=None):
+    """Records one task run (outcome, latency) and remembers the last error message for the task."""
+    entry = _tasks.get(task)
+    if entry is None:
+        entry = {"runs": {}, "sum_seconds": 0.0, "count": 0, "last_seconds": 0.0, "last_error": "", "last_error_at": 0.0}
+        _tasks[task] = entry
+    entry["runs"][outcome] = entry["runs"].get(outcome, 0) + 1
+    entry["count"] += 1
+    entry["sum_seconds"] += duration_s
+    entry["last_seconds"] = duration_s
+    if error:
+        entry["last_error"] = str(error)
+        entry["last_error_at"] = time.time()
+
+
+def set_timers(timers):
+    """Publishes the latest timers-remaining snapshot (seconds)."""
+    global _timers
+    _timers = {k: v for k, v in (timers or {}).items() if isinstance(v, (int, float))}
+
+
+def set_lock_stats(lock_stats):
+    """
+    Publishes the driver lock wait/hold histograms the main loop copied at cycle end (DRIVER_LOCK.stats_snapshot()),
+    so a scrape never takes the driver lock's condition from the HTTP thread.
+    """
+    global _lock_stats
+    _lock_stats = lock_stats or {}
+
+
+def observe_notification(ok):
+    _notifications["sent" if ok else "failed"] += 1
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def set_queue_depths(depths):
+    """Publishes queue depths measured by the main loop (bank transfers, Blind Eye, Community Service)."""
+    global _queue_depths_published
+    _queue_depths_published = dict(depths or {})
+
+
+def _queue_depths():
+    """Bridge work queue (an in-memory qsize) plus the file-backed depths the main loop last published."""
+    depths = dict(_queue_depths_published)
+    bridge = sys.modules.get("discord_bridge")
+    if bridge is not None and hasattr(bridge, "work_queue"):
+        depths["discord_bridge"] = bridge.work_queue.qsize()
+    return depths
+
+
+def render_metrics():
+    """Prometheus text exposition of the current counters."""
+    lines = [
+        "# TYPE mmbot_uptime_seconds gauge",
+        f"mmbot_uptime_seconds {time.time() - _started_at:.0f}",
+        "# TYPE mmbot_cycles_total counter",
+        f"mmbot_cycles_total {_cycle['count']}",
+        "# TYPE mmbot_cycle_duration_seconds gauge",
+        f"mmbot_cycle_duration_seconds {_cycle['last_seconds']:.3f}",
+        "# TYPE mmbot_cycle_duration_seconds_sum counter",
+        f"mmbot_cycle_duration_seconds_sum {_cycle['sum_seconds']:.3f}",
+        "# TYPE mmbot_cycle_webdriver_commands gauge",
+        f"mmbot_cycle_webdriver_commands {_cycle['last_webdriver_commands']}",
+        "# TYPE mmbot_webdriver_commands_total counter",
+        f"mmbot_webdriver_commands_total {global_vars.WEBDRIVER_COMMAND_COUNT}",
+    ]
+
+    lines.append("# TYPE mmbot_task_runs_total counter")
+    for task, entry in list(_tasks.items()):
+        for outcome, count in list(entry["runs"].items()):
+            lines.append(f'mmbot_task_runs_total{{task="{_escape(task)}",outcome="{_escape(outcome)}"}} {count}')
+    lines.append("# TYPE mmbot_task_duration_seconds summary")
+    lines.append("# TYPE mmbot_task_last_duration_seconds gauge")
+    lines.append("# TYPE mmbot_task_last_error_timestamp_seconds gauge")
+    for task, entry in list(_tasks.items()):
+        label = f'task="{_escape(task)}"'
+        lines.append(f"mmbot_task_duration_seconds_sum{{{label}}} {entry['sum_seconds']:.3f}")
+        lines.append(f"mmbot_task_duration_seconds_count{{{label}}} {entry['count']}")
+        lines.append(f"mmbot_task_last_duration_seconds{{{label}}} {entry['last_seconds']:.3f}")
+        if entry["last_error"]:
+            lines.append(f'mmbot_task_last_error_timestamp_seconds{{{label},error="{_escape(entry["last_error"][:200])}"}} {entry["last_error_at"]:.0f}')
+
+    lines.append("# TYPE mmbot_timer_remaining_seconds gauge")
+    for name, seconds in list(_timers.items()):
+        if seconds != float('inf'):
+            lines.append(f'mmbot_timer_remaining_seconds{{timer="{_escape(name)}"}} {seconds:.1f}')
+
+    lines.append("# TYPE mmbot_queue_depth gauge")
+    for queue_name, depth in _queue_depths().items():
+        lines.append(f'mmbot_queue_depth{{queue="{queue_name}"}} {depth}')
+
+    health = sys.modules.get("browser_health")
+    if health is not None and health.last_rss_mb is not None:
+        lines.append("# TYPE mmbot_browser_memory_megabytes gauge")
+        mode = "headless" if global_vars.HEADLESS else "headful"
+        lines.append(f'mmbot_browser_memory_megabytes{{mode="{mode}"}} {health.last_rss_mb:.1f}')
+
+    pages = sys.modules.get("page_context")
+    if pages is not None:
+        lines.append("# TYPE mmbot_return_trips_total counter")
+        for result, count in pages.stats().items():
+            lines.append(f'mmbot_return_trips_total{{result="{result}"}} {count}')
+
+    lines.append("# TYPE mmbot_discord_notifications_total counter")
+    for result, count in list(_notifications.items()):
+        lines.append(f'mmbot_discord_notifications_total{{result="{result}"}} {count}')
+
+    lock_stats = _lock_stats
+    for kind in ("wait", "hold"):
+        lines.append(f"# TYPE mmbot_driver_lock_{kind}_seconds histogram")
+        for holder, kinds in lock_stats.items():
+            hist = kinds[kind]
+            label = f'holder="{_escape(holder)}"'
+            cumulative = 0
+            for upper, count in hist["buckets"].items():
+                cumulative += count
+                lines.append(f'mmbot_driver_lock_{kind}_seconds_bucket{{{label},le="{upper}"}} {cumulative}')
+            lines.append(f"mmbot_driver_lock_{kind}_seconds_sum{{{label}}} {hist['sum']}")
+            lines.append(f"mmbot_driver_lock_{kind}_seconds_count{{{label}}} {hist['count']}")
+
+    registry = sys.modules.get("selector_registry")
+    if registry is not None:
+        lines.append("# TYPE mmbot_selector_hit_rate gauge")
+        lines.append("# TYPE mmbot_selector_avg_ms gauge")
+        for name, stats in registry.selector_stats().items():
+            lines.append(f'mmbot_selector_hit_rate{{selector="{_escape(name)}"}} {stats["hit_rate"]}')
+            lines.append(f'mmbot_selector_avg_ms{{selector="{_escape(name)}"}} {stats["avg_ms"]}')
+
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_response(404)
+            self.end_headers()
+            return
+        try:
+            body = render_metrics().encode("utf-8")
+        except Exception as e:
+            self.send_response(500)
+            self.end_headers()
+            self.wfile.write(f"metrics error: {e}\n".encode("utf-8"))
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # keep scrapes out of the bot's console
+
+
+def start_metrics_server():
+    """
+    Starts the metrics endpoint on 127.0.0.1 if [Metrics] Port is set in settings.ini.
+    Runs on its own daemon thread; returns True if the server is listening.
+    """
+    global _server
+    if _server is not None:
+        return True
+    port = global_vars.config.get('Metrics', 'Port', fallback='').strip()
+    if not port:
+        return False
+    try:
+        _server = ThreadingHTTPServer(("127.0.0.1", int(port)), _MetricsHandler)
+    except (OSError, ValueError) as e:
+        print(f"[Metrics] Could not start metrics endpoint on port {port}: {e}")
+        return False
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+    print(f"[Metrics] Serving Prometheus metrics at http://127.0.0.1:{port}/metrics")
+    return True
@@ -3,12 +3,16 @@ import os
 import random
 import time
 import re
+import statistics
 from selenium.common import NoSuchElementException, StaleElementReferenceException
 from selenium.webdriver.common.by import By
 import global_vars
 from comms_journals import send_discord_notification, _clean_amount
-from helper_functions import _find_and_click, _find_element, _navigate_to_page_via_menu, _get_element_text, _get_dropdown_options, _select_dropdown_option, _find_and_send_keys, _get_current_url
-from database_functions import set_all_degrees_status, get_all_degrees_status, _set_last_timestamp, _read_json_file, _write_json_file
+from helper_functions import _find_and_click, _find_element, _navigate_to_page_via_menu, _get_element_text, _get_dropdown_options, _select_dropdown_option, _get_current_url
+from database_functions import set_all_degrees_status, get_all_degrees_status, _set_last_timestamp, _read_json_file, _write_json_file, update_shop_stock_snapshot, \
+    get_shop_restock_history, record_shop_observations, record_event, note_cash_need, get_shop_sweep_schedule, \
+    set_shop_sweep_schedule, get_shop_pending_buys, set_shop_pending_buys
+from bank_ops import bank_visit, project_cash_needs, pending_transfer_count
 from timer_functions import get_all_active_game_timers
 
 def study_degrees():
@@ -122,11 +126,20 @@ def clean_money_on_hand_logic(initial_player_data):
         else:
             print("Failed to click the quick deposit element.")
 
-    # Withdraw money if under target
-    if clean_money < desired_money_on_hand:
-        withdraw_amount = desired_money_on_hand - clean_money
-        print(f"Clean money (${clean_money:,}) is below desired amount (${desired_money_on_hand:,}). Will attempt to withdraw ${withdraw_amount:,}.")
-        if withdraw_amount > 0 and withdraw_money(withdraw_amount):
+    # Withdraw when below the desired amount or unable to cover the largest upcoming need, topping up to the
+    # desired amount plus what enabled tasks are expected to need (kept under the excess limit so it isn't
+    # deposited again next cycle). Queued transfers go out in the same Bank visit.
+    projected = project_cash_needs()
+    target = max(desired_money_on_hand, min(desired_money_on_hand + sum(projected.values()), excess_money_on_hand_limit))
+    short = clean_money < desired_money_on_hand or (projected and clean_money < max(projected.values()))
+    withdraw_amount = max(0, target - clean_money) if short else 0
+    if withdraw_amount > 0:
+        plan = f" (incl. planned: {', '.join(f'{k} ${v:,}' for k, v in projected.items())})" if projected else ""
+        print(f"Clean money (${clean_money:,}) is below target (${target:,}){plan}. Will attempt to withdraw ${withdraw_amount:,}.")
+
+    if withdraw_amount > 0 or pending_transfer_count():
+        withdrew, _ = bank_visit(withdraw=withdraw_amount, resume=False)
+        if withdraw_amount > 0 and withdrew:
             action_performed = True
 
     return action_performed
@@ -134,50 +147,18 @@ def clean_money_on_hand_logic(initial_player_data):
 def withdraw_money(amount: int):
     """
     Withdraws the specified amount of money from the bank.
+    Any queued transfers go out in the same Bank visit.
     Returns True if the withdrawal was successful, False otherwise.
     """
     print(f"Attempting to withdraw ${amount:,} from the bank.")
-    initial_url = _get_current_url()
-
-    try:
-        # Navigate to Bank page
-        if not _navigate_to_page_via_menu(
-            "//span[@class='income']",
-            "//a[normalize-space()='Bank']",
-            "Bank"
-        ):
-            print("Failed to navigate to the Bank page.")
-            return False
-
-        if not _find_and_click(By.XPATH, "//a[normalize-space()='Withdrawal']"):
-            print("Failed to click withdrawal button.")
-            return False
-
-        if not _find_and_send_keys(By.XPATH, "//input[@name='withdrawal']", str(amount)):
-            print("Failed to enter withdrawal amount.")
-            return False
-
-        if not _find_and_click(By.XPATH, "//input[@name='B1']"):
-            print("Failed to click withdraw submit button.")
-            return False
-
-        print(f"Successfully withdrew ${amount:,}.")
-        time.sleep(global_vars.ACTION_PAUSE_SECONDS * 2)
-        return True
-
-    finally:
-        # Safely return to the previous page
-        try:
-            if initial_url:
-                global_vars.driver.get(initial_url)
-                time.sleep(global_vars.ACTION_PAUSE_SECONDS)
-        except Exception:
-            print("WARNING: Could not return to previous page after withdrawal.")
+    withdrew, _ = bank_visit(withdraw=amount)
+    return withdrew
 
 
 def transfer_money(amount, recipient):
     """
     Transfers a specified amount of money to another player.
+    Any queued transfers go out in the same Bank visit.
 
     Args:
         amount (int or float): The amount of money to transfer.
@@ -187,54 +168,8 @@ def transfer_money(amount, recipient):
         bool: True if the transfer was successful, False otherwise.
     """
     print(f"\n--- Initiating Money Transfer: ${amount} to {recipient} ---")
-    initial_url = _get_current_url()
-
-    try:
-        # Navigate to Bank via Income menu
-        if not _navigate_to_page_via_menu("//span[@class='income']", "//td[@class='toolitem']//a[normalize-space()='Bank']", "Bank"):
-            print("FAILED: Navigation to Bank failed.")
-            return False
-
-        # Go to Transfers page
-        if not _find_and_click(By.XPATH, "//a[normalize-space()='Transfers']", pause=global_vars.ACTION_PAUSE_SECONDS):
-            print("FAILED: Could not click Transfers link.")
-            return False
-
-        # Fill out the transfer page
-        if not _find_and_send_keys(By.XPATH, "//input[@name='transferamount']", str(amount)):
-            print("FAILED: Could not enter transfer amount.")
-            return False
-
-        if not _find_and_send_keys(By.XPATH, "//input[@name='transfername']", recipient):
-            print("FAILED: Could not enter recipient name.")
-            return False
-
-        # Submit the transfer
-        if not _find_and_click(By.XPATH, "//input[@id='B1']", pause=global_vars.ACTION_PAUSE_SECONDS):
-            print("FAILED: Could not click Submit button.")
-            return False
-
-        # Verify transfer success
-        success_message = _find_element(By.XPATH, "//div[@id='success']", timeout=3, suppress_logging=True)
-        if success_message:
-            print(f"SUCCESS: Transferred ${amount} to {recipient} successfully.")
-            return True
-        else:
-            print("WARNING: Transfer may have failed (no success message detected).")
-            return False
-
-    except Exception as e:
-        print(f"ERROR during money transfer: {e}")
-        return False
-
-    finally:
-        # Safely return to the previous page
-        try:
-            if initial_url:
-                global_vars.driver.get(initial_url)
-                time.sleep(global_vars.ACTION_PAUSE_SECONDS)
-        except Exception:
-            print("WARNING: Could not return to previous page after transfer.")
+    _, results = bank_visit(transfers=[(amount, recipient)])
+    return bool(results) and results[0][0]
 
 def do_events():
     """
@@ -285,127 +220,6 @@ def do_events():
         global_vars._script_event_cooldown_end_time = datetime.datetime.now() + datetime.timedelta(minutes=random.uniform(5, 7))
         return False
 
-def check_weapon_shop(initial_player_data):
-    """
-    Checks the weapons shop for stock, message discord with results,
-    Withdraws money if required and automatically buy top weapons if enabled in settings.ini.
-    """
-    print("\n--- Beginning Weapon Shop Operation ---")
-
-    # The main loop has already determined this timer is ready, so no need to check again
-    print("Timer was marked ready by main loop. Proceeding with Weapon Shop check.")
-
-    # Read settings
-    min_check = global_vars.config['Weapon Shop'].getint('MinWSCheck', 13)
-    max_check = global_vars.config['Weapon Shop'].getint('MaxWSCheck', 18)
-    notify_stock = global_vars.config['Weapon Shop'].getboolean('NotifyWSStock', fallback=True)
-    auto_buy_enabled = global_vars.config['Weapon Shop'].getboolean('AutoBuyWS', fallback=False)
-    priority_weapons = [w.strip() for w in global_vars.config['Weapon Shop'].get('AutoBuyWeapons', fallback='').split(',')]
-
-    # Navigate to Weapon Shop
-    if not _navigate_to_page_via_menu(
-        "//span[@class='city']",
-        "//p[@class='weapon_shop']",
-        "Weapon Shop"
-    ):
-        print("FAILED: Failed to navigate to Weapon Shop page.")
-        global_vars._script_weapon_shop_cooldown_end_time = datetime.datetime.now() + datetime.timedelta(seconds=random.uniform(30, 90))
-        return False
-
-    print("Checking weapon shop for available stock...")
-    time.sleep(global_vars.ACTION_PAUSE_SECONDS)
-
-    found_weapons_in_stock = False
-    weapon_data = {}
-
-    # Check for stock
-    try:
-        table = global_vars.driver.find_element(By.TAG_NAME, "table")
-        rows = table.find_elements(By.TAG_NAME, "tr")
-
-        for row in rows:
-            try:
-                # Skip header and description rows
-                if row.find_elements(By.CLASS_NAME, "column_title"):
-                    continue
-                if "display_description" in row.get_attribute("class"):
-                    continue
-
-                td_elements = row.find_elements(By.TAG_NAME, "td")
-                if len(td_elements) < 4:
-                    continue  # Not a valid row
-
-                try:
-                    item_name_element = td_elements[1].find_element(By.TAG_NAME, "label")
-                    item_name = item_name_element.text.strip().split("\n")[0]
-                except NoSuchElementException:
-                    print("Warning: Couldn't find label element in second column. Skipping row.")
-                    continue
-
-                stock_str = td_elements[3].text.strip()
-                try:
-                    price_str = td_elements[2].text.strip().replace("$", "").replace(",", "")
-                    price = int(price_str)
-                    stock = int(stock_str)
-                except ValueError:
-                    print(f"Warning: Could not parse stock value '{stock_str}' for item '{item_name}'. Skipping.")
-                    continue
-
-                # Confirm stock level
-                if stock >= 1:
-                    found_weapons_in_stock = True
-                    print(f"{item_name} is in stock! Stock: {stock}")
-                    if notify_stock and item_name in priority_weapons:
-                        send_discord_notification("@here " f"{item_name} is in stock! Stock: {stock}")
-                    weapon_data[item_name] = {"stock": stock, "price": price}
-                else:
-                    print(f"Item: {item_name}, Stock: {stock} (out of stock)")
-
-            except (StaleElementReferenceException, Exception) as e:
-                print(f"Skipping row due to DOM or unknown error: {e}")
-                continue
-
-        # Attempt auto-buy if a priortised weapon is in stock
-        if found_weapons_in_stock and auto_buy_enabled and priority_weapons:
-            for weapon in priority_weapons:
-                data = weapon_data.get(weapon)
-                if not data or data["stock"] <= 0:
-                    continue
-
-                price = data["price"]
-                clean_money_text = _get_element_text(By.XPATH, "//div[@id='nav_right']//form[contains(., '$')]")
-                clean_money = int(''.join(filter(lambda c: c.isdigit(), clean_money_text))) if clean_money_text else 0
-
-                if clean_money < price:
-                    amount_needed = price - clean_money
-                    print(f"Not enough clean money to buy {weapon}. Withdrawing ${amount_needed:,}.")
-                    withdraw_money(amount_needed)
-
-                auto_buy_weapon(weapon)
-                break # Remove this break to buy all weapons in the priority list if multiple is in stock.
-
-        if not found_weapons_in_stock:
-            print("No weapons found in stock at the shop currently.")
-
-    # Unable to find the weapon shop table, meaning at max views or page structure has changed.
-    except NoSuchElementException:
-        print("Error: Could not find the weapon shop table on the page. Page structure might have changed.")
-        send_discord_notification("Error: Failed to locate weapon shop table. At max views.")
-        global_vars._script_weapon_shop_cooldown_end_time = datetime.datetime.now() + datetime.timedelta(minutes=random.uniform(15, 17))
-        return False
-    except Exception as e:
-        print(f"An unexpected error occurred during weapon shop check: {e}")
-        send_discord_notification(f"Error during weapon shop check: {e}")
-        global_vars._script_weapon_shop_cooldown_end_time = datetime.datetime.now() + datetime.timedelta(seconds=random.uniform(30, 90))
-        return False
-
-    # Set the next cooldown timestamp (randomized range from settings.ini)
-    next_check_time = datetime.datetime.now() + datetime.timedelta(minutes=random.uniform(min_check, max_check))
-    _set_last_timestamp(global_vars.WEAPON_SHOP_NEXT_CHECK_FILE, next_check_time)
-    global_vars._script_weapon_shop_cooldown_end_time = next_check_time
-    print(f"Weapon Shop check completed. Next check scheduled for {global_vars._script_weapon_shop_cooldown_end_time.strftime('%Y-%m-%d %H:%M:%S')}.")
-    return True
-
 def auto_buy_weapon(item_name: str):
     """
     Attempts to auto-buy the specified weapon if auto-buy is enabled and the weapon is whitelisted.
@@ -446,106 +260,11 @@ def auto_buy_weapon(item_name: str):
         if success_element:
             print(f"[AutoBuy] SUCCESS: {item_name} purchase confirmed.")
             send_discord_notification(f"Successfully purchased {item_name} from Weapon Shop!")
+            return True
         else:
             print(f"[AutoBuy] FAILED: No confirmation message found for {item_name}.")
             send_discord_notification(f"Attempted to purchase {item_name}, but failed. The item is gone, no available hands, or insufficient funds.")
-
-def check_drug_store(initial_player_data):
-    """
-    Checks the Drug Store for stock of Pseudoephedrine and Medipack.
-    Withdraws money and purchases if AutoBuy is enabled.
-    Sends a Discord alert if stock is found and sets a cooldown if not.
-    """
-    print("\n--- Beginning Drug Store Operation ---")
-
-    notify_stock = global_vars.config.getboolean('Drug Store', 'NotifyDSStock', fallback=True)
-
-    # Cooldown Check
-    if not hasattr(global_vars, '_script_drug_store_cooldown_end_time'):
-        global_vars._script_drug_store_cooldown_end_time = datetime.datetime.min
-
-    now = datetime.datetime.now()
-    if now < global_vars._script_drug_store_cooldown_end_time:
-        minutes_left = (global_vars._script_drug_store_cooldown_end_time - now).total_seconds() / 60
-        print(f"Drug Store check on cooldown. Next check in {minutes_left:.2f} minutes.")
-        return False
-
-    # Navigation
-    if not _navigate_to_page_via_menu(
-        "//span[@class='city']",
-        "//a[@class='business drug_store']",
-        "Drug Store"
-    ):
-        print("FAILED: Could not navigate to Drug Store.")
-        global_vars._script_drug_store_cooldown_end_time = now + datetime.timedelta(seconds=random.uniform(30, 90))
-        return False
-
-    print("Checking Drug Store for Pseudoephedrine and Medipack stock...")
-    time.sleep(global_vars.ACTION_PAUSE_SECONDS)
-
-    # Extract stock and price for both items
-    items_to_check = {
-        "Pseudoephedrine": "//label[normalize-space()='Pseudoephedrine']/ancestor::tr",
-        "Medipack": "//td[normalize-space()='Medipack']/parent::tr"
-    }
-
-    item_data = {}
-    found_stock = False
-
-    for name, row_xpath in items_to_check.items():
-        row_element = _find_element(By.XPATH, row_xpath)
-        if not row_element:
-            print(f"{name} row not found on the page.")
-            continue
-
-        td_elements = row_element.find_elements(By.TAG_NAME, "td")
-        if len(td_elements) < 4:
-            print(f"Not enough columns in row for {name}.")
-            continue
-
-        price_str = td_elements[2].text.strip().replace("$", "").replace(",", "")
-        stock_str = td_elements[3].text.strip()
-
-        try:
-            price = int(price_str)
-            stock = int(stock_str)
-            item_data[name] = {"price": price, "stock": stock}
-
-            if stock > 0:
-                print(f"DRUG STORE ALERT: {name} is in stock! Stock: {stock}")
-                if notify_stock:
-                    send_discord_notification(f"{name} is in stock! Stock: {stock}")
-                found_stock = True
-            else:
-                print(f"{name} is out of stock.")
-        except ValueError:
-            print(f"Warning: Could not parse price or stock for {name}. Raw values: price='{price_str}', stock='{stock_str}'")
-
-    # Attempt to buy, priortising Medipack over Pseudoephedrine
-    for name in ["Medipack", "Pseudoephedrine"]:
-        data = item_data.get(name)
-        if not data or data["stock"] <= 0:
-            continue
-
-        clean_money_text = _get_element_text(By.XPATH, "//div[@id='nav_right']//form[contains(., '$')]")
-        clean_money = int(''.join(filter(lambda c: c.isdigit(), clean_money_text))) if clean_money_text else 0
-        price = data["price"]
-
-        if clean_money < price:
-            amount_needed = price - clean_money
-            print(f"Not enough clean money to buy {name}. Withdrawing ${amount_needed:,}.")
-            withdraw_money(amount_needed)
-
-        auto_buy_drug_store_item(name)
-
-    if not found_stock:
-        print("No stock found for Pseudoephedrine or Medipack.")
-        global_vars._script_drug_store_cooldown_end_time = now + datetime.timedelta(minutes=random.uniform(5, 8))
-    else:
-        print("Stock was found, no cooldown set for Drug Store check.")
-
-    print(f"Drug Store check complete.")
-    return True
+    return False
 
 def auto_buy_drug_store_item(item_name: str):
     """
@@ -586,101 +305,12 @@ def auto_buy_drug_store_item(item_name: str):
         success_text = success_element.text.strip()
         print(f"[AutoBuy] SUCCESS: {success_text}")
         send_discord_notification(f"Purchased {item_name} from Drug Store.")
-
-        # Set a cooldown after a successful purchase.
-        global_vars._script_drug_store_cooldown_end_time = datetime.datetime.now() + datetime.timedelta(minutes=30)
-        print(f"[AutoBuy] Drug Store cooldown set until {global_vars._script_drug_store_cooldown_end_time}")
+        return True
     else:
         print(f"[AutoBuy] WARNING: No success message found after purchasing {item_name}.")
-        global_vars._script_drug_store_cooldown_end_time = datetime.datetime.now() + datetime.timedelta(minutes=30)
         send_discord_notification(f"Failed to purchase {item_name} from Drug Store. The item is gone, or insufficient funds.")
-
-def check_bionics_shop(initial_player_data):
-    """
-    Checks the Bionics Shop for stock, notifies Discord if enabled,
-    and attempts auto-buy if enabled and affordable.
-    """
-    print("\n--- Beginning Bionics Shop Operation ---")
-
-    # Settings
-    config = global_vars.config['Bionics Shop']
-    min_check = config.getint('MinBiosCheck', 11)
-    max_check = config.getint('MaxBiosCheck', 13)
-    notify_stock = config.getboolean('NotifyBSStock', fallback=True)
-    auto_buy_enabled = config.getboolean('DoAutoBuyBios', fallback=False)
-    priority_bionics = [b.strip() for b in config.get('AutoBuyBios', fallback='').split(',')]
-
-    # Navigation
-    if not _navigate_to_page_via_menu("//span[@class='city']",
-                                      "//a[@class='business bionics']",
-                                      "Bionics Shop"):
-        print("FAILED: Could not navigate to Bionics Shop.")
-        next_check = datetime.datetime.now() + datetime.timedelta(seconds=random.uniform(30, 90))
-        _set_last_timestamp(global_vars.BIONICS_SHOP_NEXT_CHECK_FILE, next_check)
         return False
 
-    print("Checking Bionics Shop for available stock...")
-    time.sleep(global_vars.ACTION_PAUSE_SECONDS)
-
-    found_bionics_in_stock = False
-    bionic_data = {}
-
-    try:
-        rows = global_vars.driver.find_elements(By.XPATH, "//table//tr[td/input[@type='radio']]")
-        for row in rows:
-            try:
-                radio = row.find_element(By.XPATH, ".//input[@type='radio']")
-                radio_id = radio.get_attribute("value")
-                name = row.find_element(By.TAG_NAME, "label").text.strip().split("\n")[0]
-                print(f"[DEBUG] Parsed: {name} | Value: {radio.get_attribute('value')} | ID: {radio.get_attribute('id')}")
-                price = int(row.find_elements(By.TAG_NAME, "td")[2].text.strip().replace("$", "").replace(",", ""))
-                stock = int(row.find_elements(By.TAG_NAME, "td")[3].text.strip())
-            except Exception as e:
-                print(f"Skipping row due to parse error: {e}")
-                continue
-
-            if stock > 0:
-                found_bionics_in_stock = True
-                print(f"{name} is in stock! Stock: {stock}")
-                if notify_stock and name in priority_bionics:
-                    send_discord_notification(f"@here {name} is in stock! Stock: {stock}")
-                bionic_data[name] = {"stock": stock, "price": price, "id": radio_id}
-            else:
-                print(f"{name} is out of stock.")
-
-        if found_bionics_in_stock and auto_buy_enabled:
-            for bionic in priority_bionics:
-                data = bionic_data.get(bionic)
-                if not data or data["stock"] <= 0:
-                    continue
-
-                price = data["price"]
-                clean_money_text = _get_element_text(By.XPATH, "//div[@id='nav_right']//form[contains(., '$')]")
-                clean_money = int(''.join(filter(str.isdigit, clean_money_text))) if clean_money_text else 0
-
-                if clean_money < price:
-                    amount_needed = price - clean_money
-                    print(f"Not enough clean money to buy {bionic}. Withdrawing ${amount_needed:,}.")
-                    withdraw_money(amount_needed)
-
-                auto_buy_bionic(bionic, data["id"])
-                break
-
-        if not found_bionics_in_stock:
-            print("No bionics found in stock.")
-
-    except Exception as e:
-        print(f"Error during Bionics Shop check: {e}")
-        send_discord_notification(f"Error: Failed during Bionics Shop check. At max views {e}")
-        next_check = datetime.datetime.now() + datetime.timedelta(minutes=random.uniform(10, 13))
-        _set_last_timestamp(global_vars.BIONICS_SHOP_NEXT_CHECK_FILE, next_check)
-        return False
-
-    next_check = datetime.datetime.now() + datetime.timedelta(minutes=random.uniform(min_check, max_check))
-    _set_last_timestamp(global_vars.BIONICS_SHOP_NEXT_CHECK_FILE, next_check)
-    print(f"Bionics Shop check complete. Next check at {next_check.strftime('%Y-%m-%d %H:%M:%S')}.")
-    return True
-
 def auto_buy_bionic(item_name: str, item_id: str):
     """
     Attempts to buy a bionic if it's allowed by settings.
@@ -714,9 +344,294 @@ def auto_buy_bionic(item_name: str, item_id: str):
     if success:
         print(f"[AutoBuy] SUCCESS: Purchased {item_name}.")
         send_discord_notification(f"Successfully bought {item_name} from Bionics Shop!")
+        return True
     else:
         print(f"[AutoBuy] FAILED: No confirmation for {item_name}.")
         send_discord_notification(f"Failed to purchase {item_name}. It might be gone, you may not have free hands, or funds were insufficient.")
+        return False
+
+# The local City page that links every shop; the sweep fetches it in the background to find the shop URLs.
+CITY_PAGE_URL = "https://mafiamatrix.com/localcity/local.asp"
+
+# City shops covered by the combined sweep: the city-page link (CSS) used to find the shop URL,
+# and the menu XPath used when we actually need to open the shop to buy.
+SHOP_SWEEP_TARGETS = {
+    "Weapon Shop": {"link_css": "p.weapon_shop", "menu_xpath": "//p[@class='weapon_shop']"},
+    "Drug Store": {"link_css": "a.business.drug_store", "menu_xpath": "//a[@class='business drug_store']"},
+    "Bionics Shop": {"link_css": "a.business.bionics", "menu_xpath": "//a[@class='business bionics']"},
+}
+
+# Fetches the City page and every requested shop page in the background (same session, no tab navigation)
+# and returns each shop's item rows.
+_SHOP_SWEEP_JS = """
+const done = arguments[arguments.length - 1];
+const shops = arguments[0];
+const cityUrl = new URL(arguments[1], location.href).href;
+const parse = html => new DOMParser().parseFromString(html, 'text/html');
+const get = async url => parse(await (await fetch(url, {credentials: 'same-origin'})).text());
+const textOf = node => {
+    const copy = node.cloneNode(true);
+    copy.querySelectorAll('br').forEach(b => b.replaceWith('\\n'));
+    return (copy.textContent || '').trim();
+};
+(async () => {
+    const city = await get(cityUrl);
+    const out = {};
+    for (const [name, css] of Object.entries(shops)) {
+        const el = city.querySelector(css);
+        const link = el ? (el.closest('a') || el.querySelector('a')) : null;
+        if (!link || !link.getAttribute('href')) { out[name] = {error: 'link not found on City page'}; continue; }
+        const url = new URL(link.getAttribute('href'), cityUrl).href;
+        const doc = await get(url);
+        const fail = doc.querySelector('#fail');
+        const rows = [];
+        doc.querySelectorAll('table tr').forEach(tr => {
+            if (tr.querySelector('.column_title') || (tr.className || '').includes('display_description')) { return; }
+            const tds = Array.prototype.filter.call(tr.children, c => c.tagName === 'TD');
+            if (tds.length < 4) { return; }
+            const label = tds[1].querySelector('label');
+            const radio = tr.querySelector("input[type='radio']");
+            rows.push({
+                name: textOf(label || tds[1]).split('\\n')[0].trim(),
+                price: textOf(tds[2]),
+                stock: textOf(tds[3]),
+                radio_value: radio ? radio.value : ''
+            });
+        });
+        out[name] = {url: url, fail: fail ? textOf(fail) : '', rows: rows};
+    }
+    return out;
+})().then(done, e => done({_error: String(e)}));
+"""
+
+def _shop_sweep_settings():
+    """Per-shop watch list, notify and auto-buy flags, plus the sweep interval (minutes) from settings.ini."""
+    cfg = global_vars.config
+    return {
+        "Weapon Shop": {
+            "watch": [w.strip() for w in cfg.get('Weapon Shop', 'AutoBuyWeapons', fallback='').split(',') if w.strip()],
+            "notify": cfg.getboolean('Weapon Shop', 'NotifyWSStock', fallback=True),
+            "auto_buy": cfg.getboolean('Weapon Shop', 'AutoBuyWS', fallback=False),
+            "interval": (cfg.getint('Weapon Shop', 'MinWSCheck', fallback=13), cfg.getint('Weapon Shop', 'MaxWSCheck', fallback=18)),
+        },
+        "Drug Store": {
+            "watch": ["Medipack", "Pseudoephedrine"],
+            "notify": cfg.getboolean('Drug Store', 'NotifyDSStock', fallback=True),
+            "auto_buy": cfg.getboolean('Drug Store', 'AutoBuyDS', fallback=False),
+            "interval": (cfg.getint('Drug Store', 'MinDSCheck', fallback=5), cfg.getint('Drug Store', 'MaxDSCheck', fallback=8)),
+        },
+        "Bionics Shop": {
+            "watch": [b.strip() for b in cfg.get('Bionics Shop', 'AutoBuyBios', fallback='').split(',') if b.strip()],
+            "notify": cfg.getboolean('Bionics Shop', 'NotifyBSStock', fallback=True),
+            "auto_buy": cfg.getboolean('Bionics Shop', 'DoAutoBuyBios', fallback=False),
+            "interval": (cfg.getint('Bionics Shop', 'MinBiosCheck', fallback=11), cfg.getint('Bionics Shop', 'MaxBiosCheck', fallback=13)),
+        },
+    }
+
+def _parse_shop_rows(rows):
+    """Turns raw shop rows into {item: {"stock", "price", "id"}}, skipping rows that don't parse."""
+    items = {}
+    for row in rows or []:
+        name = (row.get("name") or "").strip()
+        try:
+            price = int((row.get("price") or "").replace("$", "").replace(",", "").strip())
+            stock = int((row.get("stock") or "").strip())
+        except ValueError:
+            continue
+        if name:
+            items[name] = {"stock": stock, "price": price, "id": row.get("radio_value") or ""}
+    return items
+
+def _predict_next_restock(restocks, now):
+    """
+    Predicts the next restock from the median gap between observed restocks.
+    Returns (predicted_time, half_window) or None until enough restocks have been seen.
+    The half window is the median absolute deviation of the gaps, floored at 10% of the median gap.
+    """
+    times = []
+    for r in restocks or []:
+        try:
+            times.append(datetime.datetime.strptime(r["at"], "%Y-%m-%d %H:%M:%S.%f"))
+        except (KeyError, TypeError, ValueError):
+            continue
+    times.sort()
+    if len(times) < global_vars.SHOP_RESTOCK_MIN_SAMPLES:
+        return None
+
+    gaps = [(b - a).total_seconds() for a, b in zip(times, times[1:]) if b > a]
+    if not gaps:
+        return None
+    median_gap = statistics.median(gaps)
+    spread = statistics.median(abs(g - median_gap) for g in gaps)
+    half_window = datetime.timedelta(seconds=max(spread, median_gap * 0.1))
+
+    predicted = times[-1] + datetime.timedelta(seconds=median_gap)
+    # If a predicted window passed without a restock, roll forward to the next one
+    while predicted + half_window < now:
+        predicted += datetime.timedelta(seconds=median_gap)
+    return predicted, half_window
+
+def _next_shop_poll_minutes(shop, low, high, history, now):
+    """
+    Minutes until this shop should next be polled, always within [low, high].
+    Inside a predicted restock window we poll at the low bound; outside it we wait until the window opens,
+    capped at the high bound. Shops without enough history keep the configured random interval.
+    """
+    prediction = _predict_next_restock((history.get(shop) or {}).get("restocks"), now)
+    if not prediction:
+        return random.uniform(low, high)
+    predicted, half_window = prediction
+    window_start = predicted - half_window
+    if window_start <= now:
+        return low
+    return max(low, min(high, (window_start - now).total_seconds() / 60))
+
+def shop_restock_report(city):
+    """Per shop in `city`: restocks seen, average/worst catch latency (minutes) and the next predicted restock."""
+    history = get_shop_restock_history(city)
+    now = datetime.datetime.now()
+    report = {}
+    for shop, entry in history.items():
+        restocks = entry.get("restocks") or []
+        latencies = [r.get("latency_s", 0) for r in restocks]
+        prediction = _predict_next_restock(restocks, now)
+        report[shop] = {
+            "restocks_seen": len(restocks),
+            "avg_catch_latency_min": round(sum(latencies) / len(latencies) / 60, 1) if latencies else None,
+            "max_catch_latency_min": round(max(latencies) / 60, 1) if latencies else None,
+            "next_predicted": prediction[0].strftime('%Y-%m-%d %H:%M:%S') if prediction else None,
+        }
+    return report
+
+def _buy_from_shop(shop, item_name, data):
+    """
+    Opens the shop via the City menu, withdraws if short, and runs the shop's existing auto-buy routine.
+    Returns True if the item was bought.
+    """
+    if not _navigate_to_page_via_menu("//span[@class='city']", SHOP_SWEEP_TARGETS[shop]["menu_xpath"], shop):
+        print(f"FAILED: Could not open {shop} to buy {item_name}.")
+        return False
+
+    note_cash_need(f"{shop} auto-buy", data["price"])
+    clean_money_text = _get_element_text(By.XPATH, "//div[@id='nav_right']//form[contains(., '$')]")
+    clean_money = int(''.join(filter(str.isdigit, clean_money_text))) if clean_money_text else 0
+    if clean_money < data["price"]:
+        amount_needed = data["price"] - clean_money
+        print(f"Not enough clean money to buy {item_name}. Withdrawing ${amount_needed:,}.")
+        withdraw_money(amount_needed)
+
+    if shop == "Weapon Shop":
+        bought = auto_buy_weapon(item_name)
+    elif shop == "Drug Store":
+        bought = auto_buy_drug_store_item(item_name)
+    else:
+        bought = auto_buy_bionic(item_name, data["id"])
+    record_event(f"Buy ({shop})", "Bought" if bought else "Failed", ok=bought, target=item_name,
+                 amount=-data["price"] if bought else 0)
+    return bought
+
+def sweep_city_shops(shops, city=None):
+    """
+    Reads every enabled shop that is due in the current city in one background pass (the tab stays where
+    it is), diffs stock against that city's last snapshot (`city` is the current location), and only
+    notifies / auto-buys for watched items that came into stock or rose since the previous sweep. Each shop keeps its own next-check time; the sweep
+    timer fires at the soonest of them.
+    """
+    print("\n--- Beginning City Shop Sweep ---")
+    settings = _shop_sweep_settings()
+    shops = [s for s in shops if s in SHOP_SWEEP_TARGETS]
+    if not shops:
+        return False
+
+    schedule = get_shop_sweep_schedule(city)
+    now = datetime.datetime.now()
+    due = [s for s in shops if schedule.get(s) is None or schedule[s] <= now]
+    if not due:
+        next_check = min(schedule[s] for s in shops)
+        _set_last_timestamp(global_vars.SHOP_SWEEP_NEXT_CHECK_FILE, next_check)
+        global_vars._script_shop_sweep_cooldown_end_time = next_check
+        print(f"[Shops] No shop is due yet. Next sweep at {next_check.strftime('%Y-%m-%d %H:%M:%S')}.")
+        return False
+    print(f"[Shops] Due this sweep: {', '.join(due)}.")
+
+    try:
+        global_vars.driver.set_script_timeout(max(30, global_vars.EXPLICIT_WAIT_SECONDS * len(due)))
+        result = global_vars.driver.execute_async_script(
+            _SHOP_SWEEP_JS, {s: SHOP_SWEEP_TARGETS[s]["link_css"] for s in due}, CITY_PAGE_URL) or {}
+    except Exception as e:
+        result = {"_error": str(e)}
+
+    if result.get("_error"):
+        print(f"FAILED: Shop sweep could not read shop pages: {result['_error']}")
+        global_vars._script_shop_sweep_cooldown_end_time = datetime.datetime.now() + datetime.timedelta(seconds=random.uniform(30, 90))
+        return False
+
+    shop_items = {}
+    for shop in due:
+        page = result.get(shop) or {}
+        if page.get("error") or page.get("fail") or not page.get("rows"):
+            reason = page.get("error") or page.get("fail") or "no stock table (at max views?)"
+            print(f"[Shops] {shop}: {reason}")
+            continue
+        shop_items[shop] = _parse_shop_rows(page["rows"])
+        in_stock = {n: d["stock"] for n, d in shop_items[shop].items() if d["stock"] > 0}
+        print(f"[Shops] {shop}: {len(in_stock)} of {len(shop_items[shop])} item(s) in stock {in_stock if in_stock else ''}")
+
+    if not shop_items:
+        send_discord_notification("Error: Shop sweep could not read any shop. At max views?")
+        global_vars._script_shop_sweep_cooldown_end_time = datetime.datetime.now() + datetime.timedelta(minutes=random.uniform(15, 17))
+        return False
+
+    changes = update_shop_stock_snapshot(city, {shop: {n: d["stock"] for n, d in items.items()} for shop, items in shop_items.items()})
+    for shop, latency in record_shop_observations(city, list(shop_items), changes).items():
+        print(f"[Shops] {shop} restocked; caught ~{latency / 60:.1f} min after the estimated restock time.")
+
+    # A failed auto-buy is retried on later sweeps while the item stays in stock, even without a further rise
+    pending_buys = get_shop_pending_buys(city)
+    for shop, items in shop_items.items():
+        opts = settings[shop]
+        restocked = changes.get(shop) or {}
+        watched = [n for n in opts["watch"] if n in restocked]
+        if restocked and not watched:
+            print(f"[Shops] {shop}: stock changed for {', '.join(restocked)} (not on the watch list).")
+
+        if opts["notify"]:
+            for name in watched:
+                send_discord_notification(f"@here {name} is in stock at the {shop}! Stock: {restocked[name]}")
+
+        retry = [n for n in pending_buys.get(shop, []) if n in opts["watch"] and (items.get(n) or {}).get("stock", 0) > 0]
+        pending_buys[shop] = []
+        if opts["auto_buy"]:
+            # Watch lists are in priority order; buy the top restocked (or still unbought) item
+            candidates = [n for n in opts["watch"] if n in watched or n in retry]
+            if candidates:
+                name = candidates[0]
+                if name in retry and name not in watched:
+                    print(f"[Shops] {shop}: retrying the earlier failed buy of {name}.")
+                bought = _buy_from_shop(shop, name, items[name])
+                # Lower-priority items that came in (or are still unbought) wait for the next sweep
+                pending_buys[shop] = ([] if bought else [name]) + candidates[1:]
+    set_shop_pending_buys(city, pending_buys)
+
+    if not changes:
+        print("[Shops] No stock changes since the last sweep.")
+
+    # Reschedule only the shops fetched this sweep, each from its own restock history within its bounds.
+    # The sweep timer then fires at the soonest next check across all enabled shops.
+    history = get_shop_restock_history(city)
+    now = datetime.datetime.now()
+    for shop in due:
+        schedule[shop] = now + datetime.timedelta(minutes=_next_shop_poll_minutes(shop, *settings[shop]["interval"], history, now))
+    for shop, info in shop_restock_report(city).items():
+        if shop in due and info["next_predicted"]:
+            print(f"[Shops] {shop}: next restock predicted ~{info['next_predicted']} "
+                  f"(avg catch latency {info['avg_catch_latency_min']} min over {info['restocks_seen']} restocks).")
+    set_shop_sweep_schedule(city, schedule)
+    next_check = min(schedule[s] for s in shops)
+    _set_last_timestamp(global_vars.SHOP_SWEEP_NEXT_CHECK_FILE, next_check)
+    global_vars._script_shop_sweep_cooldown_end_time = next_check
+    print(f"Shop sweep complete. Next sweep at {next_check.strftime('%Y-%m-%d %H:%M:%S')}.")
+    return True
 
 def jail_work():
     """
@@ -735,23 +650,24 @@ def jail_work():
                 make_shank = global_vars.config.getboolean("Earns Settings", "MakeShank", fallback=False)
                 dig_tunnel = global_vars.config.getboolean("Earns Settings", "DigTunnel", fallback=False)
 
-                # Find all duties radio buttons
-                all_jobs = global_vars.driver.find_elements(By.XPATH, "//input[@type='radio' and @name='job']")
+                # Read every duty radio's id in one script call
+                all_job_ids = global_vars.driver.execute_script(
+                    "return Array.prototype.map.call(document.querySelectorAll(\"input[type='radio'][name='job']\"), function (e) { return e.id; });"
+                ) or []
 
                 # Filter the duties into a list, excluding makeshank and dig tunnel unless enabled. Jailappeal will always be off
                 valid_jobs = [
-                    job for job in all_jobs
-                    if job.get_attribute("id") not in {"makeshank", "digtunnel", "jailappeal"}
-                       or (job.get_attribute("id") == "makeshank" and make_shank)
-                       or (job.get_attribute("id") == "digtunnel" and dig_tunnel)
+                    job_id for job_id in all_job_ids
+                    if job_id not in {"makeshank", "digtunnel", "jailappeal"}
+                       or (job_id == "makeshank" and make_shank)
+                       or (job_id == "digtunnel" and dig_tunnel)
                 ]
 
                 if valid_jobs:
                     # Select the last valid duty
-                    last_job = valid_jobs[-1]
-                    job_id = last_job.get_attribute("id")
+                    job_id = valid_jobs[-1]
                     print(f"Selecting job: {job_id}")
-                    last_job.click()
+                    global_vars.driver.find_element(By.XPATH, f"//input[@type='radio' and @name='job' and @id='{job_id}']").click()
 
                     # Click submit
                     if _find_and_click(By.XPATH, "//input[@name='B1']"):
@@ -1018,6 +934,7 @@ def combat_training():
         return False
     price = int(m.group(1).replace(",", ""))
     print(f"Parsed course fee: ${price:,}")
+    note_cash_need("Training", price)
 
     # Determine clean cash (best effort) and withdraw shortfall
     current_clean = 0
@@ -1435,62 +1352,12 @@ def execute_sendmoney_to_player(target_player: str, amount_str: str) -> bool:
             print("You have insufficient funds")  # or "Invalid amount"; using provided phrasing constraints
             return False
 
-        # 1) Navigate to Bank
-        if not _navigate_to_page_via_menu(
-                "//span[@class='income']",
-                "//a[normalize-space()='Bank']",
-                "Bank"):
-            print("FAILED: Could not open Bank.")
-            return False
-
-        time.sleep(global_vars.ACTION_PAUSE_SECONDS)
-
-        # Click Transfers tab
-        if not _find_and_click(By.XPATH, "//a[normalize-space()='Transfers']", pause=global_vars.ACTION_PAUSE_SECONDS):
-            print("FAILED: Could not open Bank Transfers.")
-            return False
-
-        time.sleep(global_vars.ACTION_PAUSE_SECONDS / 2)
-
-        # Fill amount & player
-        amount_xpath = "//input[@name='transferamount']"
-        name_xpath = "//input[@name='transfername']"
-        transfer_btn_xpath = "//input[@id='B1']"
-
-        amount_el = _find_element(By.XPATH, amount_xpath, timeout=5)
-        name_el = _find_element(By.XPATH, name_xpath, timeout=5)
-        if not amount_el or not name_el:
-            print("FAILED: Transfer inputs not found.")
-            return False
-
-        # Clear and type
-        if not _find_and_send_keys(By.XPATH, amount_xpath, str(amt)):
-            print("FAILED: Could not enter transfer amount.")
-            return False
-
-        if not _find_and_send_keys(By.XPATH, name_xpath, target_player):
-            print("FAILED: Could not enter recipient name.")
-            return False
-
-        # Click Transfer
-        if not _find_and_click(By.XPATH, transfer_btn_xpath):
-            print("FAILED: Could not click Transfer.")
-            return False
-
-        time.sleep(global_vars.ACTION_PAUSE_SECONDS)
-
-        # Fail checks on the result page
-        src = (global_vars.driver.page_source or "")
-
-        if "You have entered an incorrect name!" in src:
-            print("Incorrect player name for transfer")
-            return False
-
-        if "You have insufficient funds to complete this transfer!" in src:
-            print("You have insufficient funds")
+        _, results = bank_visit(transfers=[(amt, target_player)])
+        ok, message = results[0] if results else (False, "no result")
+        if not ok:
+            print(f"Transfer to '{target_player}' failed: {message}")
             return False
 
-        # If we reach here, assume success (no explicit success text provided)
         print(f"Transfer completed: ${amt:,} to '{target_player}'.")
         return True
 
@@ -7,10 +7,12 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.select import Select
 import global_vars
 from comms_journals import send_discord_notification
-from database_functions import _read_json_file, remove_player_cooldown, set_player_data
+from database_functions import _read_json_file, set_player_data, get_banker_clients, set_banker_clients, \
+    note_banker_rejection, bury_players, filter_deceased
 from helper_functions import _find_and_send_keys, _find_and_click, _find_element, _navigate_to_page_via_menu, \
     _get_element_text, _get_element_attribute, _find_elements, _get_current_url, blind_eye_queue_count, \
-    _get_dropdown_options, _select_dropdown_option, dequeue_blind_eye, _find_elements_quiet
+    _get_dropdown_options, _select_dropdown_option, dequeue_blind_eye, _find_elements_quiet, fill_form
+from outcome_classifier import classify
 
 
 def community_services(player_data):
@@ -740,6 +742,8 @@ def banker_add_clients(current_player_home_city=None):
 
     # Identify players with a home city that is NOT the bot's home city
     for player_id, player_data_from_db in (cooldowns_data or {}).items():
+        if player_data_from_db.get(global_vars.PLAYER_YP_DEPARTED_KEY):
+            continue
         db_player_home_city = player_data_from_db.get(global_vars.PLAYER_HOME_CITY_KEY)
         if not isinstance(db_player_home_city, str) or not db_player_home_city.strip():
             continue
@@ -760,6 +764,15 @@ def banker_add_clients(current_player_home_city=None):
         global_vars._script_bank_add_clients_cooldown_end_time = datetime.datetime.now() + datetime.timedelta(seconds=random.uniform(300, 600))
         return False
 
+    # Drop deceased players, known clients and players that failed recently (negative cache) before touching the browser
+    client_state = get_banker_clients()
+    scrape_due = _banker_clients_scrape_due(client_state)
+    potential_clients = _filter_banker_candidates(filter_deceased(potential_clients), client_state)
+    if not potential_clients and not scrape_due:
+        print("No new client candidates (all established or recently rejected).")
+        global_vars._script_bank_add_clients_cooldown_end_time = datetime.datetime.now() + datetime.timedelta(hours=random.uniform(7, 9))
+        return False
+
     print(f"Found {len(potential_clients)} potential clients to add: {potential_clients}")
 
     # Ensure we're on the Banker page *before* scraping existing clients
@@ -775,13 +788,20 @@ def banker_add_clients(current_player_home_city=None):
     else:
         print("Already on Banker page, skipping navigation.")
 
-    # Now it is safe to scrape who we already do business with
-    existing_clients = get_existing_banker_clients()
-    existing_lower = {ec.lower() for ec in existing_clients}
+    # Resync the persisted client set from the Deals table once it's stale (deals can end)
+    if scrape_due:
+        existing_clients = get_existing_banker_clients()
+        if existing_clients is None:
+            print("Deals table not read; keeping the stored client set.")
+        else:
+            set_banker_clients(existing_clients, scraped=True)
+        client_state = get_banker_clients()
+        potential_clients = _filter_banker_candidates(potential_clients, client_state)
+        print(f"Filtered potential clients (excluding existing): {potential_clients}")
 
-    # Case-insensitive filtering
-    potential_clients = [c for c in potential_clients if c.lower() not in existing_lower]
-    print(f"Filtered potential clients (excluding existing): {potential_clients}")
+    # Most likely to succeed first: players seen most recently in the Yellow Pages are alive and listed
+    potential_clients.sort(key=lambda name: (cooldowns_data.get(name) or {}).get(global_vars.PLAYER_YP_LAST_SEEN_KEY) or "",
+                           reverse=True)
 
     if not potential_clients:
         print("All potential clients are already established. Nothing to do.")
@@ -823,33 +843,36 @@ def banker_add_clients(current_player_home_city=None):
             break
 
         try:
-            gangster_name_input_xpath = "//input[@name='gangster']"
-            if not _find_and_send_keys(By.XPATH, gangster_name_input_xpath, client_to_add):
-                print(f"FAILED: Could not enter client name '{client_to_add}'. Skipping.")
+            # Name + submit in one call; a deal only counts with the success banner
+            ok, fail_results = fill_form({(By.XPATH, "//input[@name='gangster']"): client_to_add},
+                                         submit=(By.XPATH, "//input[@type='submit' and @value='Establish Deal']"),
+                                         outcome=(By.ID, "fail"))
+            if not ok:
+                print(f"FAILED: Could not submit the deal form for client '{client_to_add}'. Skipping.")
                 continue
 
-            submit_button_xpath = "//input[@type='submit' and @value='Establish Deal']"
-            if not _find_and_click(By.XPATH, submit_button_xpath, pause=global_vars.ACTION_PAUSE_SECONDS * 2):
-                print(f"FAILED: Could not click submit button for client '{client_to_add}'. Skipping.")
-                continue
-
-            fail_element = _find_element(By.ID, "fail", timeout=1, suppress_logging=True)
-            if fail_element:
-                fail_results = _get_element_attribute(By.ID, "fail", "innerHTML") or ""
-                fl = fail_results.lower()
-                if 'appear to exist' in fl:
+            if fail_results:
+                outcome = classify("bank_add_client", fail_results).outcome
+                if outcome == "not_exist":
                     print(f"INFO: Client '{client_to_add}' does not appear to exist (dead/removed). Removing from database.")
-                    remove_player_cooldown(client_to_add)
-                elif 'from your home city' in fl:
+                    bury_players([client_to_add], "banker")
+                elif outcome == "home_city":
                     print(f"INFO: Client '{client_to_add}' is from your home city.")
                     # ensure we persist a string
                     set_player_data(client_to_add, home_city=current_player_home_city)
-                elif 'already do business' in fl:
+                    note_banker_rejection(client_to_add, outcome)
+                elif outcome == "already_client":
                     print(f"INFO: You already do business with '{client_to_add}'. Skipping.")
+                    set_banker_clients([client_to_add])
                 else:
                     print(f"WARNING: Unknown failure when adding client '{client_to_add}': {fail_results}")
-            else:
+                    note_banker_rejection(client_to_add, "unknown")
+            elif _find_elements_quiet(By.ID, "success"):
                 print(f"Successfully added client: {client_to_add}.")
+                set_banker_clients([client_to_add])
+            else:
+                # Neither banner showed (page didn't load?); don't record a deal we can't confirm
+                print(f"WARNING: No confirmation after adding client '{client_to_add}'. Not recording the deal.")
                 added_any_client = True
 
         except Exception as e:
@@ -864,11 +887,28 @@ def banker_add_clients(current_player_home_city=None):
         global_vars._script_bank_add_clients_cooldown_end_time = datetime.datetime.now() + datetime.timedelta(hours=random.uniform(7, 9))
         return False
 
+def _banker_clients_scrape_due(client_state):
+    """True if the Deals table hasn't been scraped within BANKER_CLIENTS_RESCRAPE_HOURS."""
+    try:
+        scraped_at = datetime.datetime.strptime(client_state.get("scraped_at", ""), "%Y-%m-%d %H:%M:%S.%f")
+    except (TypeError, ValueError):
+        return True
+    return datetime.datetime.now() - scraped_at > datetime.timedelta(hours=global_vars.BANKER_CLIENTS_RESCRAPE_HOURS)
+
+
+def _filter_banker_candidates(candidates, client_state):
+    """Candidates that are neither established clients nor under an active rejection (case-insensitive)."""
+    skip = set(client_state["clients"]) | set(client_state["rejected"])
+    return [c for c in candidates if c.lower() not in skip]
+
+
 def get_existing_banker_clients():
     """
     Scrapes the gangster names the banker already does business with
     from the Laundering Deals table under the 'Gangster' column.
     Ensures we're on the Banker page and the 'Deals' tab first.
+    Returns the names (an empty list only when the page says there are no deals), or None if the table
+    couldn't be read.
     """
     try:
         # Ensure we're on the Banker page
@@ -879,7 +919,7 @@ def get_existing_banker_clients():
                 "//a[normalize-space()='Convert Dirty Money']",
                 "Banker Page"):
                 print("FAILED: Could not navigate to Banker page before scraping existing clients.")
-                return []
+                return None
             time.sleep(global_vars.ACTION_PAUSE_SECONDS)
 
         # Find all rows that have a gangster link (href contains 'display=gangster')
@@ -893,7 +933,7 @@ def get_existing_banker_clients():
                 print("No existing banker clients found.")
                 return []
             print("No rows with gangster links found on Deals tab.")
-            return []
+            return None
 
         existing_clients = []
         for r in rows:
@@ -905,12 +945,16 @@ def get_existing_banker_clients():
             except Exception:
                 continue
 
+        if not existing_clients:
+            print("FAILED: Deals table rows found but no gangster names could be read.")
+            return None
+
         print(f"Existing banker clients found: {existing_clients}")
         return existing_clients
 
     except Exception as e:
         print(f"ERROR: Could not fetch existing banker clients: {e}")
-        return []
+        return None
 
 def fire_casework(initial_player_data):
     """
@@ -0,0 +1,180 @@
+import functools
+import re
+
+# Declarative phrase -> outcome tables for result blocks. Within a table, earlier entries win when several
+# match the same text. Named groups (name, amount, business) are extracted into the result.
+OUTCOME_TABLES = {
+    "hack": {
+        "patterns": [
+            ("cooldown_target", r"try them again later|recently survived an aggravated crime"),
+            ("non_existent_target", r"The name you typed in doesn't exist!"),
+            ("no_money", r"no money in their account"),
+            ("success", r"You managed to hack into (?P<name>.+?)'s bank account[\s\S]*?You transferred \$(?P<amount>[\d,]+)"),
+            ("success_unparsed", r"You managed to hack"),
+            ("failed_password", r"could not guess their password!"),
+            ("failed_proxy", r"behind a proxy server"),
+        ],
+    },
+    "pickpocket": {
+        "patterns": [
+            ("cooldown_target", r"try them again later|recently survived an aggravated crime"),
+            ("not_online", r"must be online"),
+            ("non_existent_target", r"The name you typed in doesn't exist!"),
+            ("wrong_city", r"The victim must be in the same city as you!"),
+            ("success", r"You pickpocketed (?P<name>.+?) for \$(?P<amount>[\d,]+)"),
+            ("success_unparsed", r"You pickpocketed"),
+            ("failed_attempt", r"and failed!"),
+        ],
+    },
+    "mugging": {
+        "patterns": [
+            ("cooldown_target", r"try them again later|recently survived an aggravated crime"),
+            ("not_online", r"must be online"),
+            ("non_existent_target", r"The name you typed in doesn't exist!"),
+            ("wrong_city", r"The victim must be in the same city as you!"),
+            ("success", r"You mugged (?P<name>.+?) for \$(?P<amount>[\d,]+)"),
+            ("success_unparsed", r"You mugged"),
+            ("failed_attempt", r"and failed!"),
+        ],
+    },
+    "armed_robbery": {
+        "patterns": [
+            ("success", r"You managed to hold up the (?P<business>.+?)(?: and| -| nothing|!| for \$|$)"),
+        ],
+    },
+    "torch": {
+        "patterns": [
+            ("success", r"managed to set ablaze the (?P<business>.+?)!"),
+            ("success_unparsed", r"managed to set ablaze"),
+            ("target_cooldown", r"recently survived|not yet repaired"),
+            ("own_business", r"That business is your own business!"),
+            ("failed", r"failed|ran off"),
+        ],
+    },
+    "bank_add_client": {
+        "flags": re.IGNORECASE,
+        "patterns": [
+            ("not_exist", r"appear to exist"),
+            ("home_city", r"from your home city"),
+            ("already_client", r"already do business"),
+        ],
+    },
+    # Result banners of the tasks whose pay is only reported on the page. Each table holds that task's own
+    # "you were paid" sentence, so a banner quoting a price, fee or balance is never booked as income.
+    "earn_payout": {
+        "patterns": [
+            ("payout", r"You (?:have )?earned \$(?P<amount>[\d,]+)"),
+            ("payout", r"You were paid \$(?P<amount>[\d,]+)"),
+        ],
+    },
+    "launder_payout": {
+        "patterns": [
+            # The clean money received wins over the dirty amount put in
+            ("payout", r"\breceived \$(?P<amount>[\d,]+) (?:in )?clean money"),
+            ("payout", r"You (?:have )?(?:successfully )?laundered \$(?P<amount>[\d,]+)"),
+        ],
+    },
+    "casework_payout": {
+        "patterns": [
+            ("payout", r"You (?:have )?earned \$(?P<amount>[\d,]+)"),
+            ("payout", r"You were (?:paid|awarded|rewarded) \$(?P<amount>[\d,]+)"),
+        ],
+    },
+    "bank_transfer": {
+        "patterns": [
+            ("incorrect_name", r"You have entered an incorrect name!"),
+            ("insufficient_funds", r"You have insufficient funds to complete this transfer!"),
+            ("success", r"You (?:have )?(?:successfully )?transferred \$(?P<amount>[\d,]+)|[Tt]ransfer (?:was )?(?:completed|successful)"),
+        ],
+    },
+}
+
+_AMOUNT_RE = re.compile(r"\$(\d[\d,]*)")
+_GROUP_RE = re.compile(r"\(\?P<(\w+)>")
+
+
+class Outcome:
+    """Classification of one result block: the winning outcome, its extracted fields and every outcome seen."""
+
+    def __init__(self, outcome, fields, matches, text):
+        self.outcome = outcome
+        self.fields = fields
+        self.matches = matches
+        self.text = text
+
+    def __bool__(self):
+        return self.outcome is not None
+
+    def __repr__(self):
+        return f"Outcome({self.outcome!r}, {self.fields!r})"
+
+    @property
+    def name(self):
+        return (self.fields.get("name") or "").strip() or None
+
+    @property
+    def business(self):
+        return (self.fields.get("business") or "").strip() or None
+
+    @property
+    def amount(self):
+        """The entry's own amount group if it has one, else the first $ amount in the block."""
+        raw = self.fields.get("amount")
+        if raw is None:
+            m = _AMOUNT_RE.search(self.text or "")
+            raw = m.group(1) if m else None
+        digits = "".join(ch for ch in (raw or "") if ch.isdigit())
+        return int(digits) if digits else None
+
+
+@functools.lru_cache(maxsize=None)
+def _compiled_table(table_name):
+    """One alternation regex per table; group names are prefixed per entry so they can repeat across entries."""
+    table = OUTCOME_TABLES[table_name]
+    parts = []
+    for i, (_, pattern) in enumerate(table["patterns"]):
+        pattern = _GROUP_RE.sub(lambda m: f"(?P<g{i}_{m.group(1)}>", pattern)
+        parts.append(f"(?P<o{i}>{pattern})")
+    return re.compile("|".join(parts), table.get("flags", 0))
+
+
+def classify(table_name, text):
+    """
+    Scans `text` once against the table's combined pattern and returns an Outcome.
+    The highest-priority entry among the matches wins; Outcome is falsy when nothing matched.
+    """
+    entries = OUTCOME_TABLES[table_name]["patterns"]
+    best_index, best_match = None, None
+    seen = []
+    for m in _compiled_table(table_name).finditer(text or ""):
+        for i in range(len(entries)):
+            if m.group(f"o{i}") is not None:
+                seen.append(entries[i][0])
+                if best_index is None or i < best_index:
+                    best_index, best_match = i, m
+                break
+
+    if best_index is None:
+        return Outcome(None, {}, [], text)
+    prefix = f"g{best_index}_"
+    fields = {k[len(prefix):]: v for k, v in best_match.groupdict().items() if k.startswith(prefix) and v is not None}
+    return Outcome(entries[best_index][0], fields, seen, text)
+
+
+@functools.lru_cache(maxsize=32)
+def phrase_matcher(phrases):
+    """
+    Compiles a set of plain phrases (e.g. a settings.ini filter list) into one regex, longest first.
+    Pass a tuple/frozenset so the compiled matcher is reused while the config is unchanged.
+    Returns None for an empty list.
+    """
+    phrases = sorted({p for p in phrases if p}, key=len, reverse=True)
+    if not phrases:
+        return None
+    return re.compile("|".join(re.escape(p) for p in phrases))
+
+
+def matches_any(text, phrases):
+    """True if any phrase occurs in text (single regex scan instead of one `in` check per phrase)."""
+    matcher = phrase_matcher(frozenset(phrases))
+    return bool(matcher and matcher.search(text or ""))
@@ -0,0 +1,98 @@
+import threading
+import time
+from selenium.webdriver.common.by import By
+import global_vars
+from helper_functions import _find_elements_quiet
+
+# While the main loop is running its task sequence, every following task opens its own page from the
+# header menus, and the loop itself goes back to RestingPage once before sleeping. A flow that ends
+# with "go back to where I started" only pays for an extra page load in that window, so those tail
+# return trips are deferred: the next task decides whether it needs them (see before_task), and the
+# loop drops any still pending at the end of the sequence. Outside the sequence (Discord bridge jobs,
+# idle sleep) they happen as before.
+#
+# Whether a page can serve the next task is a heuristic: the header menus (span.income) must be there,
+# and a task that skips its menu walk when already on a known page (TASK_START_PAGES) gets the deferred
+# return trip if that trip lands it on that page.
+TASK_START_PAGES = {
+    "Bank Casework": "banklaunder.asp",
+    "Bank Add Clients": "banklaunder.asp",
+    "Police Casework": "local.asp",
+    "Medical Casework": "hospital.asp",
+}
+
+_cycle_thread = None
+_deferred = None  # (url, label) of a return trip postponed until the next task starts
+_stats = {"returns": 0, "skipped": 0}
+
+
+def begin_cycle():
+    """Marks the start of the main loop's task sequence on the calling thread."""
+    global _cycle_thread, _deferred
+    _cycle_thread = threading.get_ident()
+    _deferred = None
+
+
+def end_cycle():
+    """Marks the end of the task sequence (the loop is about to restore RestingPage and sleep)."""
+    global _cycle_thread, _deferred
+    if _deferred:
+        _stats["skipped"] += 1
+    _cycle_thread = None
+    _deferred = None
+
+
+def in_task_sequence():
+    return _cycle_thread is not None and _cycle_thread == threading.get_ident()
+
+
+def _has_header_menus():
+    """True if the current page carries the header menus tasks navigate from."""
+    return bool(_find_elements_quiet(By.CSS_SELECTOR, "span.income"))
+
+
+def _navigate(url):
+    _stats["returns"] += 1
+    global_vars.driver.get(url)
+    time.sleep(global_vars.ACTION_PAUSE_SECONDS)
+
+
+def return_to(url, label):
+    """
+    Tail-of-flow return trip to `url`. While the main loop has further tasks to run and the current page
+    can serve as their starting point, the trip is deferred to before_task. Returns True if the browser navigated.
+    """
+    global _deferred
+    if not url:
+        return False
+    if in_task_sequence() and _has_header_menus():
+        _deferred = (url, label)
+        print(f"[Page] {label} done; staying on this page until the next task needs otherwise.")
+        return False
+    _navigate(url)
+    return True
+
+
+def before_task(task):
+    """
+    Called by the main loop before each task. Takes a deferred return trip if the current page has no header
+    menus, or if the trip lands on the page `task` can start from without its menu walk; otherwise drops it.
+    """
+    global _deferred
+    if not _deferred or not in_task_sequence():
+        return
+    url, label = _deferred
+    _deferred = None
+    start_page = TASK_START_PAGES.get(task)
+    current = (global_vars.driver.current_url or "").lower()
+    needs_start_page = bool(start_page) and start_page in url.lower() and start_page not in current
+    if needs_start_page or not _has_header_menus():
+        print(f"[Page] Returning after {label} for {task}.")
+        _navigate(url)
+    else:
+        _stats["skipped"] += 1
+
+
+def stats():
+    """Tail return trips taken vs skipped this session."""
+    return dict(_stats)
@@ -5,11 +5,70 @@ import time
 from selenium.webdriver.common.by import By
 import global_vars
 import os, json, re
-from selenium.webdriver.common.keys import Keys
+import functools
 from comms_journals import send_discord_notification
-from database_functions import _set_last_timestamp, _read_json_file, _write_json_file
+from database_functions import _set_last_timestamp, _read_json_file, _write_json_file, get_case_states, set_case_state, \
+    bury_players, filter_deceased
 from helper_functions import _navigate_to_page_via_menu, _find_and_click, _find_elements, _find_element, _find_and_send_keys, _get_element_text, _select_dropdown_option
 from timer_functions import parse_game_datetime
+from command_trace import traced_flow
+
+CASE_BODY_XPATH = "//*[@id='content']/div[@id='pd']/div[@id='shop_holder']/div[@id='holder_content']/div[@class='body']"
+
+# Precompiled case-body patterns (used by CaseSnapshot)
+_RE_BOLD_CELL = re.compile(r"<b>\s*([^<]*?)\s*</b>\s*</td>\s*<td[^>]*>(.*?)</td>", re.IGNORECASE | re.DOTALL)
+_RE_TAGS = re.compile(r"<[^>]+>")
+_RE_VICTIM = re.compile(r'Victim:\s*</td>\s*<td>.*?username=([^"&<]+)')
+_RE_TIME_OF_CRIME = re.compile(r"Time of Crime:\s*</td>\s*<td>([^<]+)</td>")
+_RE_DNA = re.compile(r'The DNA revealed\s+([^<]+)\s+was at the crime scene')
+_RE_FINGERPRINT = re.compile(r'owner could be,\s*([^.<]+)\.', re.IGNORECASE)
+_RE_EDGE_QUOTES = re.compile(r'^[\'"]|[\'"]$')
+_RE_FORENSIC_NAME = re.compile(r'name is\s*([^!]+)!')
+_RE_FORENSIC_ENDING = re.compile(r'name ended with\s*([^!]+)!')
+_RE_FIRE_IDENTITY = re.compile(r'identity:\s*([^<]+)</td>')
+_RE_FIRE_CLEAN = re.compile(r'[^a-zA-Z0-9_-]')
+_RE_VICTIM_STATEMENT = re.compile(r'ended with[: ]\s*([^.<<]+)[\.<]')
+_RE_WITNESS_STATEMENT = re.compile(r'name ended with\s*([^.<<]+)[\.<]')
+_RE_BACKGROUND = re.compile(r"background(?:-color)?:\s*([^;]+)")
+
+# Case lists (in-tray and reported cases)
+INTRAY_ROWS_XPATH = ("//table[contains(@style,'border-collapse')]"
+                     "//tr[.//input[@type='radio' and (@name='case' or contains(@name,'case'))]]")
+REPORTED_ROWS_XPATH = "//table[contains(@style,'border-collapse')]/tbody/tr[td/input[@type='radio' and @name='case']]"
+
+_CASE_ROWS_JS = """
+const snap = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const out = [];
+for (let i = 0; i < snap.snapshotLength; i++) {
+    const row = snap.snapshotItem(i);
+    const cells = Array.prototype.filter.call(row.children, c => c.tagName === 'TD');
+    const radio = row.querySelector("input[type='radio']");
+    const styles = [];
+    for (let c = 3; c < 8; c++) {
+        styles.push(cells[c] ? (cells[c].getAttribute('style') || '') : '');
+    }
+    out.push({
+        index: i,
+        case_no: cells[0] ? cells[0].innerText : '',
+        type: cells[1] ? cells[1].innerText : '',
+        victim: cells[2] ? cells[2].innerText : '',
+        text: row.innerText || '',
+        cell_count: cells.length,
+        styles: styles,
+        radio_name: radio ? radio.name : '',
+        radio_value: radio ? radio.value : ''
+    });
+}
+return out;
+"""
+
+_CASE_ROW_CLICK_JS = """
+const row = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null).snapshotItem(arguments[1]);
+const radio = row ? row.querySelector("input[type='radio']") : null;
+if (!radio) { return false; }
+radio.click();
+return true;
+"""
 
 
 def schedule_next_911_check(min_m: float = 20, max_m: float = 25, ret: bool = False):
@@ -20,7 +79,7 @@ def schedule_next_911_check(min_m: float = 20, max_m: float = 25, ret: bool = Fa
 
 def police_911():
     """
-    Automates copying the 911 list and posting it in the designated Interpol thread.
+    Automates copying the 911 list and posting it, with the local online list, in the designated Interpol thread.
     """
     print("\n--- Starting Police 911 Posting ---")
 
@@ -122,52 +181,30 @@ def police_911():
         print("FAILED: Could not click Post Reply button.")
         return schedule_next_911_check()
 
-    # Paste copied 911 list into reply box
-    print("Pasting 911 list into reply box...")
-    if not _find_and_send_keys(By.XPATH, "//textarea[@id='body']", compiled_911_list):
-        print("FAILED: Could not paste into text box.")
-        return schedule_next_911_check()
-
-    # Click "local" filter
+    # Show the local online list and read it straight from the page (no clipboard)
     if not _find_and_click(By.XPATH, "//span[@class='list-show selected']"):
         print("FAILED: Could not click 'local' filter.")
         return schedule_next_911_check()
 
-    # Copy the online list
-    print("Clicking 'Copy online list'...")
-    if not _find_and_click(By.XPATH, "//a[normalize-space()='Copy online list']"):
-        print("FAILED: Could not click 'Copy online list'.")
-        return schedule_next_911_check()
-
-    # Append the online list to text area
-    print("Appending online list to text box...")
-    textarea_element = _find_element(By.XPATH, "//textarea[@id='body']")
-    if textarea_element:
-        existing_text = textarea_element.get_attribute("value")
-        textarea_element.clear()
-        textarea_element.send_keys(existing_text + "\n\n")  # Make sure there's spacing
-        # Online list should now be in clipboard — paste it
-        textarea_element.send_keys(Keys.CONTROL, 'v')
-        # Get the pasted online list and parse it
-        updated_text = textarea_element.get_attribute("value") or ""
-        marker = (existing_text or "") + "\n\n"
-        online_block = updated_text[len(marker):] if updated_text.startswith(marker) else updated_text
-        online_users = _parse_online_usernames(online_block)
-        print(f"Parsed {len(online_users)} online users.")
-
-        # Attach online users to each parsed row
-        for row_data in parsed_rows:
-            row_data["online_users"] = online_users
-
-        # Persist crimes + who-was-online in one JSON
-        if parsed_rows:
-            _append_911_cache(parsed_rows)
-            print(f"Cached {len(parsed_rows)} 911 rows with online users to game_data.")
+    online_block, online_users = _read_online_list()
+    print(f"Read {len(online_users)} online users.")
+    if not online_users:
+        print("WARNING: Online list was empty or unreadable; posting the 911 list without it.")
 
-    else:
-        print("FAILED: Could not find textarea to append online list.")
+    # Fill the reply box once: 911 list, spacing, then the online list
+    print("Filling reply box with 911 list and online list...")
+    body = compiled_911_list + ("\n\n" + online_block if online_block else "")
+    if not _find_and_send_keys(By.XPATH, "//textarea[@id='body']", body):
+        print("FAILED: Could not fill the reply box.")
         return schedule_next_911_check()
 
+    # Attach online users to each parsed row and persist crimes + who-was-online in one JSON
+    for row_data in parsed_rows:
+        row_data["online_users"] = online_users
+    if parsed_rows:
+        _append_911_cache(parsed_rows)
+        print(f"Cached {len(parsed_rows)} 911 rows with online users to game_data.")
+
     # Post the reply
     print("Posting the reply...")
     if not _find_and_click(By.XPATH, "//input[@name='Submit']"):
@@ -233,89 +270,51 @@ def prepare_police_cases(character_name):
             global_vars._script_case_cooldown_end_time = datetime.datetime.now() + datetime.timedelta(minutes=mins)
             return True
 
-    # Helpers (function-scope, not inside the loop)
-    def _cell_bg(td):
-        style = (td.get_attribute("style") or "").lower()
-        m = re.search(r"background(?:-color)?:\s*([^;]+)", style)
-        return (m.group(1).strip() if m else "").lower().replace(" ", "")
-
-    def _is_orange(c: str) -> bool:
-        # The tray's "waiting" shade (fixed)
-        c = (c or "").lower().replace(" ", "")
-        return ("#e68f12" in c) or ("rgb(230,143,18)" in c)
-
     # -----------------
     # In-tray selection
     # -----------------
-    intray_rows = _find_elements(
-        By.XPATH,
-        "//table[contains(@style,'border-collapse')]"
-        "//tr[.//input[@type='radio' and (@name='case' or contains(@name,'case'))]]"
-    )
+    intray_rows = _extract_case_rows(INTRAY_ROWS_XPATH)
+
+    # Cases whose persisted state says re-opening can't advance them yet (lab not due, Action not ready)
+    timers = getattr(global_vars, 'jail_timers', {}) or {}
+    action_remaining = float(timers.get('action_time_remaining', 0) or 0)
+    case_states = get_case_states()
+    now = datetime.datetime.now()
+
+    def _waiting(row):
+        return bool(row["case_id"]) and not _case_can_advance(case_states.get(str(row["case_id"])), now, action_remaining)
 
     if intray_rows:
         picked = None
         any_non_orange_seen = False
         skipped_whack = 0
-        skipped_forensics = 0
+        skipped_waiting = []
 
         for row in intray_rows:
-            try:
-                # Skip whacking rows entirely
-                if _is_whacking_row(row):
-                    skipped_whack += 1
-                    continue
-
-                # Safely read color cells (W, DNA, FP, Fire, Autopsy = td[4..8])
-                def _bg_idx(idx: int) -> str:
-                    try:
-                        return _cell_bg(row.find_element(By.XPATH, f"./td[{idx}]"))
-                    except Exception:
-                        return ""
-
-                w  = _bg_idx(4)
-                d  = _bg_idx(5)
-                fp = _bg_idx(6)
-                f  = _bg_idx(7)
-                a  = _bg_idx(8)
-
-                # Only accept rows with NO orange anywhere
-                has_orange = any(_is_orange(x) for x in (w, d, fp, f, a))
-                if not has_orange:
-                    any_non_orange_seen = True
-
-                    # Skip if this case is marked pending-forensics AND Action>0
-                    case_no = (row.find_element(By.XPATH, "./td[1]").text or "").strip()
-                    digits = "".join(ch for ch in case_no if ch.isdigit())
-                    case_id = int(digits) if digits else None
-
-                    timers = getattr(global_vars, 'jail_timers', {}) or {}
-                    action_remaining = float(timers.get('action_time_remaining', 0) or 0)
-
-                    raw = _read_json_file(global_vars.PENDING_FORENSICS_FILE)
-                    if isinstance(raw, dict):
-                        pending_file = set(raw.get("_pending_forensics", []))  # tolerant if you ever migrate format
-                    elif isinstance(raw, list):
-                        pending_file = set(raw)
-                    else:
-                        pending_file = set()
-                    pending_mem = set(getattr(global_vars, "_cases_pending_forensics", set()) or [])
-
-                    if case_id and action_remaining > 0 and (case_id in (pending_file | pending_mem)):
-                        skipped_forensics += 1
-                        continue
+            # Skip whacking rows entirely
+            if _is_whacking_case(row):
+                skipped_whack += 1
+                continue
 
-                    picked = row
-                    break
+            # Only accept rows with NO orange anywhere
+            if any(_is_orange(x) for x in row["colours"]):
+                continue
+            any_non_orange_seen = True
 
-            except Exception:
-                # If anything odd happens on this row, just move on
+            # Skip cases still waiting on a lab result or on Action for forensics
+            if _waiting(row):
+                skipped_waiting.append(row["case_id"])
                 continue
 
+            picked = row
+            break
+
         if picked:
             # Open selected case
             try:
-                picked.find_element(By.XPATH, ".//input[@type='radio' and (@name='case' or contains(@name,'case'))]").click()
+                if not _select_case_row(INTRAY_ROWS_XPATH, picked):
+                    print("FAILED: Could not select the case radio.")
+                    return False
                 btn = _find_element(By.XPATH, "//input[@type='submit' and (contains(@value,'Select Case') or normalize-space(@value)='Select')]")
                 if btn:
                     btn.click()
@@ -341,12 +340,17 @@ def prepare_police_cases(character_name):
 
         # Nothing picked — explain why and back off
         if any_non_orange_seen:
-            print(f"No orange-free cases were eligible (whack skips: {skipped_whack}, awaiting Action/forensics: {skipped_forensics}). Waiting before re-check.")
+            print(f"No orange-free cases were eligible (whack skips: {skipped_whack}, awaiting lab/Action: {len(skipped_waiting)}). Waiting before re-check.")
         else:
             print("All cases have orange boxes — waiting before re-check.")
 
-        mins = random.uniform(5, 7)
-        global_vars._script_case_cooldown_end_time = datetime.datetime.now() + datetime.timedelta(minutes=mins)
+        wait_until = now + datetime.timedelta(minutes=random.uniform(5, 7))
+        # Come back as soon as the first waiting case is due, if that is sooner
+        due = [_case_revisit_time(case_states.get(str(cid))) for cid in skipped_waiting]
+        due = [t for t in due if t and t > now]
+        if due and min(due) < wait_until:
+            wait_until = max(min(due), now + datetime.timedelta(seconds=random.uniform(33, 42)))
+        global_vars._script_case_cooldown_end_time = wait_until
         return True
 
     # -----------------------
@@ -359,48 +363,31 @@ def prepare_police_cases(character_name):
 
     print("Scanning Reported Cases for eligible cases (skip ORANGE)…")
 
-    rows = _find_elements(By.XPATH, "//table[contains(@style,'border-collapse')]/tbody/tr[td/input[@type='radio' and @name='case']]")
-
-    def _score_row(row):
-        # returns (score, has_orange)
-        w  = _cell_bg(row.find_element(By.XPATH, "./td[4]"))
-        d  = _cell_bg(row.find_element(By.XPATH, "./td[5]"))
-        fp = _cell_bg(row.find_element(By.XPATH, "./td[6]"))
-        f  = _cell_bg(row.find_element(By.XPATH, "./td[7]"))
-        a  = _cell_bg(row.find_element(By.XPATH, "./td[8]"))
-        has_orange = any(_is_orange(x) for x in (w, d, fp, f, a))
-
-        # Prefer green, then yellow
-        score = 0
-        for x in (d, fp):
-            if "#4c8a23" in x or "rgb(76,138,35)" in x:     # green
-                score += 2
-            elif "#e8d71d" in x or "rgb(232,215,29)" in x:  # yellow
-                score += 1
-        return score, has_orange
+    rows = _extract_case_rows(REPORTED_ROWS_XPATH)
 
     best_row, best_score = None, -1
     for row in rows:
-        try:
-            if _is_whacking_row(row):
-                print("Skipping WHACKING case.")
-                continue
-
-            score, has_orange = _score_row(row)
-            if has_orange:
-                continue
-            if score > best_score:
-                best_row, best_score = row, score
-        except Exception:
+        if _is_whacking_case(row):
+            print("Skipping WHACKING case.")
+            continue
+        # Rows without the full W/DNA/FP/Fire/Autopsy block can't be scored
+        if row["cell_count"] < 8:
+            continue
+        if any(_is_orange(x) for x in row["colours"]):
             continue
+        if _waiting(row):
+            continue
+        score = _score_case_row(row)
+        if score > best_score:
+            best_row, best_score = row, score
 
     if best_row:
         print(f"Eligible case chosen (score {best_score}). Opening…")
         try:
-            best_row.find_element(By.XPATH, ".//input[@type='radio' and @name='case']").click()
-            btn = _find_element(By.XPATH, "//input[@type='submit' and contains(@value,'Select Case')]")
-            if btn:
-                btn.click()
+            if _select_case_row(REPORTED_ROWS_XPATH, best_row):
+                btn = _find_element(By.XPATH, "//input[@type='submit' and contains(@value,'Select Case')]")
+                if btn:
+                    btn.click()
         except Exception:
             print("FAILED: Could not open the selected case.")
             return False
@@ -417,23 +404,7 @@ def prepare_police_cases(character_name):
     print("No eligible reported cases found.")
     return False
 
-def _is_witness_only_case():
-    """
-    Returns True if the open case appears to be a witness case (no victim report yet).
-    Identified by reading 'Not reported yet' in the case body.
-    """
-    h = _case_body_html()
-    if not h:
-        return False
-    # Original witness marker from legacy script:
-    if "<i>Not reported yet" in h:
-        return True
-    # Extra guard: explicit witness statement but no victim statement
-    if ("Witness Statement:" in h) and ("Victim Statement:" not in h):
-        return True
-    return False
-
-def collect_evidence():
+def collect_evidence(case_id=None):
     """
     Ensure evidence exists on the open case:
     - If torch: ensure Fire Investigation exists
@@ -441,18 +412,22 @@ def collect_evidence():
     - Ensure Travel evidence is present
     If DNA was just requested, set a short timer and stop.
     Then, if DNA/FP cells contain numbers, run them through the records database and come back to Intray.
+    Evidence collected and labs requested are recorded in the case's state record.
     """
     print("\n--- Collecting Case Evidence ---")
     h = _case_body_html()
     if not h:
         print("FAILED: Could not read case contents for evidence check.")
         return False
+    case_id = case_id or _get_current_case_id()
 
     # for Torches, do Fire Investigations only when the section exists and says 'None'
     if _is_torch() and "Fire Investigation:" in h and "None" in h:
         print("FIRE INVESTIGATION REQUIRED")
-        _find_and_click(By.XPATH, "//*[@id='pd']//div[@class='links']/input[5]")  # Fire investigation
+        if _find_and_click(By.XPATH, "//*[@id='pd']//div[@class='links']/input[5]"):  # Fire investigation
+            _note_case(case_id, evidence=("fire",), pending=("fire",))
         time.sleep(global_vars.ACTION_PAUSE_SECONDS)
+        _invalidate_case_snapshot()
 
     # Fingerprints — only dust if the value cell is blank
     fp_value = _get_case_cell("Fingerprint Evidence:")
@@ -462,7 +437,9 @@ def collect_evidence():
         if _find_and_click(By.XPATH, f"//*[@id='pd']//div[@class='links']/input[{idx}]"):
             # Give the page a moment to populate the FP cell, then re-read it
             time.sleep(global_vars.ACTION_PAUSE_SECONDS * 2)
+            _invalidate_case_snapshot()
             fp_after = _get_case_cell("Fingerprint Evidence:") or ""
+            _note_case(case_id, evidence=("fingerprints",))
             if fp_after:
                 print(f"Fingerprint log updated to: '{fp_after}'")
                 fp_value = fp_after  # <-- IMPORTANT: use latest value for DB logic below
@@ -479,11 +456,15 @@ def collect_evidence():
         if _find_and_click(By.XPATH, f"//*[@id='pd']//div[@class='links']/input[{idx}]"):
             # Give the page a moment to update, then re-read DNA Log
             time.sleep(global_vars.ACTION_PAUSE_SECONDS * 2)
+            _invalidate_case_snapshot()
             dna_after = _get_case_cell("DNA Log:") or ""
             dna_after_l = dna_after.lower()
+            if "awaiting results" not in dna_after_l:
+                _note_case(case_id, evidence=("dna",))
 
             if "awaiting results" in dna_after_l:
                 print("Awaiting DNA results - Returning case.")
+                _note_case(case_id, evidence=("dna",), pending=("dna",))
                 _return_case()
                 return False
 
@@ -499,13 +480,16 @@ def collect_evidence():
             print("FAILED: Could not click DNA button.")
     else:
         print(f"DNA evidence already present {dna_content}). Skipping swab.")
+        if "awaiting results" not in dna_content.lower():
+            _note_case(case_id, evidence=("dna",), resolved=("dna",))
 
     # Travel — only add if the value cell is blank
     # NOTE: "No valid travel evidence found." counts as PRESENT (do not click again)
     travel_value = _get_case_cell("Travel Log:")
     if not travel_value:
         print("TRAVEL EVIDENCE REQUIRED")
-        _enter_travel_evidence()
+        if _enter_travel_evidence():
+            _note_case(case_id, evidence=("travel",))
     else:
         print(f"Travel evidence present ({travel_value}). Skipping.")
 
@@ -521,6 +505,7 @@ def collect_evidence():
         print(f"DNA present ({dna_content}). Checking Records Database…")
         if _records_database_add_if_results("DNA"):
             any_added = True
+            _note_case(case_id, evidence=("records_dna",))
         went_to_records_db = True
     else:
         if dna_content:
@@ -530,6 +515,7 @@ def collect_evidence():
         print(f"FingerPrint cell contains numbers ({fp_value}). Checking Records database…")
         if _records_database_add_if_results("Fingerprints"):
             any_added = True
+            _note_case(case_id, evidence=("records_fingerprints",))
         went_to_records_db = True
     else:
         if fp_value:
@@ -663,6 +649,7 @@ def _enter_suspect(name):
         print(f"Failed to enter suspect '{name}': {e}")
     return False
 
+@traced_flow
 def solve_case(character_name):
     """
     Solve the open case using:
@@ -677,8 +664,10 @@ def solve_case(character_name):
         _bury_case()
         return True
 
+    case_id = _get_current_case_id()
+
     # Ensure evidence actions are done first (dust/swab/travel + Records DB if needed)
-    if not collect_evidence():
+    if not collect_evidence(case_id):
         print("Evidence pending (e.g., DNA). Will try again later.")
         return False
 
@@ -686,6 +675,7 @@ def solve_case(character_name):
     dna_status = _get_case_cell("DNA Log:")
     if dna_status and "awaiting results" in dna_status.lower():
         print("Awaiting DNA results - Returning case.")
+        _note_case(case_id, pending=("dna",))
         _return_case()
         return True
 
@@ -696,8 +686,10 @@ def solve_case(character_name):
         # treat as pending if: blank, "none", or doesn't include the word "identity"
         if not fire_text or fire_text == "none" or ("identity" not in fire_text):
             print("Fire Investigation pending - Return case.")
+            _note_case(case_id, pending=("fire",))
             _return_case()
             return True
+        _note_case(case_id, resolved=("fire",))
 
     # Parse cues AFTER evidence work
     cues = _parse_case_for_signals()
@@ -750,6 +742,7 @@ def solve_case(character_name):
                 fail_box = _find_element(By.XPATH, "//*[@id='fail']")
                 if fail_box and "is now dead" in fail_box.get_attribute("innerText").lower():
                     print("Suspect is dead per banner – burying case.")
+                    bury_players([infer], "police case")
                     _bury_case()
                     return True
 
@@ -771,13 +764,10 @@ def solve_case(character_name):
                 action_remaining = float(timers.get('action_time_remaining', float('inf')))
 
                 if action_remaining and action_remaining > 0:
-                    # Mark this case to the database so we skip until Action is ready
-                    cid = _get_current_case_id()
-                    if cid:
-                        pf = set(_read_json_file(global_vars.PENDING_FORENSICS_FILE) or [])
-                        pf.add(cid)
-                        _write_json_file(global_vars.PENDING_FORENSICS_FILE, sorted(pf))
-                        print(f"FORENSICS: Action not ready; marking case #{cid} to skip until Action=0.")
+                    # Record that this case waits on Action so it isn't re-opened until Action=0
+                    if case_id:
+                        _note_case(case_id, pending=("action",))
+                        print(f"FORENSICS: Action not ready; case #{case_id} skipped until Action=0.")
 
                     _return_case()
                     return True
@@ -785,18 +775,8 @@ def solve_case(character_name):
                 print("No evidence or name cues, Requesting Forensics.")
                 if _request_forensics_via_duties():
                     time.sleep(global_vars.ACTION_PAUSE_SECONDS)
-                    # Since we requested forensics, unmark this case id (if present)
-                    cid = _get_current_case_id()
-                    if cid:
-                        pf = set(_read_json_file(global_vars.PENDING_FORENSICS_FILE) or [])
-                        if cid in pf:
-                            pf.remove(cid)
-                            _write_json_file(global_vars.PENDING_FORENSICS_FILE, sorted(pf))
-
-                    # since we requested forensics, unskip this id (if present)
-                    cid = _get_current_case_id()
-                    if cid and cid in global_vars._cases_pending_forensics:
-                        global_vars._cases_pending_forensics.discard(cid)
+                    _invalidate_case_snapshot()
+                    _note_case(case_id, evidence=("forensics",), resolved=("action",))
 
                     # Re-parse case so forensics ending is available, then fall through to existing fallback
                     cues = _parse_case_for_signals() or {}
@@ -838,6 +818,7 @@ def solve_case(character_name):
                 fail_box = _find_element(By.XPATH, "//*[@id='fail']")
                 if fail_box and "is now dead" in fail_box.get_attribute("innerText").lower():
                     print("Suspect is dead per banner – burying case.")
+                    bury_players([infer], "police case")
                     _bury_case()
                     return True
 
@@ -865,6 +846,8 @@ def solve_case(character_name):
             alive_matches, dead_matches = _search_phonebook_by_ending(ending, crime_time)
             print(f"PHONEBOOK ALIVE MATCHES ({ending}): {alive_matches}")
             print(f"PHONEBOOK OBITUARY MATCHES ({ending}): {dead_matches}")
+            if dead_matches:
+                bury_players(dead_matches, "phonebook")
 
             # Prefer alive matches first
             if len(alive_matches) == 1:
@@ -933,6 +916,7 @@ def solve_case(character_name):
     fail_box = _find_element(By.XPATH, "//*[@id='fail']")
     if fail_box and "is now dead" in fail_box.get_attribute("innerText").lower():
         print("Suspect is dead per banner – burying case.")
+        bury_players([suspect], "police case")
         _bury_case()
         return True
 
@@ -944,99 +928,205 @@ def solve_case(character_name):
     print("Case closed successfully.")
     return True
 
+# -------------------------
+# Case snapshot
+# -------------------------
+
+@functools.lru_cache(maxsize=None)
+def _case_cell_patterns(label_text):
+    """Compiled (strict, loose) patterns for a labelled cell, built once per label."""
+    strict = re.compile(rf"<b>\s*{re.escape(label_text)}\s*</b>\s*</td>\s*<td[^>]*>(.*?)</td>", re.IGNORECASE | re.DOTALL)
+    loose = re.compile(rf"{re.escape(label_text)}.*?</td>\s*<td[^>]*>(.*?)</td>", re.IGNORECASE | re.DOTALL)
+    return strict, loose
+
+
+class CaseSnapshot:
+    """
+    Parsed view of the open case body, built once per case-page version.
+    Holds the raw HTML, every bold-labelled cell, and the solver signals (agg type, victim, time,
+    DNA/fingerprint/forensics/fire suspects and statement name endings).
+    """
+
+    def __init__(self, html, version=None):
+        self.html = html
+        self.version = version
+        self.cells = {}
+        self._cell_cache = {}
+        self.is_torch = False
+        self.is_witness_only = False
+        self.signals = {}
+        if html:
+            self._parse()
+
+    def _parse(self):
+        raw = self.html
+        for m in _RE_BOLD_CELL.finditer(raw):
+            label = m.group(1).strip().lower()
+            if label not in self.cells:
+                self.cells[label] = _RE_TAGS.sub("", m.group(2)).strip()
+
+        self.is_torch = "BIZ TORCH" in raw or "Torch" in raw
+        # Original witness marker from legacy script, plus witness statement with no victim statement
+        self.is_witness_only = ("<i>Not reported yet" in raw) or ("Witness Statement:" in raw and "Victim Statement:" not in raw)
+
+        data = {
+            "agg_type": None,
+            "victim": None,
+            "agg_time": None,
+            "suspect": None,
+            "fingerprint": None,
+            "dna": None,
+            "fire": None,
+            "forensics": None,
+            "victim_statement": None,
+            "witness_statement": None,
+        }
+
+        # Agg type
+        if self.is_torch:
+            data["agg_type"] = "Torch"
+        elif "HACK" in raw or "Hacking" in raw:
+            data["agg_type"] = "Hack"
+        elif "Armed Robbery" in raw:
+            data["agg_type"] = "AR"
+        elif "MUGGING" in raw or "Mugging" in raw:
+            data["agg_type"] = "Mug"
+        elif "Breaking" in raw:
+            data["agg_type"] = "BnE"
+
+        # Victim + time (best-effort extraction)
+        m = _RE_VICTIM.search(raw)
+        if m:
+            data["victim"] = m.group(1)
+        tm = _RE_TIME_OF_CRIME.search(raw)
+        if tm:
+            data["agg_time"] = tm.group(1).strip()
+
+        # DNA → hard suspect
+        if "DNA Log:" in raw and "was at the crime scene" in raw:
+            md = _RE_DNA.search(raw)
+            if md:
+                data["dna"] = md.group(1).strip()
+                data["suspect"] = data["dna"]
+
+        # Fingerprints (owner could be …)
+        if "Fingerprint Evidence:" in raw:
+            mf = _RE_FINGERPRINT.search(raw)
+            if mf:
+                name = _RE_EDGE_QUOTES.sub('', mf.group(1).strip()).strip()
+                data["fingerprint"] = name
+                # Only promote to suspect if it's clearly a single name and we don't already have a harder suspect
+                if "," not in name and not data.get("suspect"):
+                    data["suspect"] = name
+
+        # Forensics
+        if "Forensic Log" in raw:
+            mf = _RE_FORENSIC_NAME.search(raw)
+            if mf:
+                data["forensics"] = mf.group(1).strip()
+                data["suspect"] = data["forensics"]
+            else:
+                mf2 = _RE_FORENSIC_ENDING.search(raw)
+                if mf2:
+                    data["forensics"] = mf2.group(1).strip()
+
+        # Fire (torch identity)
+        if self.is_torch and "Fire Investigation:" in raw and "identity:" in raw:
+            mf = _RE_FIRE_IDENTITY.search(raw)
+            if mf:
+                data["fire"] = _RE_FIRE_CLEAN.sub('', mf.group(1))
+
+        # Witness / Victim statements (name endings)
+        if "Victim Statement:" in raw:
+            mve = _RE_VICTIM_STATEMENT.search(raw)
+            if mve:
+                data["victim_statement"] = mve.group(1).strip()
+
+        if "Witness Statement:" in raw:
+            mwe = _RE_WITNESS_STATEMENT.search(raw)
+            if mwe:
+                data["witness_statement"] = mwe.group(1).strip()
+
+        self.signals = data
+
+    def cell(self, label_text):
+        """Stripped text of the value cell after a label; empty string if absent or blank."""
+        if not self.html:
+            return ""
+        if label_text in self._cell_cache:
+            return self._cell_cache[label_text]
+        value = self.cells.get(label_text.strip().lower())
+        if value is None:
+            strict, loose = _case_cell_patterns(label_text)
+            m = strict.search(self.html) or loose.search(self.html)
+            value = _RE_TAGS.sub("", m.group(1)).strip() if m else ""
+        self._cell_cache[label_text] = value
+        return value
+
+    def has_section(self, label):
+        return bool(self.html and label in self.html)
+
+
+_case_snapshot = None
+
+
+def _case_page_version():
+    """Cheap identity for the loaded case page: URL plus the document's load time (changes on every form post)."""
+    try:
+        return tuple(global_vars.driver.execute_script("return [location.href, performance.timeOrigin];") or ())
+    except Exception:
+        return None
+
+
+def _get_case_snapshot():
+    """Returns the memoised CaseSnapshot, rebuilding it only when the case page has changed."""
+    global _case_snapshot
+    version = _case_page_version()
+    if _case_snapshot is not None and version and _case_snapshot.version == version:
+        return _case_snapshot
+    elem = _find_element(By.XPATH, CASE_BODY_XPATH)
+    html = elem.get_attribute("innerHTML") if elem else None
+    _case_snapshot = CaseSnapshot(html, version if html else None)
+    return _case_snapshot
+
+
+def _invalidate_case_snapshot():
+    """Forces the next read to re-parse the case body."""
+    global _case_snapshot
+    _case_snapshot = None
+
+
+def _case_body_html():
+    return _get_case_snapshot().html
+
+def _is_torch():
+    return _get_case_snapshot().is_torch
+
+def _has_section(label):
+    return _get_case_snapshot().has_section(label)
+
+def _get_case_cell(label_text: str) -> str:
+    """
+    Returns the stripped text inside the <td> cell that follows a label.
+    Example: label_text="DNA Log:" -> inner text of the value cell.
+    Empty string means the cell is present but blank.
+    """
+    return _get_case_snapshot().cell(label_text)
+
+def _is_witness_only_case():
+    """
+    Returns True if the open case appears to be a witness case (no victim report yet).
+    Identified by reading 'Not reported yet' in the case body.
+    """
+    return _get_case_snapshot().is_witness_only
+
 def _parse_case_for_signals():
     """
     Parse case body for: agg type, victim, time, suspect via DNA/fingerprint/forensics/fire,
     and witness/victim name endings.
     """
-    raw = _case_body_html()
-    if not raw:
-        return {}
-
-    data = {
-        "agg_type": None,
-        "victim": None,
-        "agg_time": None,
-        "suspect": None,
-        "fingerprint": None,
-        "dna": None,
-        "fire": None,
-        "forensics": None,
-        "victim_statement": None,
-        "witness_statement": None,
-    }
-
-    # Agg type
-    if "BIZ TORCH" in raw or "Torch" in raw:
-        data["agg_type"] = "Torch"
-    elif "HACK" in raw or "Hacking" in raw:
-        data["agg_type"] = "Hack"
-    elif "Armed Robbery" in raw:
-        data["agg_type"] = "AR"
-    elif "MUGGING" in raw or "Mugging" in raw:
-        data["agg_type"] = "Mug"
-    elif "Breaking" in raw:
-        data["agg_type"] = "BnE"
-
-    # Victim + time (best-effort extraction)
-    m = re.search(r'Victim:\s*</td>\s*<td>.*?username=([^"&<]+)', raw)
-    if m:
-        data["victim"] = m.group(1)
-    tm = re.search(r"Time of Crime:\s*</td>\s*<td>([^<]+)</td>", raw)
-    if tm:
-        data["agg_time"] = tm.group(1).strip()
-
-    # DNA → hard suspect
-    if "DNA Log:" in raw and "was at the crime scene" in raw:
-        md = re.search(r'The DNA revealed\s+([^<]+)\s+was at the crime scene', raw)
-        if md:
-            data["dna"] = md.group(1).strip()
-            data["suspect"] = data["dna"]
-
-    # Fingerprints (owner could be …)
-    if "Fingerprint Evidence:" in raw:
-        mf = re.search(r'owner could be,\s*([^.<]+)\.', raw, re.IGNORECASE)
-        if mf:
-            name = mf.group(1).strip()
-            # clean any trailing punctuation/quotes
-            name = re.sub(r'^[\'"]|[\'"]$', '', name).strip()
-            data["fingerprint"] = name
-            # Only promote to suspect if it's clearly a single name (no commas)
-            # and only if we don't already have a harder suspect (e.g., DNA).
-            if "," not in name and not data.get("suspect"):
-                data["suspect"] = name
-
-    # Forensics
-    if "Forensic Log" in raw:
-        mf = re.search(r'name is\s*([^!]+)!', raw)
-        if mf:
-            data["forensics"] = mf.group(1).strip()
-            data["suspect"] = data["forensics"]
-        else:
-            mf2 = re.search(r'name ended with\s*([^!]+)!', raw)
-            if mf2:
-                data["forensics"] = mf2.group(1).strip()
-
-    # Fire (torch identity)
-    if _is_torch() and "Fire Investigation:" in raw and "identity:" in raw:
-        mf = re.search(r'identity:\s*([^<]+)</td>', raw)
-        if mf:
-            data["fire"] = re.sub(r'[^a-zA-Z0-9_-]', '', mf.group(1))
-
-    # Witness / Victim statements (name endings)
-    mv = re.search(r'Victim Statement:', raw)
-    if mv:
-        mve = re.search(r'ended with[: ]\s*([^.<<]+)[\.<]', raw)
-        if mve:
-            data["victim_statement"] = mve.group(1).strip()
-
-    mw = re.search(r'Witness Statement:', raw)
-    if mw:
-        mwe = re.search(r'name ended with\s*([^.<<]+)[\.<]', raw)
-        if mwe:
-            data["witness_statement"] = mwe.group(1).strip()
-
-    return data
+    snapshot = _get_case_snapshot()
+    return dict(snapshot.signals) if snapshot.html else {}
 
 # -------------------------
 # Evidence & solving helpers
@@ -1044,32 +1134,12 @@ def _parse_case_for_signals():
 
 def _close_case():
     print("Closing case")
-    # Cleanup pending-forensics list
-    try:
-        cid = _get_current_case_id()
-        if cid:
-            pf = set(_read_json_file(global_vars.PENDING_FORENSICS_FILE) or [])
-            if cid in pf:
-                pf.remove(cid)
-                _write_json_file(global_vars.PENDING_FORENSICS_FILE, sorted(pf))
-    except Exception as e:
-        print(f"WARNING: Could not remove case from pending-forensics list: {e}")
-
+    _forget_case(_get_current_case_id())
     return _find_and_click(By.XPATH, "//*[@id='pd']//div[@class='links']/input[1]")  # Close
 
 def _bury_case():
     print("Burying case")
-    # Cleanup pending-forensics list
-    try:
-        cid = _get_current_case_id()
-        if cid:
-            pf = set(_read_json_file(global_vars.PENDING_FORENSICS_FILE) or [])
-            if cid in pf:
-                pf.remove(cid)
-                _write_json_file(global_vars.PENDING_FORENSICS_FILE, sorted(pf))
-    except Exception as e:
-        print(f"WARNING: Could not remove case from pending-forensics list: {e}")
-
+    _forget_case(_get_current_case_id())
     return _find_and_click(By.XPATH, "//*[@id='pd']//div[@class='links']/input[2]")  # Bury
 
 def _return_case():
@@ -1101,41 +1171,6 @@ def _enter_travel_evidence():
         return False
     return True
 
-def _case_body_html():
-    elem = _find_element(By.XPATH, "//*[@id='content']/div[@id='pd']/div[@id='shop_holder']/div[@id='holder_content']/div[@class='body']")
-    return elem.get_attribute("innerHTML") if elem else None
-
-def _is_torch():
-    h = _case_body_html()
-    return bool(h and ("BIZ TORCH" in h or "Torch" in h))
-
-def _has_section(label):
-    h = _case_body_html()
-    return bool(h and (label in h))
-
-def _get_case_cell(label_text: str) -> str:
-    """
-    Returns the stripped text inside the <td> cell that follows a label.
-    Example: label_text="DNA Log:" -> inner text of the value cell.
-    Empty string means the cell is present but blank.
-    Handles <b>Label</b></td><td>Value</td> structures.
-    """
-    h = _case_body_html()
-    if not h:
-        return ""
-    # Pattern 1: label inside <b>…</b>
-    pat1 = rf"<b>\s*{re.escape(label_text)}\s*</b>\s*</td>\s*<td[^>]*>(.*?)</td>"
-    m = re.search(pat1, h, re.IGNORECASE | re.DOTALL)
-    if not m:
-        # Pattern 2: looser fallback (allow anything until the label cell closes)
-        pat2 = rf"{re.escape(label_text)}.*?</td>\s*<td[^>]*>(.*?)</td>"
-        m = re.search(pat2, h, re.IGNORECASE | re.DOTALL)
-        if not m:
-            return ""
-    # Strip tags & whitespace
-    val = re.sub(r"<[^>]+>", "", m.group(1))
-    return val.strip()
-
 def _records_database_add_if_results(kind: str) -> bool:
     """
     From an open case, jump to 'Records database' and add results if available.
@@ -1227,15 +1262,64 @@ def _append_911_cache(new_rows: list):
             }
             # keep the online snapshot if present
             if "online_users" in r and isinstance(r["online_users"], list):
-                entry["online_users"] = ", ".join(r["online_users"])
+                entry["online_users"] = ", ".join(filter_deceased(r["online_users"]))
             cache.append(entry)
             seen.add(key)
 
     with open(path, "w", encoding="utf-8") as f:
         json.dump(cache, f, ensure_ascii=False, indent=2)
 
+# Reads the online list from its container only, so profile links elsewhere on the page (journals, case
+# tables, comms) are never mistaken for online players. Returns the usernames from the visible entries
+# (id="profileLink:<name>:...") and the text the "Copy online list" link copies (the element it names by id
+# in its onclick/href), which is the block the game itself pastes: a header plus the names.
+ONLINE_LIST_XPATH = "/html/body/div[5]/div[3]/div[1]"
+
+_ONLINE_LIST_JS = """
+const box = document.evaluate(arguments[0], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (!box) return {names: [], text: '', missing: true};
+const names = [];
+for (const a of box.querySelectorAll("a[id^='profileLink:']")) {
+    if (a.offsetParent === null) continue;
+    const name = a.id.split(':')[1];
+    if (name) names.push(name);
+}
+
+let text = '';
+const link = Array.from(box.querySelectorAll('a')).find(
+    a => (a.textContent || '').trim().toLowerCase() === 'copy online list');
+if (link) {
+    const handler = (link.getAttribute('onclick') || '') + ' ' + (link.getAttribute('href') || '');
+    for (const quoted of handler.match(/['"]#?[A-Za-z][\\w-]*['"]/g) || []) {
+        const el = document.getElementById(quoted.replace(/['"#]/g, ''));
+        text = el ? (el.value || el.innerText || el.textContent || '') : '';
+        if (text.trim()) break;
+    }
+}
+return {names: names, text: text.trim()};
+"""
+
+def _read_online_list():
+    """
+    Reads the online list in one script call, without the clipboard.
+    Returns (block, usernames): block is the game's copy-list text (falls back to one name per line),
+    usernames are de-duplicated.
+    """
+    try:
+        result = global_vars.driver.execute_script(_ONLINE_LIST_JS, ONLINE_LIST_XPATH) or {}
+    except Exception as e:
+        print(f"FAILED: Could not read the online list: {e}")
+        return "", []
+    if result.get("missing"):
+        print("FAILED: Online list container not found on this page.")
+        return "", []
+    names = result.get("names") or []
+    text = result.get("text") or ""
+    users = _parse_online_usernames("\n".join(names) if names else text)
+    return (text or "\n".join(users)), users
+
 def _parse_online_usernames(block: str) -> list[str]:
-    """Convert raw pasted online list text into a clean username list."""
+    """Convert raw online list text (one name per line or comma-separated) into a clean username list."""
     if not block:
         return []
     lines = [l.strip() for l in block.splitlines() if l.strip()]
@@ -1258,21 +1342,149 @@ def _parse_online_usernames(block: str) -> list[str]:
             out.append(u)
     return out
 
-def _is_whacking_row(row):
+def _extract_case_rows(rows_xpath):
+    """
+    Reads every case row matched by rows_xpath in one script call.
+    Each row: index, case_no, case_id, type (td 2), victim (td 3), text, cell_count,
+    colours (W, DNA, FP, Fire, Autopsy backgrounds = td 4..8) and the radio's name/value.
+    """
+    try:
+        raw = global_vars.driver.execute_script(_CASE_ROWS_JS, rows_xpath) or []
+    except Exception as e:
+        print(f"FAILED: Could not read case list: {e}")
+        return []
+
+    rows = []
+    for r in raw:
+        case_no = (r.get("case_no") or "").strip()
+        digits = "".join(ch for ch in case_no if ch.isdigit())
+        rows.append({
+            "index": r.get("index"),
+            "case_no": case_no,
+            "case_id": int(digits) if digits else None,
+            "type": (r.get("type") or "").strip(),
+            "victim": (r.get("victim") or "").strip(),
+            "text": r.get("text") or "",
+            "cell_count": r.get("cell_count") or 0,
+            "colours": [_style_background(st) for st in (r.get("styles") or [])],
+            "radio": (r.get("radio_name") or "", r.get("radio_value") or ""),
+        })
+    return rows
+
+def _style_background(style):
+    m = _RE_BACKGROUND.search((style or "").lower())
+    return (m.group(1).strip() if m else "").lower().replace(" ", "")
+
+def _is_orange(c: str) -> bool:
+    # The tray's "waiting" shade (fixed)
+    c = (c or "").lower().replace(" ", "")
+    return ("#e68f12" in c) or ("rgb(230,143,18)" in c)
+
+def _score_case_row(row):
+    """Prefer green, then yellow, on the DNA and FP cells."""
+    score = 0
+    for x in row["colours"][1:3]:
+        if "#4c8a23" in x or "rgb(76,138,35)" in x:     # green
+            score += 2
+        elif "#e8d71d" in x or "rgb(232,215,29)" in x:  # yellow
+            score += 1
+    return score
+
+def _is_whacking_case(row):
     """True if the row's type/description looks like a whacking case."""
+    return "whack" in f"{row['type']} {row['victim']} {row['text']}".lower()
+
+_CASE_TS_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+def _lab_result_minutes(lab):
+    return {"dna": global_vars.CASE_DNA_RESULT_MINUTES, "fire": global_vars.CASE_FIRE_RESULT_MINUTES}.get(lab, 0)
+
+def _lab_overdue(lab, requested_at):
+    """True once a pending lab's expected result time has passed (or its stamp can't be read)."""
     try:
-        # Try likely "type" columns first (2 or 3), then fall back to the whole row text.
-        for idx in (2, 3):
-            try:
-                t = (row.find_element(By.XPATH, f"./td[{idx}]").text or "").lower()
-                if "whack" in t:  # matches 'whack', 'whacking', etc.
-                    return True
-            except Exception:
-                pass
-        t = (row.get_attribute("innerText") or "").lower()
-        return "whack" in t
-    except Exception:
+        ready = datetime.datetime.strptime(requested_at, _CASE_TS_FORMAT) + datetime.timedelta(minutes=_lab_result_minutes(lab))
+    except (TypeError, ValueError):
+        return True
+    return ready <= datetime.datetime.now()
+
+def _note_case(case_id, evidence=(), pending=(), resolved=()):
+    """
+    Updates the persisted state record for a case: evidence collected, labs now pending (stamped with
+    the request time) and labs resolved. A lab still pending after its expected result time is re-stamped,
+    so a slow lab pushes the revisit out by another lab interval instead of re-opening the case every cycle.
+    The earliest useful revisit is the latest expected lab result. Only writes when something changed.
+    """
+    if not case_id:
+        return
+    state = get_case_states().get(str(case_id)) or {"evidence": [], "pending": {}}
+    state.pop("updated_at", None)
+    before = json.dumps(state, sort_keys=True)
+
+    now_s = datetime.datetime.now().strftime(_CASE_TS_FORMAT)
+    state["evidence"] = sorted(set(state.get("evidence", [])) | set(evidence))
+    labs = dict(state.get("pending") or {})
+    for lab in pending:
+        if lab not in labs or (lab != "action" and _lab_overdue(lab, labs[lab])):
+            labs[lab] = now_s
+    for lab in resolved:
+        labs.pop(lab, None)
+    state["pending"] = labs
+
+    revisit = None
+    for lab, requested_at in labs.items():
+        if lab == "action":  # released by the live Action timer, not by the clock
+            continue
+        try:
+            ready = datetime.datetime.strptime(requested_at, _CASE_TS_FORMAT) + datetime.timedelta(minutes=_lab_result_minutes(lab))
+        except ValueError:
+            continue
+        revisit = ready if revisit is None or ready > revisit else revisit
+    if revisit:
+        state["revisit_after"] = revisit.strftime(_CASE_TS_FORMAT)
+    else:
+        state.pop("revisit_after", None)
+
+    if json.dumps(state, sort_keys=True) != before:
+        set_case_state(case_id, state)
+
+def _forget_case(case_id):
+    """Drops the state record once a case is closed or buried."""
+    if case_id:
+        try:
+            set_case_state(case_id, None)
+        except Exception as e:
+            print(f"WARNING: Could not clear state for case #{case_id}: {e}")
+
+def _case_revisit_time(state):
+    try:
+        return datetime.datetime.strptime(state.get("revisit_after", ""), _CASE_TS_FORMAT)
+    except (AttributeError, ValueError):
+        return None
+
+def _case_can_advance(state, now, action_remaining):
+    """
+    False while re-opening the case would only end in another return:
+    a lab result (DNA, fire) is not due yet, or forensics is waiting on the Action timer.
+    """
+    if not state:
+        return True
+    labs = state.get("pending") or {}
+    if "action" in labs and action_remaining > 0:
         return False
+    revisit = _case_revisit_time(state)
+    if revisit and now < revisit:
+        return False
+    return True
+
+def _select_case_row(rows_xpath, row):
+    """Ticks the case radio for an extracted row, by name/value when available, else by row index."""
+    name, value = row["radio"]
+    if name and value:
+        radios = _find_elements(By.XPATH, f"//input[@type='radio' and @name='{name}' and @value='{value}']")
+        if radios:
+            radios[0].click()
+            return True
+    return bool(global_vars.driver.execute_script(_CASE_ROW_CLICK_JS, rows_xpath, row["index"]))
 
 def _try_infer_suspect_from_911(cues) -> str | None:
     """
@@ -0,0 +1,145 @@
+import time
+from selenium.webdriver.common.by import By
+import global_vars
+from database_functions import _read_json_file, _write_json_file
+
+# Each logical element has an ordered chain of locators: the one known to work first, then fallbacks anchored
+# on something structurally different (an id, class or link text), so a layout shift that breaks one variant
+# doesn't break the rest. Elements with nothing better to anchor on keep a single locator.
+SELECTOR_CHAINS = {
+    # Header / navigation
+    "comms_icon": [(By.ID, "comms_span_id")],
+    "journals_icon": [(By.ID, "journals_span_id")],
+    "unread_comms_count": [
+        (By.XPATH, "/html/body/div[4]/div[3]/div[1]/a[1]/span"),
+        (By.XPATH, "//a[span[@id='comms_span_id']]/span"),
+    ],
+    "unread_journal_count": [
+        (By.XPATH, "/html/body/div[4]/div[3]/div[2]/a[1]/span"),
+        (By.XPATH, "//a[span[@id='journals_span_id']]/span"),
+    ],
+    "city_menu": [(By.CSS_SELECTOR, "span.city")],
+    "income_menu": [(By.CSS_SELECTOR, "span.income")],
+    "game_clock": [(By.CSS_SELECTOR, "#header_time > div")],
+
+    # Journals / Requests-Offers
+    "journal_table": [
+        (By.XPATH, "/html/body/div[4]/div[4]/div[1]/div[2]/form[2]/table"),
+        (By.XPATH, "//*[@id='content']/div[1]/div[2]/form[2]/table"),
+    ],
+    "requests_offers_link": [
+        (By.XPATH, "/html/body/div[4]/div[4]/div[1]/div[2]/ul/li[2]/a"),
+        (By.XPATH, "//a[contains(normalize-space(), 'Requests/Offers')]"),
+    ],
+
+    # Earns
+    "quick_earn_arrow": [(By.CSS_SELECTOR, "#nav_left > p:nth-of-type(5) > a:nth-of-type(2) > img")],
+    "quick_earn_last": [(By.NAME, "lastearn")],
+    "earn_work_button": [
+        (By.CSS_SELECTOR, "#holder_content > form > p > input"),
+        (By.CSS_SELECTOR, "#holder_content > form > p > button"),
+        (By.XPATH, "//*[@id='holder_content']//form//*[@type='submit']"),
+    ],
+}
+
+_POLL_SECONDS = 0.1
+_stats = {}
+_order_loaded = False
+
+
+def _load_saved_order():
+    """Restores previously promoted winners so a restart keeps the fastest variant first."""
+    global _order_loaded
+    if _order_loaded:
+        return
+    _order_loaded = True
+    saved = _read_json_file(global_vars.SELECTOR_STATS_FILE)
+    if not isinstance(saved, dict):
+        return
+    for name, entry in saved.items():
+        chain = SELECTOR_CHAINS.get(name)
+        winner = entry.get("winner") if isinstance(entry, dict) else None
+        if not chain or not winner:
+            continue
+        for variant in chain:
+            if f"{variant[0]}={variant[1]}" == winner and chain[0] != variant:
+                chain.remove(variant)
+                chain.insert(0, variant)
+                break
+
+
+def _record(name, variant, seconds):
+    """Tracks lookups, per-variant hits and latency for one logical element."""
+    entry = _stats.setdefault(name, {"lookups": 0, "hits": 0, "total_ms": 0.0, "variant_hits": {}})
+    entry["lookups"] += 1
+    entry["total_ms"] += seconds * 1000
+    if variant:
+        entry["hits"] += 1
+        key = f"{variant[0]}={variant[1]}"
+        entry["variant_hits"][key] = entry["variant_hits"].get(key, 0) + 1
+
+
+def resolve(name, timeout=None, suppress_logging=False):
+    """
+    Returns the first visible element for a logical selector, trying each variant in order.
+    All variants are probed without waiting on each pass, so a stale variant costs one quick miss
+    rather than a full timeout. A variant that wins after earlier ones missed is promoted to the front.
+    """
+    chain = SELECTOR_CHAINS.get(name)
+    if not chain:
+        print(f"ERROR: Unknown selector '{name}'.")
+        return None
+    _load_saved_order()
+
+    timeout = global_vars.EXPLICIT_WAIT_SECONDS if timeout is None else timeout
+    started = time.monotonic()
+    deadline = started + timeout
+    while True:
+        for position, variant in enumerate(list(chain)):
+            try:
+                elements = global_vars.driver.find_elements(*variant)
+                element = next((e for e in elements if e.is_displayed()), None)
+            except Exception:
+                element = None
+            if element is not None:
+                _record(name, variant, time.monotonic() - started)
+                if position > 0:
+                    chain.remove(variant)
+                    chain.insert(0, variant)
+                    print(f"[Selectors] Promoted {variant[0]}='{variant[1]}' for '{name}'.")
+                return element
+        if time.monotonic() >= deadline:
+            break
+        time.sleep(_POLL_SECONDS)
+
+    _record(name, None, time.monotonic() - started)
+    if not suppress_logging:
+        print(f"Timeout: '{name}' not found with any of {len(chain)} selector(s) after {timeout:.2f} seconds.")
+    return None
+
+
+def selector_stats():
+    """Per logical element: lookups, hit rate, average latency (ms) and the current winning variant."""
+    out = {}
+    # Also called from the metrics HTTP thread while resolve() keeps recording, so iterate over a copy
+    for name, entry in list(_stats.items()):
+        lookups = entry["lookups"] or 1
+        chain = SELECTOR_CHAINS.get(name) or [("", "")]
+        out[name] = {
+            "lookups": entry["lookups"],
+            "hit_rate": round(entry["hits"] / lookups, 3),
+            "avg_ms": round(entry["total_ms"] / lookups, 1),
+            "variant_hits": dict(entry["variant_hits"]),
+            "winner": f"{chain[0][0]}={chain[0][1]}",
+        }
+    return out
+
+
+def save_selector_stats():
+    """Writes selector stats (and the promoted winners) to game_data."""
+    if _stats:
+        saved = _read_json_file(global_vars.SELECTOR_STATS_FILE)
+        if not isinstance(saved, dict):
+            saved = {}
+        saved.update(selector_stats())
+        _write_json_file(global_vars.SELECTOR_STATS_FILE, saved)
@@ -3,9 +3,20 @@ import time
 import random
 from selenium.webdriver.common.by import By
 from helper_functions import _get_element_text, _get_element_attribute
-from database_functions import _read_text_file, _get_last_timestamp
+from database_functions import _read_text_file, _get_last_timestamp, get_yellow_pages_scan_interval_hours
 import global_vars
 
+# XPath mappings for main game page timers
+GAME_TIMER_XPATHS = {
+    'earn_time_remaining': "//div[@id='user_timers_holder']/div[contains(@title, 'Next Earn')]/form/span[@class='donation_timer']",
+    'action_time_remaining': "//div[@id='user_timers_holder']/div[contains(@title, 'Next Action')]/form/span[@class='donation_timer']",
+    'case_time_remaining': "//div[@id='user_timers_holder']/div[contains(@title, 'Next Case')]/form/span[@class='donation_timer']",
+    'launder_time_remaining': "//div[@id='user_timers_holder']/div[contains(@title, 'Next Launder')]/form/span[@class='donation_timer']",
+    'trafficking_time_remaining': "//div[@id='user_timers_holder']/div/form[@name='traffick']/span[@class='donation_timer']",
+    'event_time_remaining': "//div[@id='user_timers_holder']/div[contains(@title, 'Next Event action')]/form/span[@class='donation_timer']",
+    'skill_time_remaining': "//div[@id='user_timers_holder']/div[contains(@title, 'Next Skill')]/form/span[@class='donation_timer']",
+}
+
 def parse_game_datetime(time_str):
     """
     Parses a game date/time string into a datetime object.
@@ -47,6 +58,43 @@ def get_game_timer_remaining(timer_xpath):
     print(f"Failed to get game timer from {timer_xpath} after {max_time_retries} retries. Returning infinity.")
     return float('inf')
 
+def get_jail_timer_snapshot():
+    """
+    Reads the game clock and the Earn/Action timers in a single script call while jailed.
+    Returns {'earn_time_remaining', 'action_time_remaining'} in seconds (inf if unreadable).
+    """
+    snapshot = {'earn_time_remaining': float('inf'), 'action_time_remaining': float('inf')}
+    try:
+        raw = global_vars.driver.execute_script("""
+            function attr(xp) {
+                var n = document.evaluate(xp, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+                return n ? n.getAttribute('data-date-end') : null;
+            }
+            var clock = document.evaluate("//*[@id='header_time']/div", document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            return {
+                now: clock ? (clock.textContent || '').trim() : null,
+                earn: attr(arguments[0]),
+                action: attr(arguments[1])
+            };
+        """, GAME_TIMER_XPATHS['earn_time_remaining'], GAME_TIMER_XPATHS['action_time_remaining']) or {}
+    except Exception as e:
+        print(f"Warning: Jail timer snapshot script failed: {e}")
+        raw = {}
+
+    game_now = parse_game_datetime(raw.get('now')) if raw.get('now') else None
+    if not game_now:
+        # Fall back to the per-timer readers if the clock couldn't be read
+        for timer_name in snapshot:
+            snapshot[timer_name] = get_game_timer_remaining(GAME_TIMER_XPATHS[timer_name])
+        return snapshot
+
+    for timer_name, key in (('earn_time_remaining', 'earn'), ('action_time_remaining', 'action')):
+        end_str = raw.get(key)
+        end_dt = parse_game_datetime(end_str) if end_str else None
+        if end_dt:
+            snapshot[timer_name] = max(0, (end_dt - game_now).total_seconds() + random.uniform(2, 5))
+    return snapshot
+
 def get_all_active_game_timers():
     """
     Reads all active in-game timers from the current page, calculates file-based timers,
@@ -72,9 +120,7 @@ def get_all_active_game_timers():
         'armed_robbery_recheck_time_remaining': 0,
         'torch_recheck_time_remaining': 0,
 
-        'check_weapon_shop_time_remaining': 0,
-        'check_drug_store_time_remaining': 0,
-        'check_bionics_store_time_remaining': 0,
+        'shop_sweep_time_remaining': 0,
         'gym_trains_time_remaining': 0,
         'promo_check_time_remaining': 0,
         'consume_drugs_time_remaining': 0,
@@ -84,15 +130,7 @@ def get_all_active_game_timers():
 
     # --- Phase 1: Scrape In-Game UI Timers ---
     # XPath mappings for main game page timers
-    timer_xpaths = {
-        'earn_time_remaining': "//div[@id='user_timers_holder']/div[contains(@title, 'Next Earn')]/form/span[@class='donation_timer']",
-        'action_time_remaining': "//div[@id='user_timers_holder']/div[contains(@title, 'Next Action')]/form/span[@class='donation_timer']",
-        'case_time_remaining': "//div[@id='user_timers_holder']/div[contains(@title, 'Next Case')]/form/span[@class='donation_timer']",
-        'launder_time_remaining': "//div[@id='user_timers_holder']/div[contains(@title, 'Next Launder')]/form/span[@class='donation_timer']",
-        'trafficking_time_remaining': "//div[@id='user_timers_holder']/div/form[@name='traffick']/span[@class='donation_timer']",
-        'event_time_remaining': "//div[@id='user_timers_holder']/div[contains(@title, 'Next Event action')]/form/span[@class='donation_timer']",
-        'skill_time_remaining': "//div[@id='user_timers_holder']/div[contains(@title, 'Next Skill')]/form/span[@class='donation_timer']",
-    }
+    timer_xpaths = GAME_TIMER_XPATHS
 
     for timer_name, xpath in timer_xpaths.items():
         # get_game_timer_remaining returns 0 if not found/expired
@@ -101,8 +139,8 @@ def get_all_active_game_timers():
 
     # --- Phase 2: Calculate File-Based Timers & Aggravated Crime Cooldowns ---
 
-    # Yellow Pages Scan Timer (Always enabled, 7-hour interval)
-    yellow_pages_scan_interval_hours = 7
+    # Yellow Pages Scan Timer (Always enabled, interval adapts to listing churn)
+    yellow_pages_scan_interval_hours = get_yellow_pages_scan_interval_hours()
     last_yp_scan_time = _get_last_timestamp(global_vars.YELLOW_PAGES_LAST_SCAN_FILE)
     if last_yp_scan_time:
         remaining = int(yellow_pages_scan_interval_hours * 3600 - (current_time - last_yp_scan_time).total_seconds())
@@ -119,14 +157,13 @@ def get_all_active_game_timers():
     else:
         timers['funeral_parlour_scan_time_remaining'] = 0  # If never scanned, scan immediately
 
-    # Weapon Shop Check Timer
-    next_ws_check = _get_last_timestamp(global_vars.WEAPON_SHOP_NEXT_CHECK_FILE)
-
-    if next_ws_check:
-        ws_time_remaining = (next_ws_check - current_time).total_seconds()
-        timers['check_weapon_shop_time_remaining'] = max(0, ws_time_remaining)
+    # City Shop Sweep Timer (Weapon Shop, Drug Store and Bionics share one sweep)
+    next_shop_sweep = _get_last_timestamp(global_vars.SHOP_SWEEP_NEXT_CHECK_FILE)
+    if next_shop_sweep:
+        shop_sweep_remaining = (next_shop_sweep - current_time).total_seconds()
+        timers['shop_sweep_time_remaining'] = max(0, shop_sweep_remaining)
     else:
-        timers['check_weapon_shop_time_remaining'] = 0.0  # If never checked, check immediately
+        timers['shop_sweep_time_remaining'] = 0.0  # If never checked, check immediately
 
     # Gym Trains Timer
     next_gym_train = _get_last_timestamp(global_vars.GYM_TRAINING_FILE)
@@ -136,14 +173,6 @@ def get_all_active_game_timers():
     else:
         timers['gym_trains_time_remaining'] = 0.0 # If never checked, check immediately
 
-    # Bionics Shop Check Timer
-    next_bios_check = _get_last_timestamp(global_vars.BIONICS_SHOP_NEXT_CHECK_FILE)
-    if next_bios_check:
-        bios_time_remaining = (next_bios_check - current_time).total_seconds()
-        timers['check_bionics_store_time_remaining'] = max(0, bios_time_remaining)
-    else:
-        timers['check_bionics_store_time_remaining'] = 0.0 # If never checked, check immediately
-
     # Consume Drugs Timer
     next_consume_drugs = _get_last_timestamp(global_vars.DRUGS_LAST_CONSUMED_FILE)
     if next_consume_drugs:
@@ -307,29 +336,19 @@ def get_all_active_game_timers():
     if script_event_remaining > 0:
         timers['event_time_remaining'] = max(timers.get('event_time_remaining', 0), script_event_remaining)
 
-    # Weapon Shop Cooldown
-    script_weapon_shop_remaining = (global_vars._script_weapon_shop_cooldown_end_time - current_time).total_seconds()
-    if script_weapon_shop_remaining > 0:
-        timers['check_weapon_shop_time_remaining'] = max(timers.get('check_weapon_shop_time_remaining', 0), script_weapon_shop_remaining)
+    # City Shop Sweep Cooldown
+    script_shop_sweep_remaining = (global_vars._script_shop_sweep_cooldown_end_time - current_time).total_seconds()
+    if script_shop_sweep_remaining > 0:
+        timers['shop_sweep_time_remaining'] = max(timers.get('shop_sweep_time_remaining', 0), script_shop_sweep_remaining)
 
     # Consume Drugs Cooldown
     script_consume_drugs_remaining = (global_vars._script_consume_drugs_cooldown_end_time - current_time).total_seconds()
     if script_consume_drugs_remaining > 0:
         timers['consume_drugs_time_remaining'] = max(timers.get('consume_drugs_time_remaining', 0),script_consume_drugs_remaining)
 
-    # Drug Store Cooldown
-    script_drug_store_remaining = (global_vars._script_drug_store_cooldown_end_time - current_time).total_seconds()
-    if script_drug_store_remaining > 0:
-        timers['check_drug_store_time_remaining'] = max(timers.get('check_drug_store_time_remaining', 0), script_drug_store_remaining)
-
     # Gym Trains Cooldown
     script_gym_trains_remaining = (global_vars._script_gym_train_cooldown_end_time - current_time).total_seconds()
     if script_gym_trains_remaining > 0:
         timers['gym_trains_time_remaining'] = max(timers.get('gym_trains_time_remaining', 0), script_gym_trains_remaining)
 
-    # Bionics Shop Cooldown
-    script_bionics_shop_remaining = (global_vars._script_bionics_shop_cooldown_end_time - current_time).total_seconds()
-    if script_bionics_shop_remaining > 0:
-        timers['check_bionics_store_time_remaining'] = max(timers.get('check_bionics_store_time_remaining', 0), script_bionics_shop_remaining)
-
     return timers
\ No newline at end of file